@@ -0,0 +1,155 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from db.database import SessionLocal
+from db.models import AlertEvent, AlertRule
+from services.alerts import OPS, SIGNALS, resolve
+from services.rollup import DASHBOARD_QUERIES
+from api.auth import get_current_user
+
+router = APIRouter()
+
+MAX_EVENTS = 1000
+
+
+class AlertRuleReq(BaseModel):
+    name: str
+    series: str
+    kind: str = "threshold"
+    op: str = ">"
+    threshold: float
+    window: int = 0
+    for_seconds: int = 0
+    enabled: bool = True
+
+
+def _validate(req):
+    if req.series not in DASHBOARD_QUERIES:
+        raise HTTPException(status_code=400, detail=f"Unknown series, expected one of: {', '.join(DASHBOARD_QUERIES)}")
+    if req.kind not in SIGNALS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind, expected one of: {', '.join(SIGNALS)}")
+    if req.op not in OPS:
+        raise HTTPException(status_code=400, detail=f"Unknown op, expected one of: {', '.join(OPS)}")
+    if req.window < 0 or req.for_seconds < 0:
+        raise HTTPException(status_code=400, detail="window and for_seconds must be >= 0")
+
+
+def _rule_dict(rule):
+    return {
+        "id": rule.id,
+        "name": rule.name,
+        "series": rule.series,
+        "kind": rule.kind,
+        "op": rule.op,
+        "threshold": rule.threshold,
+        "window": rule.window,
+        "for_seconds": rule.for_seconds,
+        "enabled": rule.enabled,
+        "state": rule.state,
+        "state_since": rule.state_since,
+        "last_value": rule.last_value,
+        "last_evaluated": rule.last_evaluated,
+    }
+
+
+def _event_dict(event):
+    return {
+        "id": event.id,
+        "rule_id": event.rule_id,
+        "rule_name": event.rule_name,
+        "state": event.state,
+        "value": event.value,
+        "threshold": event.threshold,
+        "timestamp": event.timestamp,
+    }
+
+
+@router.get("/alerts/rules")
+def list_rules(current_user: str = Depends(get_current_user)):
+    db = SessionLocal()
+    try:
+        return {"rules": [_rule_dict(r) for r in db.query(AlertRule).order_by(AlertRule.name).all()]}
+    finally:
+        db.close()
+
+
+@router.post("/alerts/rules")
+def create_rule(req: AlertRuleReq, current_user: str = Depends(get_current_user)):
+    _validate(req)
+    db = SessionLocal()
+    try:
+        rule = AlertRule(**req.model_dump())
+        db.add(rule)
+        db.commit()
+        return _rule_dict(rule)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Rule {req.name} already exists")
+    finally:
+        db.close()
+
+
+@router.put("/alerts/rules/{rule_id}")
+def update_rule(rule_id: int, req: AlertRuleReq, current_user: str = Depends(get_current_user)):
+    _validate(req)
+    db = SessionLocal()
+    try:
+        rule = db.query(AlertRule).filter(AlertRule.id == rule_id).first()
+        if not rule:
+            raise HTTPException(status_code=404, detail="Rule not found")
+        # The engine stops evaluating a disabled rule, and a new series or kind starts over,
+        # so nothing would ever resolve an alert it is firing
+        if rule.state == "firing" and (not req.enabled or (req.series, req.kind) != (rule.series, rule.kind)):
+            db.add(resolve(rule, time.time(), rule.last_value))
+        for field, value in req.model_dump().items():
+            setattr(rule, field, value)
+        db.commit()
+        return _rule_dict(rule)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Rule {req.name} already exists")
+    finally:
+        db.close()
+
+
+@router.delete("/alerts/rules/{rule_id}")
+def delete_rule(rule_id: int, current_user: str = Depends(get_current_user)):
+    db = SessionLocal()
+    try:
+        deleted = db.query(AlertRule).filter(AlertRule.id == rule_id).delete()
+        db.commit()
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Rule not found")
+        return {"deleted": rule_id}
+    finally:
+        db.close()
+
+
+@router.get("/alerts")
+def list_alerts(
+    state: Optional[str] = None,
+    rule_id: Optional[int] = None,
+    since: Optional[int] = None,
+    limit: int = 100,
+    current_user: str = Depends(get_current_user)
+):
+    """Currently firing rules plus the most recent firing/resolved transitions."""
+    db = SessionLocal()
+    try:
+        firing = db.query(AlertRule).filter(AlertRule.state == "firing", AlertRule.enabled == True).order_by(AlertRule.state_since.desc()).all()
+        events = db.query(AlertEvent)
+        if state:
+            events = events.filter(AlertEvent.state == state)
+        if rule_id is not None:
+            events = events.filter(AlertEvent.rule_id == rule_id)
+        if since is not None:
+            events = events.filter(AlertEvent.timestamp >= since)
+        events = events.order_by(AlertEvent.timestamp.desc(), AlertEvent.id.desc()).limit(min(max(limit, 1), MAX_EVENTS)).all()
+        return {
+            "firing": [_rule_dict(r) for r in firing],
+            "events": [_event_dict(e) for e in events],
+        }
+    finally:
+        db.close()
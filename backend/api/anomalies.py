@@ -0,0 +1,138 @@
+import logging
+import math
+import os
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from services.registry import get_cache, get_prom_fleet
+from services.capabilities import panel_available
+from services.prometheus_client import parse_duration
+from services.promql import grouped_query
+from services.anomaly import ANOMALY_RECENT_POINTS, MIN_SEGMENT, dense_matrix, score_matrix, top_anomalies
+from api.auth import get_current_user
+from api.responses import FastJSONResponse
+from api.top import CONTAINER_FILTER, NAMESPACE_RE
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Scores are recomputed at most this often for the same view; the UI polls on every refresh
+ANOMALY_CACHE_TTL = float(os.getenv("ANOMALY_CACHE_TTL", "30"))
+MAX_ANOMALY_LIMIT = 100
+MAX_WINDOW_STEPS = 1440
+
+
+def pod_series_query(namespace=None):
+    selector = CONTAINER_FILTER + (f', namespace="{namespace}"' if namespace else "")
+    restarts = f'{{namespace="{namespace}"}}' if namespace else ""
+    return grouped_query([
+        ("cpu", f"rate(container_cpu_usage_seconds_total{{{selector}}}[5m])"),
+        ("memory", f"container_memory_working_set_bytes{{{selector}}}"),
+        ("restarts", f"increase(kube_pod_container_status_restarts_total{restarts}[5m])"),
+    ], "namespace, pod")
+
+
+def node_series_query():
+    # id="/" is the root cgroup, i.e. whole-node usage as seen by cAdvisor
+    return grouped_query([
+        ("cpu", 'rate(container_cpu_usage_seconds_total{id="/"}[5m])'),
+        ("memory", 'container_memory_working_set_bytes{id="/"}'),
+        ("restarts", "increase(kube_pod_container_status_restarts_total[5m]) * on (namespace, pod) group_left (node) kube_pod_info"),
+    ], "node")
+
+
+# target: (query for an optional namespace, labels naming one series)
+TARGETS = {
+    "pods": (pod_series_query, ("cluster", "namespace", "pod", "resource")),
+    "nodes": (lambda namespace=None: node_series_query(), ("cluster", "node", "resource")),
+}
+
+
+def _round(value):
+    return None if math.isnan(value) else round(value, 6)
+
+
+def anomaly_report(res, target, start, end, step_seconds, limit):
+    """Top `limit` anomalous series of a grouped range response, with their scores and values."""
+    key_labels = TARGETS[target][1]
+    keys, timestamps, matrix = dense_matrix(res, start, end, step_seconds, key_labels)
+    scores = score_matrix(matrix)
+    rows = []
+    for col in top_anomalies(scores, limit):
+        row = dict(zip(key_labels, keys[col]))
+        row["cluster"] = row["cluster"] or None
+        row["metric"] = row.pop("resource")
+        values = matrix[:, col]
+        row.update({
+            "score": round(float(scores["score"][col]), 2),
+            "robust_z": round(float(scores["robust_z"][col]), 2),
+            "ewma": round(float(scores["ewma"][col]), 2),
+            "change": round(float(scores["change"][col]), 2),
+            "change_time": int(timestamps[scores["change_at"][col]]),
+            "median": _round(float(scores["median"][col])),
+            "latest": _round(float(scores["latest"][col])),
+            "values": [_round(v) for v in values.tolist()],
+        })
+        rows.append(row)
+    report = {
+        "available": True,
+        "anomalies": rows,
+        "series": len(keys),
+        "timestamps": timestamps.astype(int).tolist(),
+    }
+    if res.get("unavailable"):
+        report["unavailable_clusters"] = res["unavailable"]
+    return report
+
+
+@router.get("/metrics/anomalies")
+def anomalies(
+    target: str = "pods",
+    namespace: Optional[str] = None,
+    window: str = "1h",
+    step: str = "1m",
+    limit: int = 20,
+    cluster: Optional[str] = None,
+    current_user: str = Depends(get_current_user)
+):
+    """Most anomalous pod or node CPU, memory and restart series over the last `window`"""
+    if target not in TARGETS:
+        raise HTTPException(status_code=400, detail=f"target must be one of: {', '.join(TARGETS)}")
+    if namespace == "all":
+        namespace = None
+    if namespace and not NAMESPACE_RE.match(namespace):
+        raise HTTPException(status_code=400, detail="Invalid namespace")
+    try:
+        window_seconds = parse_duration(window)
+        step_seconds = parse_duration(step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    steps = int(window_seconds // step_seconds) if step_seconds > 0 else 0
+    min_steps = 2 * MIN_SEGMENT + ANOMALY_RECENT_POINTS
+    if not min_steps <= steps <= MAX_WINDOW_STEPS:
+        raise HTTPException(status_code=400, detail=f"window must span {min_steps} to {MAX_WINDOW_STEPS} steps")
+    limit = min(max(limit, 1), MAX_ANOMALY_LIMIT)
+    if not panel_available("anomalies"):
+        return FastJSONResponse({"available": False, "anomalies": [], "series": 0, "timestamps": []})
+    try:
+        prom = get_prom_fleet().select(cluster)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Align the window to the step so every refresh within a step shares one result
+    end = int(time.time() // step_seconds * step_seconds)
+    start = int(end - steps * step_seconds)
+    query = TARGETS[target][0](namespace)
+
+    def load():
+        res = prom.query_range(query, start=start, end=end, step=step)
+        return anomaly_report(res, target, start, end, step_seconds, limit)
+    try:
+        report = get_cache().get_or_set(
+            f"anomalies:{cluster or 'all'}:{target}:{namespace or ''}:{step}:{steps}:{limit}:{end}", ANOMALY_CACHE_TTL, load
+        )
+    except Exception as e:
+        logger.error(f"Anomaly detection error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prometheus query failed: {e}")
+    return FastJSONResponse(report)
@@ -1,9 +1,23 @@
+import logging
+import time
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
-from services.prometheus_client import PromClient
+from services.registry import active_cluster, get_prom_fleet
+from services.prometheus_client import check_range, parse_duration
+from services.query_guard import plan_query, actual_cost
 from api.auth import get_current_user
+from api.responses import FastJSONResponse, stream_prom_matrix
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-client = PromClient()
+
+@router.get("/metrics/prometheus/endpoints")
+def prometheus_endpoints(current_user: str = Depends(get_current_user)):
+    """Configured Prometheus servers (clusters), their kubeconfig contexts, and which one
+    the Kubernetes client acts on (the only one optimizations can be applied to)"""
+    active = active_cluster()
+    return {"endpoints": [dict(e, active=e["name"] == active) for e in get_prom_fleet().endpoints()]}
 
 @router.get("/metrics/query_range_raw")
 def query_range_raw(
@@ -11,14 +25,47 @@ def query_range_raw(
     current_user: str = Depends(get_current_user),
     start: int = None,
     end: int = None,
-    step: str = '15s'
+    step: str = '15s',
+    cluster: Optional[str] = None,
+    auto_step: bool = True,
+    confirm: bool = False
 ):
-    """Execute raw PromQL and return the raw Prometheus JSON response"""
+    """Execute raw PromQL and stream the Prometheus JSON response series by series.
+
+    The query's cost is estimated first: over budget its step is raised
+    (unless auto_step=false), and what is still too costly needs confirm=true
+    or is refused. The estimate and the actual cost are returned under "cost".
+    With several Prometheus endpoints the query fans out to the selected
+    clusters (all by default) and each series gets a `cluster` label.
+    """
     if not query:
         raise HTTPException(status_code=400, detail="Query parameter is required")
-    
+    if not end:
+        end = int(time.time())
+    if not start:
+        start = end - 3600
+    try:
+        step_seconds = parse_duration(step)
+        check_range(start, end, step_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        prom = get_prom_fleet().select(cluster)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    plan = plan_query(prom, query, start, end, step, step_seconds, auto_step=auto_step, confirm=confirm)
+    cost = {k: plan[k] for k in ("requested_step", "step", "estimated")}
+    if plan["action"] == "reject":
+        raise HTTPException(status_code=400, detail={"message": "Query is too expensive; narrow the selectors or the time range", "cost": cost})
+    if plan["action"] == "confirm":
+        raise HTTPException(status_code=428, detail={"message": "Query is expensive; repeat with confirm=true to run it", "cost": cost})
+    cost["adjusted"] = plan["action"] == "adjusted"
+
     try:
-        return client.query_range_result_like_prom(query, start=start, end=end, step=step)
+        res = prom.query_range_result_like_prom(query, start=start, end=end, step=plan["step"])
     except Exception as e:
         logger.error(f"Explorer query error: {e}")
-        return {"status": "success", "data": {"resultType": "matrix", "result": []}}
+        return FastJSONResponse({"status": "success", "data": {"resultType": "matrix", "result": []}, "cost": cost})
+    cost["actual"] = actual_cost(res)
+    return stream_prom_matrix(dict(res, cost=cost))
@@ -0,0 +1,171 @@
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from services.registry import get_cache, get_prom_fleet
+from services.prometheus_client import check_range, parse_duration
+from api.auth import get_current_user
+from api.optimization import OPTIMIZATION_CACHE_TTL, build_optimization_report
+from api.responses import prefetch
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+EXPORT_COMPRESSION = os.getenv("EXPORT_COMPRESSION", "zstd")
+# Steps per series in each Prometheus sub-request, i.e. per row group
+EXPORT_POINTS_PER_CHUNK = int(os.getenv("EXPORT_POINTS_PER_CHUNK", "2000"))
+
+MATRIX_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ms", tz="UTC")),
+    ("value", pa.float64()),
+    ("labels", pa.map_(pa.string(), pa.string())),
+])
+
+OPTIMIZATION_SCHEMA = pa.schema([
+    ("cluster", pa.string()),
+    ("namespace", pa.string()),
+    ("pod", pa.string()),
+    ("deployment", pa.string()),
+    ("requested_mb", pa.float64()),
+    ("used_mb", pa.float64()),
+    ("waste_mb", pa.float64()),
+    ("requested_cpu", pa.float64()),
+    ("used_cpu", pa.float64()),
+    ("waste_cpu", pa.float64()),
+])
+
+
+class _ChunkSink:
+    """Write-only file object that buffers what the writer emits until the response drains it."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def matrix_table(res):
+    """Flatten a query_range response into long format: one row per (series, timestamp)."""
+    timestamps, values, labels = [], [], []
+    for item in res.get("data", {}).get("result", []):
+        metric = list(item.get("metric", {}).items())
+        for ts, value in item.get("values", []):
+            timestamps.append(int(float(ts) * 1000))
+            values.append(float(value))
+            labels.append(metric)
+    return pa.table([timestamps, values, labels], schema=MATRIX_SCHEMA)
+
+
+def encode_tables(tables, schema, fmt):
+    """Encode tables as one Parquet file (a row group per table) or Arrow IPC stream.
+
+    Bytes are yielded as soon as each table is written, so only the table being
+    encoded is held in memory.
+    """
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression=EXPORT_COMPRESSION)
+    else:
+        writer = ipc.new_stream(sink, schema, options=ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION))
+    try:
+        for table in tables:
+            if table.num_rows:
+                writer.write_table(table)
+            data = sink.drain()
+            if data:
+                yield data
+    except Exception as e:
+        # Headers are already sent; without the footer the client sees a truncated file
+        logger.error(f"Export aborted: {e}")
+        raise
+    writer.close()
+    yield sink.drain()
+
+
+def _export_response(tables, schema, fmt, name):
+    media_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    return StreamingResponse(
+        encode_tables(tables, schema, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _check_format(fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format, expected one of: {', '.join(EXPORT_FORMATS)}")
+
+
+@router.get("/metrics/export/query_range")
+def export_query_range(
+    query: str,
+    current_user: str = Depends(get_current_user),
+    start: int = None,
+    end: int = None,
+    step: str = '15s',
+    cluster: Optional[str] = None,
+    format: str = "parquet"
+):
+    """Stream a query_range_raw result as Parquet or Arrow IPC, one row group per sub-range.
+
+    Like query_range_raw, the selected clusters (all by default) are exported
+    with a `cluster` label on each series when several Prometheus endpoints are configured.
+    """
+    if not query:
+        raise HTTPException(status_code=400, detail="Query parameter is required")
+    _check_format(format)
+    try:
+        check_range(start, end, parse_duration(step))
+        prom = get_prom_fleet().select(cluster)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    responses = prom.iter_query_range(query, start=start, end=end, step=step, max_points=EXPORT_POINTS_PER_CHUNK)
+    try:
+        # Fail with a proper status if Prometheus rejects the query
+        tables = prefetch(matrix_table(res) for res in responses)
+    except Exception as e:
+        logger.error(f"Export query error: {e}")
+        raise HTTPException(status_code=502, detail=str(e))
+    return _export_response(tables, MATRIX_SCHEMA, format, "query_range")
+
+
+@router.get("/metrics/export/optimization")
+def export_optimization(format: str = "parquet", current_user: str = Depends(get_current_user)):
+    """Stream the resource optimization report as Parquet or Arrow IPC"""
+    _check_format(format)
+    try:
+        report = get_cache().get_or_set("optimization:report", OPTIMIZATION_CACHE_TTL, build_optimization_report)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    table = pa.Table.from_pylist(report["optimizations"], schema=OPTIMIZATION_SCHEMA)
+    return _export_response([table], OPTIMIZATION_SCHEMA, format, "optimization")
@@ -1,18 +1,109 @@
 from fastapi import APIRouter, HTTPException, Depends
-from services.k8s_client import K8sClient
+from fastapi.concurrency import run_in_threadpool
+from kubernetes.client.rest import ApiException
+import httpx
+from services.registry import get_cache, get_k8s, get_k8s_async
+from services.k8s_async import AsyncApiError
+from services import materializer
+from services.bulk import run_bulk
+from services.delta import versioned, versioned_list
+from services.logsearch import LOG_SEARCH_MAX_TARGETS, LOG_SEARCH_TAIL, MAX_CONTEXT, compile_pattern, search_logs
+from services.rollout import ROLLOUT_WATCH_TIMEOUT, watch_rollout
+from api.responses import FastJSONResponse, prefetch, snapshot_response, stream_json_list, stream_ndjson, stream_sse
 from api.auth import get_current_user
 from api.auth import create_access_token, get_current_user
 from db.database import SessionLocal
 from db.models import User
 from api.security import hash_password, verify_password
 from pydantic import BaseModel
+from typing import List, Optional
 
+import asyncio
+import functools
 import logging
+import os
+import re
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-k8s = K8sClient()
+
+# Upper bounds for client-supplied bulk settings, to keep the apiserver safe
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "16"))
+BULK_MAX_RATE = float(os.getenv("BULK_MAX_RATE", "20"))
+BULK_MAX_OPERATIONS = int(os.getenv("BULK_MAX_OPERATIONS", "500"))
+# List results are shared by all workers for this long; mutations invalidate them
+K8S_CACHE_TTL = float(os.getenv("K8S_CACHE_TTL", "5"))
+# Default (namespace=all) lists shown by the Kubernetes and Overview pages,
+# materialized on the pages' 10s refresh cadence while they are open
+K8S_VIEW_REFRESH = 10
+MATERIALIZED_LISTS = {
+    "nodes": ("get_nodes",),
+    "namespaces": ("get_namespaces",),
+    "pods:all": ("get_pods", "all"),
+    "deployments:all": ("get_deployments", "all"),
+    "services:all": ("get_services", "all"),
+    "events:all": ("get_events", "all"),
+}
+
+
+async def _call(method, *args, **kwargs):
+    """Call a read method on the async client, or on the sync client in the threadpool
+    when the async path is unavailable."""
+    k8s_async = get_k8s_async()
+    if k8s_async is not None:
+        return await getattr(k8s_async, method)(*args, **kwargs)
+    return await run_in_threadpool(getattr(get_k8s(), method), *args, **kwargs)
+
+
+def _cache_list(key, rows):
+    get_cache().set(f"k8s:lists:{key}", versioned_list(rows), K8S_CACHE_TTL)
+
+
+async def _cached_list(key, method, *args):
+    """Serve a list, as a services.delta.versioned_list entry, from the shared cache;
+    errors are raised, never cached."""
+    async def load():
+        data = await _call(method, *args)
+        if isinstance(data, dict) and "error" in data:
+            raise HTTPException(status_code=500, detail=data["error"])
+        return await asyncio.to_thread(versioned_list, data)
+    return await get_cache().aget_or_set(f"k8s:lists:{key}", K8S_CACHE_TTL, load)
+
+
+async def _list_response(key, field, method, *args, since=None):
+    """{field: list}, from the materialized snapshot for default views, else via _cached_list.
+
+    With `since` (a version token, or "" for none yet) the body is a delta
+    against that version instead; see services.delta.versioned.
+    """
+    snap = None
+    if key in MATERIALIZED_LISTS:
+        snap = await asyncio.to_thread(materializer.snapshot, f"k8s:{key}")
+    entry = snap[0] if snap is not None else await _cached_list(key, method, *args)
+    if since is None:
+        content = {field: entry["rows"]}
+    else:
+        content = await asyncio.to_thread(versioned, key, field, entry["rows"], entry["version"], since)
+    if snap is not None:
+        return snapshot_response(content, snap[1])
+    return FastJSONResponse(content)
+
+
+def _load_list(method, *args):
+    data = getattr(get_k8s(), method)(*args)
+    if isinstance(data, dict) and "error" in data:
+        raise RuntimeError(data["error"])
+    return versioned_list(data)
+
+
+for _key, (_method, *_args) in MATERIALIZED_LISTS.items():
+    # Stored under k8s: so _invalidate_lists() drops them after mutations
+    materializer.register(f"k8s:{_key}", K8S_VIEW_REFRESH, functools.partial(_load_list, _method, *_args), key=f"k8s:views:{_key}")
+
+
+def _invalidate_lists():
+    get_cache().invalidate("k8s:")
 
 
 class CreateNamespaceRequest(BaseModel):
@@ -20,114 +111,305 @@ class CreateNamespaceRequest(BaseModel):
 
 @router.get("/metrics/clusters")
 def list_clusters(current_user: str = Depends(get_current_user)):
-    data = k8s.get_clusters()
+    data = get_k8s().get_clusters()
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
-    return {"clusters": data}
+    return FastJSONResponse({"clusters": data})
 
 @router.get("/metrics/nodes")
-def list_nodes(current_user: str = Depends(get_current_user)):
-    data = k8s.get_nodes()
-    if isinstance(data, dict) and "error" in data:
-        raise HTTPException(status_code=500, detail=data["error"])
-    return {"nodes": data}
+async def list_nodes(since: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    return await _list_response("nodes", "nodes", "get_nodes", since=since)
 
 
 @router.get("/metrics/namespaces")
-def list_namespaces(current_user: str = Depends(get_current_user)):
+async def list_namespaces(since: Optional[str] = None, current_user: str = Depends(get_current_user)):
     logger.info("Entering list_namespaces endpoint")
-    data = k8s.get_namespaces()
+    response = await _list_response("namespaces", "namespaces", "get_namespaces", since=since)
     logger.info("Finished get_namespaces call")
-    if isinstance(data, dict) and "error" in data:
-        raise HTTPException(status_code=500, detail=data["error"])
-    return {"namespaces": data}
+    return response
 
 @router.post("/metrics/namespaces")
 def create_namespace(req: CreateNamespaceRequest, current_user: str = Depends(get_current_user)):
-    data = k8s.create_namespace(req.name)
+    data = get_k8s().create_namespace(req.name)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
+    _invalidate_lists()
     return data
 
 @router.delete("/metrics/namespaces/{name}")
 def delete_namespace(name: str, current_user: str = Depends(get_current_user)):
-    data = k8s.delete_namespace(name)
+    data = get_k8s().delete_namespace(name)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
+    _invalidate_lists()
     return data
 
+def _stream_pods_sync(namespace):
+    k8s = get_k8s()
+    if not k8s.is_connected():
+        raise HTTPException(status_code=500, detail="Native K8s client not configured.")
+    try:
+        # The first page is fetched here so API errors still map to a 500;
+        # remaining pages are encoded and sent as they arrive.
+        pods = prefetch(k8s.iter_pods(namespace))
+    except ApiException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def tee():
+        rows = []
+        for p in pods:
+            row = p._asdict()
+            rows.append(row)
+            yield row
+        _cache_list(f"pods:{namespace}", rows)
+
+    return stream_json_list("pods", tee())
+
+
 @router.get("/metrics/pods")
-def list_pods(namespace: str = "all", current_user: str = Depends(get_current_user)):
-    data = k8s.get_pods(namespace)
-    if isinstance(data, dict) and "error" in data:
-        raise HTTPException(status_code=500, detail=data["error"])
-    return {"pods": data}
+async def list_pods(namespace: str = "all", since: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    if since is not None:
+        # A delta needs the whole list at hand, so it is not streamed
+        return await _list_response(f"pods:{namespace}", "pods", "get_pods", namespace, since=since)
+    if namespace == "all":
+        snap = await asyncio.to_thread(materializer.snapshot, "k8s:pods:all")
+        if snap is not None:
+            entry, age = snap
+            return snapshot_response({"pods": entry["rows"]}, age)
+
+    cached = await asyncio.to_thread(get_cache().get, f"k8s:lists:pods:{namespace}")
+    if cached is not None:
+        return FastJSONResponse({"pods": cached["rows"]})
+
+    k8s_async = get_k8s_async()
+    if k8s_async is None:
+        return await run_in_threadpool(_stream_pods_sync, namespace)
+
+    pods = k8s_async.iter_pods(namespace)
+    try:
+        # Same as the sync path: surface API errors before the response starts
+        first = await pods.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except (AsyncApiError, httpx.HTTPError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def tee():
+        rows = []
+        if first is not None:
+            rows.append(first._asdict())
+            yield rows[-1]
+            async for p in pods:
+                row = p._asdict()
+                rows.append(row)
+                yield row
+        await asyncio.to_thread(_cache_list, f"pods:{namespace}", rows)
+
+    return stream_json_list("pods", tee())
 
 
 @router.get("/metrics/deployments")
-def list_deployments(namespace: str = "all", current_user: str = Depends(get_current_user)):
-    data = k8s.get_deployments(namespace)
-    if isinstance(data, dict) and "error" in data:
-        raise HTTPException(status_code=500, detail=data["error"])
-    return {"deployments": data}
+async def list_deployments(namespace: str = "all", since: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    return await _list_response(f"deployments:{namespace}", "deployments", "get_deployments", namespace, since=since)
 
 
 @router.get("/metrics/services")
-def list_services(namespace: str = "all", current_user: str = Depends(get_current_user)):
-    data = k8s.get_services(namespace)
-    if isinstance(data, dict) and "error" in data:
-        raise HTTPException(status_code=500, detail=data["error"])
-    return {"services": data}
+async def list_services(namespace: str = "all", since: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    return await _list_response(f"services:{namespace}", "services", "get_services", namespace, since=since)
 
 
 @router.get("/metrics/pods/{namespace}/{pod_name}/logs")
-def get_pod_logs(
+async def get_pod_logs(
     namespace: str,
     pod_name: str,
     tail: int = 200,
     current_user: str = Depends(get_current_user)
 ):
-    logs = k8s.get_pod_logs(name=pod_name, namespace=namespace, tail_lines=tail)
-    return {"logs": logs}
+    logs = await _call("get_pod_logs", name=pod_name, namespace=namespace, tail_lines=tail)
+    return FastJSONResponse({"logs": logs})
+
+
+@router.get("/metrics/logs/search")
+async def search_pod_logs(
+    namespace: str,
+    pattern: str,
+    selector: Optional[str] = None,
+    deployment: Optional[str] = None,
+    regex: bool = False,
+    ignore_case: bool = False,
+    context: int = 0,
+    tail: int = LOG_SEARCH_TAIL,
+    since_seconds: Optional[int] = None,
+    limit: int = 1000,
+    current_user: str = Depends(get_current_user)
+):
+    """Search the logs of every container of the selected pods, in one namespace or all, streaming matches as NDJSON"""
+    if not selector and not deployment:
+        raise HTTPException(status_code=400, detail="Either selector or deployment is required")
+    if deployment and namespace == "all":
+        raise HTTPException(status_code=400, detail="A deployment is looked up in one namespace, not all")
+    if not pattern:
+        raise HTTPException(status_code=400, detail="pattern is required")
+    try:
+        matcher = compile_pattern(pattern, regex, ignore_case)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pattern: {e}")
+    context = min(max(context, 0), MAX_CONTEXT)
+
+    k8s_async = get_k8s_async()
+    if k8s_async is not None:
+        try:
+            targets = await k8s_async.get_log_targets(namespace, selector, deployment)
+        except (AsyncApiError, httpx.HTTPError) as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        stream = lambda ns, pod, container: k8s_async.stream_pod_log(pod, ns, container, tail, since_seconds)
+    else:
+        k8s = get_k8s()
+        if not k8s.is_connected():
+            raise HTTPException(status_code=500, detail="Native K8s client not configured.")
+        try:
+            targets = await run_in_threadpool(k8s.get_log_targets, namespace, selector, deployment)
+        except ApiException as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        stream = lambda ns, pod, container: k8s.stream_pod_log(pod, ns, container, tail, since_seconds)
+
+    if len(targets) > LOG_SEARCH_MAX_TARGETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Selector matches {len(targets)} containers, more than the limit of {LOG_SEARCH_MAX_TARGETS}",
+        )
+    return stream_ndjson(search_logs(targets, stream, matcher, context, max(limit, 1)))
 
 
 @router.get("/metrics/events")
-def list_events(
+async def list_events(
     namespace: str = "all",
     current_user: str = Depends(get_current_user)
 ):
-    data = k8s.get_events(namespace)
-    if isinstance(data, dict) and "error" in data:
-        raise HTTPException(status_code=500, detail=data["error"])
-    return {"events": data}
+    return await _list_response(f"events:{namespace}", "events", "get_events", namespace)
 
 class ScaleRequest(BaseModel):
     replicas: int
 
 @router.delete("/metrics/pods/{namespace}/{pod_name}")
 def delete_pod(namespace: str, pod_name: str, current_user: str = Depends(get_current_user)):
-    data = k8s.delete_pod(pod_name, namespace)
+    data = get_k8s().delete_pod(pod_name, namespace)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
+    _invalidate_lists()
     return data
 
 @router.post("/metrics/deployments/{namespace}/{deployment_name}/restart")
 def restart_deployment(namespace: str, deployment_name: str, current_user: str = Depends(get_current_user)):
-    data = k8s.restart_deployment(deployment_name, namespace)
+    data = get_k8s().restart_deployment(deployment_name, namespace)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
+    _invalidate_lists()
     return data
 
 @router.post("/metrics/deployments/{namespace}/{deployment_name}/scale")
 def scale_deployment(namespace: str, deployment_name: str, req: ScaleRequest, current_user: str = Depends(get_current_user)):
-    data = k8s.scale_deployment(deployment_name, req.replicas, namespace)
+    data = get_k8s().scale_deployment(deployment_name, req.replicas, namespace)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
+    _invalidate_lists()
     return data
 
+@router.get("/metrics/deployments/{namespace}/{deployment_name}/rollout")
+async def watch_deployment_rollout(
+    namespace: str,
+    deployment_name: str,
+    timeout: int = ROLLOUT_WATCH_TIMEOUT,
+    current_user: str = Depends(get_current_user)
+):
+    """Stream a Deployment's rollout progress as server-sent events until it completes or stalls"""
+    k8s_async = get_k8s_async()
+    if k8s_async is None:
+        raise HTTPException(status_code=503, detail="Rollout watch needs the async Kubernetes client (K8S_ASYNC=true).")
+    try:
+        await k8s_async.get_deployment(deployment_name, namespace)
+    except AsyncApiError as e:
+        raise HTTPException(status_code=404 if e.status == 404 else 500, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    timeout = min(max(timeout, 1), ROLLOUT_WATCH_TIMEOUT)
+    return stream_sse(watch_rollout(k8s_async, namespace, deployment_name, timeout))
+
 @router.get("/metrics/pods/{namespace}/{pod_name}/details")
-def get_pod_details(namespace: str, pod_name: str, current_user: str = Depends(get_current_user)):
-    data = k8s.get_pod_details(pod_name, namespace)
+async def get_pod_details(namespace: str, pod_name: str, current_user: str = Depends(get_current_user)):
+    data = await _call("get_pod_details", pod_name, namespace)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
-    return data
+    return FastJSONResponse(data)
+
+
+class BulkOperation(BaseModel):
+    action: str  # restart | scale | delete_pod | patch_resources
+    namespace: str
+    name: str
+    replicas: Optional[int] = None
+    cpu_limit: Optional[str] = None
+    memory_limit: Optional[str] = None
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation]
+    concurrency: int = 4
+    rate: float = 5.0  # operations started per second
+    dry_run: bool = False
+
+BULK_ACTIONS = {
+    "restart": lambda k8s, op, dry_run: k8s.restart_deployment(op.name, op.namespace, dry_run=dry_run),
+    "scale": lambda k8s, op, dry_run: (
+        k8s.scale_deployment(op.name, op.replicas, op.namespace, dry_run=dry_run)
+        if op.replicas is not None else {"error": "replicas is required for scale"}
+    ),
+    "delete_pod": lambda k8s, op, dry_run: k8s.delete_pod(op.name, op.namespace, dry_run=dry_run),
+    "patch_resources": lambda k8s, op, dry_run: k8s.patch_deployment_resources(
+        name=op.name, namespace=op.namespace, cpu_limit=op.cpu_limit, memory_limit=op.memory_limit, dry_run=dry_run
+    ),
+}
+
+@router.post("/metrics/bulk")
+def bulk_actions(req: BulkRequest, current_user: str = Depends(get_current_user)):
+    """Run many restart/scale/delete/patch operations and stream per-item results as NDJSON."""
+    if len(req.operations) > BULK_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_OPERATIONS} operations per request")
+    unknown = sorted({op.action for op in req.operations} - BULK_ACTIONS.keys())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown actions: {', '.join(unknown)}")
+    k8s = get_k8s()
+    if not k8s.is_connected():
+        raise HTTPException(status_code=500, detail="Native K8s client not configured.")
+
+    concurrency = max(1, min(req.concurrency, BULK_MAX_CONCURRENCY))
+    rate = min(req.rate, BULK_MAX_RATE) if req.rate > 0 else BULK_MAX_RATE
+    logger.info(f"{current_user} started bulk run: {len(req.operations)} ops, dry_run={req.dry_run}")
+
+    def execute(op):
+        return BULK_ACTIONS[op.action](k8s, op, req.dry_run)
+
+    def results():
+        succeeded = failed = 0
+        for index, data in run_bulk(req.operations, execute, concurrency, rate):
+            op = req.operations[index]
+            ok = not (isinstance(data, dict) and "error" in data)
+            succeeded += ok
+            failed += not ok
+            item = {
+                "index": index,
+                "action": op.action,
+                "namespace": op.namespace,
+                "name": op.name,
+                "success": ok,
+                "dry_run": req.dry_run,
+            }
+            if ok:
+                item["message"] = data.get("message")
+            else:
+                item["error"] = data["error"]
+            yield item
+        if succeeded and not req.dry_run:
+            _invalidate_lists()
+        yield {"done": True, "total": len(req.operations), "succeeded": succeeded, "failed": failed, "dry_run": req.dry_run}
+
+    return stream_ndjson(results())
@@ -1,20 +1,92 @@
-from fastapi import APIRouter, Depends
-from services.prometheus_client import PromClient
+import functools
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from services.registry import get_prom, get_prom_fleet
+from services import materializer, rollup
+from services.rollup import DASHBOARD_QUERIES
+from services.prometheus_client import check_range, parse_duration
+from services.capabilities import TEMPERATURE_QUERIES, get_capabilities, panel_available
 from api.auth import get_current_user
+from api.responses import FastJSONResponse, snapshot_response
 
 router = APIRouter()
-client = PromClient()
+
+# The Overview page's default view: the last hour at a 15s step, refreshed every 15s
+DEFAULT_WINDOW = 3600
+DEFAULT_STEP = '15s'
+OVERVIEW_REFRESH = 15
+# A request ending this close to now still counts as the default view
+DEFAULT_VIEW_SLACK = 30
+
+def _cluster_prom(cluster):
+    """PromClient of a selected cluster, or None for the primary Prometheus.
+
+    Overview panels are single-series, so a fleet is viewed one cluster at a time.
+    """
+    if not cluster:
+        return None
+    try:
+        return get_prom_fleet().client(cluster)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _chart(series, start, end, step, prom=None):
+    """Long windows come from the local rollup store when it covers them.
+
+    Rollups and discovered capabilities describe the primary Prometheus only.
+    """
+    if prom is not None:
+        return prom.query_range_for_chart(DASHBOARD_QUERIES[series], start=start, end=end, step=step)
+    points = rollup.read_chart(series, start, end, step)
+    if points is not None:
+        return points
+    if not panel_available(series):
+        return []
+    return get_prom().query_range_for_chart(DASHBOARD_QUERIES[series], start=start, end=end, step=step)
+
+def _is_default_view(start, end, step):
+    if step != DEFAULT_STEP:
+        return False
+    if start is None and end is None:
+        return True
+    return (
+        start is not None and end is not None
+        and end - start == DEFAULT_WINDOW
+        and abs(time.time() - end) <= DEFAULT_VIEW_SLACK
+    )
+
+def _served(view, compute):
+    """Answer from the view's materialized snapshot when there is one."""
+    snap = materializer.snapshot(view)
+    if snap is not None:
+        return snapshot_response(*snap)
+    return FastJSONResponse(compute())
+
+def _chart_view(series, start, end, step, cluster=None):
+    try:
+        check_range(start, end, parse_duration(step))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    prom = _cluster_prom(cluster)
+    if prom is not None:
+        return FastJSONResponse(_chart(series, start, end, step, prom))
+    if _is_default_view(start, end, step):
+        return _served(f"overview:{series}", lambda: _chart(series, start, end, step))
+    return FastJSONResponse(_chart(series, start, end, step))
 
 @router.get("/metrics/cpu")
 def cpu_usage(
     current_user: str = Depends(get_current_user),
     start: int = None,
     end: int = None,
-    step: str = '15s'
+    step: str = '15s',
+    cluster: Optional[str] = None
 ):
     try:
-        q = '100 - (avg by(instance)(irate(node_cpu_seconds_total{mode="idle"}[1m])) * 100)'
-        return client.query_range_for_chart(q, start=start, end=end, step=step)
+        return _chart_view("cpu", start, end, step, cluster)
+    except HTTPException:
+        raise
     except Exception:
         return []
 
@@ -23,11 +95,13 @@ def memory_usage(
     current_user: str = Depends(get_current_user),
     start: int = None,
     end: int = None,
-    step: str = '15s'
+    step: str = '15s',
+    cluster: Optional[str] = None
 ):
     try:
-        q = '(1 - (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes)) * 100'
-        return client.query_range_for_chart(q, start=start, end=end, step=step)
+        return _chart_view("memory", start, end, step, cluster)
+    except HTTPException:
+        raise
     except Exception:
         return []
 
@@ -36,16 +110,13 @@ def disk_usage(
     current_user: str = Depends(get_current_user),
     start: int = None,
     end: int = None,
-    step: str = '15s'
+    step: str = '15s',
+    cluster: Optional[str] = None
 ):
     try:
-        q = """
-        100 - (
-            node_filesystem_free_bytes{fstype!~"tmpfs|fuse.lxcfs|overlay"} /
-            node_filesystem_size_bytes{fstype!~"tmpfs|fuse.lxcfs|overlay"} * 100
-        )
-        """
-        return client.query_range_for_chart(q, start=start, end=end, step=step)
+        return _chart_view("disk", start, end, step, cluster)
+    except HTTPException:
+        raise
     except Exception:
         return []
 
@@ -54,11 +125,13 @@ def network_rx(
     current_user: str = Depends(get_current_user),
     start: int = None,
     end: int = None,
-    step: str = '15s'
+    step: str = '15s',
+    cluster: Optional[str] = None
 ):
     try:
-        q = 'irate(node_network_receive_bytes_total{device!="lo"}[1m])'
-        return client.query_range_for_chart(q, start=start, end=end, step=step)
+        return _chart_view("network_rx", start, end, step, cluster)
+    except HTTPException:
+        raise
     except Exception:
         return []
 
@@ -67,19 +140,22 @@ def network_tx(
     current_user: str = Depends(get_current_user),
     start: int = None,
     end: int = None,
-    step: str = '15s'
+    step: str = '15s',
+    cluster: Optional[str] = None
 ):
     try:
-        q = 'irate(node_network_transmit_bytes_total{device!="lo"}[1m])'
-        return client.query_range_for_chart(q, start=start, end=end, step=step)
+        return _chart_view("network_tx", start, end, step, cluster)
+    except HTTPException:
+        raise
     except Exception:
         return []
 
-@router.get("/metrics/uptime")
-def system_uptime(current_user: str = Depends(get_current_user)):
+def uptime_summary(prom=None):
     q = 'node_time_seconds - node_boot_time_seconds'
+    if prom is None and not panel_available("uptime"):
+        return {"uptime": "N/A", "seconds": 0}
     try:
-        res = client.query(q)
+        res = (prom or get_prom()).query(q)
         uptime_seconds = float(res["data"]["result"][0]["value"][1])
         days = int(uptime_seconds // 86400)
         hours = int((uptime_seconds % 86400) // 3600)
@@ -88,12 +164,14 @@ def system_uptime(current_user: str = Depends(get_current_user)):
     except Exception:
         return {"uptime": "N/A", "seconds": 0}
 
-@router.get("/metrics/load")
-def load_average(current_user: str = Depends(get_current_user)):
+def load_summary(prom=None):
+    if prom is None and not panel_available("load"):
+        return {"load1": 0, "load5": 0, "load15": 0}
+    prom = prom or get_prom()
     try:
-        load1 = client.query('node_load1')["data"]["result"][0]["value"][1]
-        load5 = client.query('node_load5')["data"]["result"][0]["value"][1]
-        load15 = client.query('node_load15')["data"]["result"][0]["value"][1]
+        load1 = prom.query('node_load1')["data"]["result"][0]["value"][1]
+        load5 = prom.query('node_load5')["data"]["result"][0]["value"][1]
+        load15 = prom.query('node_load15')["data"]["result"][0]["value"][1]
         return {
             "load1": round(float(load1), 2),
             "load5": round(float(load5), 2),
@@ -102,31 +180,33 @@ def load_average(current_user: str = Depends(get_current_user)):
     except Exception:
         return {"load1": 0, "load5": 0, "load15": 0}
 
-@router.get("/metrics/processes")
-def process_count(current_user: str = Depends(get_current_user)):
+def process_summary(prom=None):
+    if prom is None and not panel_available("processes"):
+        return {"running": 0, "blocked": 0, "total": 0}
+    prom = prom or get_prom()
     try:
-        res = client.query('node_procs_running')
+        res = prom.query('node_procs_running')
         running = int(float(res["data"]["result"][0]["value"][1]))
-        res_blocked = client.query('node_procs_blocked')
+        res_blocked = prom.query('node_procs_blocked')
         blocked = int(float(res_blocked["data"]["result"][0]["value"][1]))
         return {"running": running, "blocked": blocked, "total": running + blocked}
     except Exception:
         return {"running": 0, "blocked": 0, "total": 0}
 
-@router.get("/metrics/temperature")
-def system_temperature(current_user: str = Depends(get_current_user)):
+def temperature_summary(prom=None):
     """Get system temperature if available"""
     try:
-        queries = [
-            'node_hwmon_temp_celsius{label="Package id 0"}',
-            'node_hwmon_temp_celsius{label="core_0"}',
-            'node_hwmon_temp_celsius{sensor="temp1"}',
-            'avg(node_hwmon_temp_celsius)'
-        ]
-        
+        caps = get_capabilities() if prom is None else None
+        if caps is None:
+            # Discovery unavailable: probe the candidates in order
+            queries = [q for _, _, q in TEMPERATURE_QUERIES]
+        else:
+            query = caps.temperature_query()
+            queries = [query] if query else []
+
         for q in queries:
             try:
-                res = client.query(q)
+                res = (prom or get_prom()).query(q)
                 if res.get("data", {}).get("result"):
                     temp = float(res["data"]["result"][0]["value"][1])
                     return {"value": round(temp, 1), "status": "Active", "available": True}
@@ -136,6 +216,42 @@ def system_temperature(current_user: str = Depends(get_current_user)):
         return {"value": 0, "status": "No Sensors", "available": False}
     except Exception as e:
         return {"value": 0, "status": "Error", "available": False, "details": str(e)}
+
+@router.get("/metrics/uptime")
+def system_uptime(cluster: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    prom = _cluster_prom(cluster)
+    if prom is not None:
+        return FastJSONResponse(uptime_summary(prom))
+    return _served("overview:uptime", uptime_summary)
+
+@router.get("/metrics/load")
+def load_average(cluster: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    prom = _cluster_prom(cluster)
+    if prom is not None:
+        return FastJSONResponse(load_summary(prom))
+    return _served("overview:load", load_summary)
+
+@router.get("/metrics/processes")
+def process_count(cluster: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    prom = _cluster_prom(cluster)
+    if prom is not None:
+        return FastJSONResponse(process_summary(prom))
+    return _served("overview:processes", process_summary)
+
+@router.get("/metrics/temperature")
+def system_temperature(cluster: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    prom = _cluster_prom(cluster)
+    if prom is not None:
+        return FastJSONResponse(temperature_summary(prom))
+    return _served("overview:temperature", temperature_summary)
+
+for _series in ("cpu", "memory", "disk", "network_rx", "network_tx"):
+    materializer.register(f"overview:{_series}", OVERVIEW_REFRESH, functools.partial(_chart, _series, None, None, DEFAULT_STEP))
+materializer.register("overview:uptime", OVERVIEW_REFRESH, uptime_summary)
+materializer.register("overview:load", OVERVIEW_REFRESH, load_summary)
+materializer.register("overview:processes", OVERVIEW_REFRESH, process_summary)
+materializer.register("overview:temperature", OVERVIEW_REFRESH, temperature_summary)
+
 @router.get("/metrics/system")
 def system_check(current_user: str = Depends(get_current_user)):
     """Simple endpoint for token validation"""
@@ -0,0 +1,132 @@
+import itertools
+import logging
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Number of array items encoded per streamed chunk
+STREAM_BATCH_SIZE = 256
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    As the app's default_response_class it only replaces the final rendering:
+    FastAPI still runs jsonable_encoder over any plain dict or list a route
+    returns. Routes return this directly to skip that pass.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def snapshot_response(content, age):
+    """Serve materialized data, telling the client how old it is."""
+    return FastJSONResponse(content, headers={"X-Snapshot-Age": f"{age:.1f}"})
+
+
+def prefetch(iterable):
+    """Pull the first item eagerly so upstream errors surface before the response starts."""
+    it = iter(iterable)
+    try:
+        first = next(it)
+    except StopIteration:
+        return iter(())
+    return itertools.chain((first,), it)
+
+
+def _encode_array(items, head: bytes, tail: bytes):
+    yield head
+    sep = b""
+    batch = []
+    try:
+        for item in items:
+            batch.append(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield sep + b",".join(batch)
+                sep = b","
+                batch = []
+        if batch:
+            yield sep + b",".join(batch)
+    except Exception as e:
+        # Headers are already sent; all we can do is stop and log
+        logger.error(f"Stream aborted: {e}")
+        raise
+    yield tail
+
+
+async def _aencode_array(items, head: bytes, tail: bytes):
+    yield head
+    sep = b""
+    batch = []
+    try:
+        async for item in items:
+            batch.append(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield sep + b",".join(batch)
+                sep = b","
+                batch = []
+        if batch:
+            yield sep + b",".join(batch)
+    except Exception as e:
+        logger.error(f"Stream aborted: {e}")
+        raise
+    yield tail
+
+
+def stream_json_list(key: str, items, extra: dict = None):
+    """Stream {"<key>": [items...], **extra} without materializing the encoded body.
+
+    items may be a regular or an async iterable.
+    """
+    head = b"{" + orjson.dumps(key) + b":["
+    tail = b"]"
+    if extra:
+        tail += b"," + orjson.dumps(extra)[1:-1]
+    tail += b"}"
+    encode = _aencode_array if hasattr(items, "__aiter__") else _encode_array
+    return StreamingResponse(encode(items, head, tail), media_type="application/json")
+
+
+def stream_prom_matrix(res: dict):
+    """Stream a Prometheus query_range response series by series."""
+    data = res.get("data") or {}
+    meta = {k: v for k, v in res.items() if k != "data"}
+    meta.setdefault("status", "success")
+    head = orjson.dumps(meta)[:-1] + b',"data":{"resultType":' + orjson.dumps(data.get("resultType", "matrix")) + b',"result":['
+    return StreamingResponse(_encode_array(data.get("result") or [], head, b"]}}"), media_type="application/json")
+
+
+def stream_ndjson(items):
+    """Stream one JSON document per line, flushing each as soon as it is produced.
+
+    items may be a regular or an async iterable.
+    """
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+
+    def body():
+        for item in items:
+            yield orjson.dumps(item, option=option)
+
+    async def abody():
+        async for item in items:
+            yield orjson.dumps(item, option=option)
+
+    return StreamingResponse(abody() if hasattr(items, "__aiter__") else body(), media_type="application/x-ndjson")
+
+
+def stream_sse(events):
+    """Stream server-sent events from an async iterable of dicts named by their "event" key.
+
+    None items become keepalive comments.
+    """
+    async def body():
+        async for item in events:
+            if item is None:
+                yield b": keepalive\n\n"
+            else:
+                yield b"event: " + item["event"].encode() + b"\ndata: " + orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+    # X-Accel-Buffering stops nginx-style proxies from holding events back
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
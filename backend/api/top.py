@@ -0,0 +1,199 @@
+import heapq
+import re
+from fastapi import APIRouter, Depends, HTTPException
+from kubernetes.client.rest import ApiException
+from services.registry import get_k8s, get_prom
+from services.promql import grouped_query
+from api.auth import get_current_user
+from api.responses import FastJSONResponse
+
+router = APIRouter()
+
+NAMESPACE_RE = re.compile(r"^[a-z0-9]([-a-z0-9]*[a-z0-9])?$")
+CONTAINER_FILTER = 'container!="POD", container!=""'
+
+SORT_KEYS = {
+    "cpu": lambda row: row["cpu_cores"] or 0,
+    "memory": lambda row: row["memory_bytes"] or 0,
+    "name": lambda row: row["name"] or "",
+}
+
+
+def pod_usage_query(namespace=None):
+    selector = CONTAINER_FILTER + (f', namespace="{namespace}"' if namespace else "")
+    return grouped_query([
+        ("cpu", f"rate(container_cpu_usage_seconds_total{{{selector}}}[5m])"),
+        ("memory", f"container_memory_working_set_bytes{{{selector}}}"),
+    ], "namespace, pod")
+
+
+def namespace_usage_query():
+    return grouped_query([
+        ("cpu", f"rate(container_cpu_usage_seconds_total{{{CONTAINER_FILTER}}}[5m])"),
+        ("memory", f"container_memory_working_set_bytes{{{CONTAINER_FILTER}}}"),
+    ], "namespace")
+
+
+def node_usage_query():
+    # id="/" is the root cgroup, i.e. whole-node usage as seen by cAdvisor
+    return grouped_query([
+        ("cpu", 'rate(container_cpu_usage_seconds_total{id="/"}[5m])'),
+        ("memory", 'container_memory_working_set_bytes{id="/"}'),
+        ("cpu_allocatable", 'kube_node_status_allocatable{resource="cpu"}'),
+        ("memory_allocatable", 'kube_node_status_allocatable{resource="memory"}'),
+    ], "node")
+
+
+def usage_by_key(res, key_labels):
+    """One pass over a grouped vector: {key: {resource: value}}."""
+    usage = {}
+    for item in res.get("data", {}).get("result", []):
+        metric = item.get("metric", {})
+        key = tuple(metric.get(label, "") for label in key_labels)
+        usage.setdefault(key, {})[metric.get("resource")] = float(item["value"][1])
+    return usage
+
+
+def join_pods(pods, usage):
+    empty = {}
+    rows = []
+    for p in pods:
+        u = usage.get((p.namespace, p.name), empty)
+        rows.append({
+            "name": p.name,
+            "namespace": p.namespace,
+            "status": p.status,
+            "node": p.node,
+            "restarts": p.restarts,
+            "cpu_cores": u.get("cpu"),
+            "memory_bytes": u.get("memory"),
+        })
+    return rows
+
+
+def join_namespaces(namespaces, pods, usage):
+    pod_counts = {}
+    for p in pods:
+        pod_counts[p.namespace] = pod_counts.get(p.namespace, 0) + 1
+    empty = {}
+    rows = []
+    for ns in namespaces:
+        u = usage.get((ns["name"],), empty)
+        rows.append({
+            "name": ns["name"],
+            "status": ns["status"],
+            "pods": pod_counts.get(ns["name"], 0),
+            "cpu_cores": u.get("cpu"),
+            "memory_bytes": u.get("memory"),
+        })
+    return rows
+
+
+def _percent(used, total):
+    return round(used / total * 100, 1) if used is not None and total else None
+
+
+def join_nodes(nodes, pods, usage):
+    pod_counts = {}
+    for p in pods:
+        if p.node:
+            pod_counts[p.node] = pod_counts.get(p.node, 0) + 1
+    empty = {}
+    rows = []
+    for n in nodes:
+        u = usage.get((n["name"],), empty)
+        rows.append({
+            "name": n["name"],
+            "status": n["status"],
+            "roles": n["roles"],
+            "pods": pod_counts.get(n["name"], 0),
+            "cpu_cores": u.get("cpu"),
+            "cpu_percent": _percent(u.get("cpu"), u.get("cpu_allocatable")),
+            "memory_bytes": u.get("memory"),
+            "memory_percent": _percent(u.get("memory"), u.get("memory_allocatable")),
+        })
+    return rows
+
+
+def sort_rows(rows, sort, order, limit):
+    """Server-side ordering; a bounded heap is used when only the top N are wanted."""
+    key = SORT_KEYS[sort]
+    reverse = order == "desc"
+    if limit and limit < len(rows):
+        pick = heapq.nlargest if reverse else heapq.nsmallest
+        return pick(limit, rows, key=key)
+    return sorted(rows, key=key, reverse=reverse)
+
+
+def _validate(sort, order, namespace=None):
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    if namespace and namespace != "all" and not NAMESPACE_RE.match(namespace):
+        raise HTTPException(status_code=400, detail="Invalid namespace")
+
+
+def _query(q):
+    try:
+        return get_prom().query(q)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prometheus query failed: {e}")
+
+
+def _pods(namespace="all"):
+    k8s = get_k8s()
+    if not k8s.is_connected():
+        raise HTTPException(status_code=500, detail="Native K8s client not configured.")
+    try:
+        return list(k8s.iter_pods(namespace))
+    except ApiException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _inventory(data):
+    if isinstance(data, dict) and "error" in data:
+        raise HTTPException(status_code=500, detail=data["error"])
+    return data
+
+
+@router.get("/metrics/top/pods")
+def top_pods(
+    namespace: str = "all",
+    sort: str = "cpu",
+    order: str = "desc",
+    limit: int = None,
+    current_user: str = Depends(get_current_user)
+):
+    _validate(sort, order, namespace)
+    usage = usage_by_key(_query(pod_usage_query(None if namespace == "all" else namespace)), ("namespace", "pod"))
+    rows = join_pods(_pods(namespace), usage)
+    return FastJSONResponse({"pods": sort_rows(rows, sort, order, limit), "total": len(rows)})
+
+
+@router.get("/metrics/top/namespaces")
+def top_namespaces(
+    sort: str = "cpu",
+    order: str = "desc",
+    limit: int = None,
+    current_user: str = Depends(get_current_user)
+):
+    _validate(sort, order)
+    usage = usage_by_key(_query(namespace_usage_query()), ("namespace",))
+    namespaces = _inventory(get_k8s().get_namespaces())
+    rows = join_namespaces(namespaces, _pods(), usage)
+    return FastJSONResponse({"namespaces": sort_rows(rows, sort, order, limit), "total": len(rows)})
+
+
+@router.get("/metrics/top/nodes")
+def top_nodes(
+    sort: str = "cpu",
+    order: str = "desc",
+    limit: int = None,
+    current_user: str = Depends(get_current_user)
+):
+    _validate(sort, order)
+    usage = usage_by_key(_query(node_usage_query()), ("node",))
+    nodes = _inventory(get_k8s().get_nodes())
+    rows = join_nodes(nodes, _pods(), usage)
+    return FastJSONResponse({"nodes": sort_rows(rows, sort, order, limit), "total": len(rows)})
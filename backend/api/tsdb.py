@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from services.registry import get_cache, get_prom, get_prom_fleet
+from services.capabilities import panel_available
+from services.prometheus_client import check_range, parse_duration
+from services.promql import estimate_cost
+from api.auth import get_current_user
+from api.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# TSDB stats only change as series come and go, so workers share them for a while
+TSDB_CACHE_TTL = float(os.getenv("TSDB_CACHE_TTL", "60"))
+MAX_TOP_LIMIT = 100
+MAX_CHURN_HOURS = 24 * 14
+
+CHURN_QUERIES = {
+    "created": 'sum(rate(prometheus_tsdb_head_series_created_total[5m]))',
+    "removed": 'sum(rate(prometheus_tsdb_head_series_removed_total[5m]))',
+    "head_series": 'sum(prometheus_tsdb_head_series)',
+}
+
+
+@router.get("/metrics/tsdb/status")
+def tsdb_status(limit: int = 10, current_user: str = Depends(get_current_user)):
+    """Head stats plus top metrics, labels and label/value pairs by series count"""
+    limit = min(max(limit, 1), MAX_TOP_LIMIT)
+    prom = get_prom()
+    try:
+        data = get_cache().get_or_set(f"prom:{prom.base}:tsdb:{limit}", TSDB_CACHE_TTL, lambda: prom.tsdb_status(limit))
+    except Exception as e:
+        logger.error(f"TSDB status error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse(data)
+
+
+@router.get("/metrics/tsdb/churn")
+def tsdb_churn(hours: int = 24, step: str = '5m', current_user: str = Depends(get_current_user)):
+    """Series created/removed per second and head series over the last `hours`"""
+    if not panel_available("tsdb_churn"):
+        # Prometheus doesn't scrape itself, so its own TSDB metrics are missing
+        return FastJSONResponse({"available": False, **{name: [] for name in CHURN_QUERIES}})
+    hours = min(max(hours, 1), MAX_CHURN_HOURS)
+    try:
+        step_seconds = parse_duration(step)
+        check_range(None, None, step_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Align the window to the step so repeated opens share one cached result
+    end = int(time.time() // step_seconds * step_seconds)
+    start = end - hours * 3600
+    prom = get_prom()
+
+    def load():
+        charts = {name: prom.query_range_for_chart(q, start=start, end=end, step=step) for name, q in CHURN_QUERIES.items()}
+        return {"available": True, **charts}
+    return FastJSONResponse(get_cache().get_or_set(f"prom:{prom.base}:churn:{hours}:{step}:{end}", TSDB_CACHE_TTL, load))
+
+
+@router.get("/metrics/tsdb/query_cost")
+def query_cost(
+    query: str,
+    current_user: str = Depends(get_current_user),
+    start: int = None,
+    end: int = None,
+    step: str = '15s',
+    cluster: Optional[str] = None
+):
+    """How many series an Explorer query touches, per selector, and the samples it yields over the window,
+    summed over the selected clusters like query_range_raw"""
+    if not query:
+        raise HTTPException(status_code=400, detail="Query parameter is required")
+    if end is None:
+        end = int(time.time())
+    if start is None:
+        start = end - 3600
+    try:
+        step_seconds = parse_duration(step)
+        check_range(start, end, step_seconds)
+        prom = get_prom_fleet().select(cluster)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        cost = estimate_cost(prom, query, start, end, step_seconds)
+    except Exception as e:
+        logger.error(f"Query cost error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse({"query": query, **cost})
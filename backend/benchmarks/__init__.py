@@ -0,0 +1 @@
+"""Micro-benchmarks of the pure transformation hot paths; run with `python -m benchmarks`."""
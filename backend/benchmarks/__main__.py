@@ -0,0 +1,157 @@
+"""Micro-benchmarks of the backend's pure transformation code.
+
+    python -m benchmarks                      # every case at its default sizes, compared to the baseline
+    python -m benchmarks --case get_pods --sizes 1000,10000
+    python -m benchmarks --save               # record the results as this machine's baseline
+
+Each case reports the best of --repeat timed runs and the peak memory of one
+traced run. The baseline is a local, untracked benchmarks/baseline.json, since
+timings only compare on the same machine. Exits 1 when a case is slower or
+uses more memory than its baseline by more than --tolerance; a baseline
+recorded on another machine or Python version is only reported against.
+"""
+import argparse
+import gc
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import orjson
+from api.anomalies import anomaly_report
+from api.optimization import optimization_report
+from services.k8s_client import newest_pod_events, project_event, project_pod, project_pod_details
+from services.prometheus_client import chart_points
+from benchmarks import fixtures
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# name: (fixture for a size, transformation under test)
+CASES = {
+    "optimization_report": (
+        fixtures.optimization_responses,
+        lambda responses: optimization_report(*responses),
+    ),
+    # A page as K8sClient.get_pods handles it: parse, project, convert to dicts
+    "get_pods": (
+        fixtures.pod_list_page,
+        lambda page: [project_pod(item)._asdict() for item in orjson.loads(page).get("items") or ()],
+    ),
+    "get_events": (
+        fixtures.event_items,
+        lambda items: [r._asdict() for r in newest_pod_events(project_event(item) for item in items)],
+    ),
+    "get_pod_details": (
+        fixtures.pod_items,
+        lambda pods: [project_pod_details(pod) for pod in pods],
+    ),
+    # Sizes are points of the charted series
+    "query_range_for_chart": (
+        fixtures.matrix_response,
+        chart_points,
+    ),
+    # Sizes are series of an hour at 1m steps
+    "anomaly_report": (
+        fixtures.usage_range_response,
+        lambda res: anomaly_report(res, "pods", 1700000000, 1700003600, 60, 20),
+    ),
+}
+# Cases whose default sizes differ from DEFAULT_SIZES
+CASE_SIZES = {
+    "anomaly_report": [1000, 5000, 20000],
+}
+
+
+def measure(case, size, repeat):
+    setup, run = CASES[case]
+    data = setup(size)
+    best = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(data)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        run(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_kib": peak // 1024}
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE):
+        return {"results": {}}
+    with open(BASELINE, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _environment():
+    """What a baseline's timings are only comparable to."""
+    return {"host": platform.node(), "machine": platform.machine(), "python": platform.python_version()}
+
+
+def _change(current, base):
+    return f"{(current / base - 1) * 100:+.0f}%" if base else "n/a"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="run only this case (repeatable)")
+    parser.add_argument("--sizes", help="comma-separated fixture sizes (default: 1000,10000,100000)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case; the best one counts")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="allowed ratio to the baseline before failing")
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    cases = args.case or list(CASES)
+    baseline = load_baseline()
+    here = _environment()
+    recorded = {key: baseline.get(key) for key in here}
+    foreign = bool(baseline["results"]) and recorded != here
+    if foreign:
+        print(f"warning: baseline was recorded on {recorded}, this is {here}; not failing on regressions", file=sys.stderr)
+
+    regressions = []
+    results = {}
+    for case in cases:
+        if args.sizes:
+            sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        else:
+            sizes = CASE_SIZES.get(case, DEFAULT_SIZES)
+        for size in sizes:
+            current = measure(case, size, max(args.repeat, 1))
+            results.setdefault(case, {})[str(size)] = current
+            base = baseline["results"].get(case, {}).get(str(size))
+            line = f"{case:<22} {size:>7}  {current['seconds'] * 1000:10.2f} ms  {current['peak_kib'] / 1024:8.1f} MiB"
+            if base:
+                line += f"   vs baseline {_change(current['seconds'], base['seconds']):>6} time {_change(current['peak_kib'], base['peak_kib']):>6} mem"
+                slower = current["seconds"] > base["seconds"] * args.tolerance
+                bigger = current["peak_kib"] > base["peak_kib"] * args.tolerance
+                if slower or bigger:
+                    line += "  REGRESSION"
+                    regressions.append(f"{case}@{size}")
+            print(line, flush=True)
+
+    if args.save:
+        for case, by_size in results.items():
+            baseline["results"].setdefault(case, {}).update(by_size)
+        baseline.update(_environment())
+        with open(BASELINE, "wb") as f:
+            f.write(orjson.dumps(baseline, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS) + b"\n")
+        print(f"baseline written to {BASELINE}")
+    elif regressions:
+        print(f"regressed beyond x{args.tolerance}: {', '.join(regressions)}", file=sys.stderr)
+        if not foreign:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Synthetic apiserver and Prometheus payloads shaped like the real ones.
+
+Every generator is seeded, so a size always yields the same fixture.
+"""
+import random
+import orjson
+
+NAMESPACES = [f"team-{i}" for i in range(40)]
+PHASES = ["Running"] * 8 + ["Pending", "Succeeded"]
+WAITING = ["CrashLoopBackOff", "ImagePullBackOff", "ContainerCreating"]
+
+
+def _timestamp(rng):
+    return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z"
+
+
+def _container_status(rng, name):
+    if rng.random() < 0.9:
+        state = {"running": {"startedAt": _timestamp(rng)}}
+    else:
+        state = {"waiting": {"reason": rng.choice(WAITING), "message": "back-off restarting failed container"}}
+    return {"name": name, "ready": "running" in state, "restartCount": rng.randint(0, 5), "state": state, "image": f"registry.local/{name}:1.0"}
+
+
+def pod_items(n, seed=1):
+    """Raw Pod objects as they appear in a PodList."""
+    rng = random.Random(seed)
+    pods = []
+    for i in range(n):
+        namespace = rng.choice(NAMESPACES)
+        app = f"app-{i % 500}"
+        containers = ["app"] + (["sidecar"] if i % 3 == 0 else [])
+        pods.append({
+            "metadata": {
+                "name": f"{app}-{rng.getrandbits(40):010x}-{rng.getrandbits(20):05x}",
+                "namespace": namespace,
+                "uid": f"{rng.getrandbits(128):032x}",
+                "creationTimestamp": _timestamp(rng),
+                "labels": {"app": app, "pod-template-hash": f"{rng.getrandbits(40):010x}"},
+                "annotations": {"kubectl.kubernetes.io/restartedAt": _timestamp(rng)},
+            },
+            "spec": {
+                "nodeName": f"node-{rng.randint(0, 199)}",
+                "containers": [
+                    {
+                        "name": c,
+                        "image": f"registry.local/{app}/{c}:1.{rng.randint(0, 40)}",
+                        "resources": {
+                            "requests": {"cpu": f"{rng.choice([50, 100, 250, 500])}m", "memory": f"{rng.choice([64, 128, 256, 512])}Mi"},
+                            "limits": {"cpu": "1", "memory": "1Gi"},
+                        },
+                    }
+                    for c in containers
+                ],
+            },
+            "status": {
+                "phase": rng.choice(PHASES),
+                "podIP": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                "hostIP": f"192.168.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                "startTime": _timestamp(rng),
+                "containerStatuses": [_container_status(rng, c) for c in containers],
+            },
+        })
+    return pods
+
+
+def pod_list_page(n, seed=1):
+    """A PodList response body, as _iter_raw receives it."""
+    return orjson.dumps({"kind": "PodList", "metadata": {"resourceVersion": "1"}, "items": pod_items(n, seed)})
+
+
+def event_items(n, seed=2):
+    """Raw Events; about two thirds involve pods."""
+    rng = random.Random(seed)
+    kinds = ["Pod", "Pod", "Deployment", "Pod", "ReplicaSet", "Node"]
+    return [
+        {
+            "metadata": {"name": f"event-{i}", "namespace": rng.choice(NAMESPACES)},
+            "type": rng.choice(["Normal", "Normal", "Warning"]),
+            "reason": rng.choice(["Pulled", "Created", "Started", "BackOff", "Killing", "Scheduled"]),
+            "message": f"Container image pulled in {rng.random() * 10:.3f}s",
+            "involvedObject": {"kind": rng.choice(kinds), "name": f"app-{rng.randint(0, 499)}-{rng.getrandbits(32):08x}"},
+            "lastTimestamp": _timestamp(rng),
+            "count": rng.randint(1, 20),
+        }
+        for i in range(n)
+    ]
+
+
+def _vector(samples):
+    return {"status": "success", "data": {"resultType": "vector", "result": samples}}
+
+
+def optimization_responses(n, seed=3):
+    """The four per-pod instant query responses of the optimization report for n pods."""
+    rng = random.Random(seed)
+    pods = [(rng.choice(NAMESPACES), f"app-{i % 500}-{rng.getrandbits(40):010x}-{rng.getrandbits(20):05x}") for i in range(n)]
+
+    def vector(value):
+        return _vector([
+            {"metric": {"namespace": ns, "pod": pod}, "value": [1700000000.0, str(value())]}
+            for ns, pod in pods
+        ])
+
+    mib = 1024 * 1024
+    return (
+        vector(lambda: rng.choice([128, 256, 512, 1024]) * mib),
+        vector(lambda: rng.uniform(10, 600) * mib),
+        vector(lambda: rng.choice([0.1, 0.25, 0.5, 1.0])),
+        vector(lambda: rng.uniform(0.001, 0.8)),
+    )
+
+
+def matrix_response(points, series=1, seed=4, start=1700000000, step=15):
+    """A query_range response with `points` samples per series."""
+    rng = random.Random(seed)
+    return {
+        "status": "success",
+        "data": {
+            "resultType": "matrix",
+            "result": [
+                {
+                    "metric": {"instance": f"node-{s}:9100"},
+                    "values": [[start + i * step, f"{rng.uniform(0, 100):.4f}"] for i in range(points)],
+                }
+                for s in range(series)
+            ],
+        },
+    }
+
+
+def usage_range_response(n, points=61, seed=5, start=1700000000, step=60):
+    """A grouped pod CPU/memory/restarts query_range response with n series, about 1% of them misbehaving."""
+    rng = random.Random(seed)
+    levels = {"cpu": 0.25, "memory": 256 * 1024 * 1024, "restarts": 0.0}
+    result = []
+    for i in range(n):
+        resource = ("cpu", "memory", "restarts")[i % 3]
+        level = levels[resource] * rng.uniform(0.5, 2)
+        # Misbehaving series jump to a new level somewhere in the window
+        shift_at = rng.randrange(points) if rng.random() < 0.01 else points
+        values = []
+        for t in range(points):
+            value = level * rng.gauss(1, 0.05) * (3 if t >= shift_at else 1)
+            values.append([start + t * step, f"{value:.6g}"])
+        result.append({"metric": {"namespace": rng.choice(NAMESPACES), "pod": f"app-{i}", "resource": resource}, "values": values})
+    return {"status": "success", "data": {"resultType": "matrix", "result": result}}
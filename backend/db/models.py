@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Float, UniqueConstraint
 from db.database import Base
 
 class User(Base):
@@ -8,3 +8,48 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     must_change_password = Column(Boolean, default=True)
+
+class MetricRollup(Base):
+    """Downsampled aggregate of a built-in dashboard series over one time bucket."""
+    __tablename__ = "metric_rollups"
+    __table_args__ = (UniqueConstraint("series", "resolution", "bucket", name="uq_rollup_bucket"),)
+
+    id = Column(Integer, primary_key=True)
+    series = Column(String, nullable=False)
+    resolution = Column(Integer, nullable=False)  # bucket width in seconds
+    bucket = Column(Integer, nullable=False)      # bucket start, unix seconds
+    min = Column(Float)
+    max = Column(Float)
+    avg = Column(Float)
+    last = Column(Float)
+    count = Column(Integer)
+
+class AlertRule(Base):
+    """Threshold or rate-of-change rule over one of the rollup collector's series."""
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    series = Column(String, nullable=False)
+    kind = Column(String, nullable=False, default="threshold")  # threshold | ewma | rate
+    op = Column(String, nullable=False, default=">")
+    threshold = Column(Float, nullable=False)
+    window = Column(Integer, nullable=False, default=0)         # seconds; 0 = latest sample
+    for_seconds = Column(Integer, nullable=False, default=0)
+    enabled = Column(Boolean, default=True)
+    state = Column(String, nullable=False, default="ok")        # ok | firing
+    state_since = Column(Integer)
+    last_value = Column(Float)
+    last_evaluated = Column(Integer)
+
+class AlertEvent(Base):
+    """A firing or resolved transition of an AlertRule."""
+    __tablename__ = "alert_events"
+
+    id = Column(Integer, primary_key=True)
+    rule_id = Column(Integer, index=True, nullable=False)
+    rule_name = Column(String, nullable=False)
+    state = Column(String, nullable=False)      # firing | resolved
+    value = Column(Float)
+    threshold = Column(Float)
+    timestamp = Column(Integer, index=True, nullable=False)
@@ -5,32 +5,65 @@ from api.overview import router as overview_router
 from api.explorer import router as explorer_router
 from api.optimization import router as opt_router
 from api.auth_routes import router as auth_router
+from api.top import router as top_router
+from api.alerts import router as alerts_router
+from api.export import router as export_router
+from api.tsdb import router as tsdb_router
+from api.anomalies import router as anomalies_router
+from api.responses import FastJSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from db.init_db import init_db
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
+from services.rollup import rollup_job
+from services.materializer import materializer_job
+from services import registry
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+import asyncio
 import os
 
 load_dotenv()
 
-app = FastAPI(title="DevOps Monitoring Backend")
+SKIP_INIT_DB = os.getenv("SKIP_INIT_DB", "false").lower() == "true"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The container image seeds the database once before starting the workers
+    # (see Dockerfile); running uvicorn directly still initializes it here.
+    if not SKIP_INIT_DB:
+        await run_in_threadpool(init_db)
+    registry.mark_database_ready()
+    # Warm-up runs in the background; /readyz stays 503 until it completes
+    warm_up = asyncio.create_task(run_in_threadpool(registry.warm_up))
+    registry.probe_job.start()
+    rollup_job.start()
+    materializer_job.start()
+    yield
+    materializer_job.stop()
+    rollup_job.stop()
+    registry.probe_job.stop()
+    warm_up.cancel()
+    await registry.close_async()
+
+app = FastAPI(title="DevOps Monitoring Backend", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
-init_db()
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins = os.getenv("CORS_ORIGINS", "*").split(","),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Snapshot-Age"],
 )
 
 app.include_router(auth_router, prefix="/api")
@@ -38,6 +71,11 @@ app.include_router(overview_router, prefix="/api")
 app.include_router(explorer_router, prefix="/api")
 app.include_router(opt_router, prefix="/api")
 app.include_router(k8s_router, prefix="/api")
+app.include_router(top_router, prefix="/api")
+app.include_router(alerts_router, prefix="/api")
+app.include_router(export_router, prefix="/api")
+app.include_router(tsdb_router, prefix="/api")
+app.include_router(anomalies_router, prefix="/api")
 
 @app.get("/")
 def root():
@@ -50,8 +88,12 @@ def health():
 
 @app.get("/readyz")
 def ready():
-    """Readiness probe — is the app ready to serve traffic?"""
-    return {"status": "ready"}
+    """Readiness probe — warm-up finished and READY_REQUIRES reachable? Upstreams are probed in the
+    background and only READY_REQUIRES among them gate readiness."""
+    is_ready, checks = registry.readiness()
+    if not is_ready:
+        return JSONResponse(status_code=503, content={"status": "not ready", "checks": checks})
+    return {"status": "ready", "checks": checks}
 
 instrumentator = Instrumentator(should_group_status_codes=False)
 instrumentator.instrument(app).expose(app, endpoint="/metrics")
@@ -0,0 +1,169 @@
+import logging
+import math
+import operator
+import os
+from collections import deque
+from db.models import AlertEvent, AlertRule
+
+logger = logging.getLogger(__name__)
+
+ALERTS_ENABLED = os.getenv("ALERTS_ENABLED", "true").lower() == "true"
+ALERT_EVENT_RETENTION = int(os.getenv("ALERT_EVENT_RETENTION", str(30 * 86400)))
+
+OPS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class SlidingMean:
+    """Mean of the samples in the last `window` seconds, kept as a running sum."""
+
+    def __init__(self, window):
+        self.window = window
+        self.samples = deque()
+        self.total = 0.0
+
+    def update(self, ts, value):
+        self.samples.append((ts, value))
+        self.total += value
+        while len(self.samples) > 1 and self.samples[0][0] <= ts - self.window:
+            self.total -= self.samples.popleft()[1]
+        return self.total / len(self.samples)
+
+
+class Ewma:
+    """Exponentially weighted mean with a time constant of `window` seconds.
+
+    The weight adapts to the gap between samples, so a missed collection run
+    doesn't skew the average.
+    """
+
+    def __init__(self, window):
+        self.window = max(window, 1)
+        self.value = None
+        self.ts = None
+
+    def update(self, ts, value):
+        if self.value is None:
+            self.value = value
+        else:
+            alpha = 1 - math.exp(-(ts - self.ts) / self.window)
+            self.value += alpha * (value - self.value)
+        self.ts = ts
+        return self.value
+
+
+class RatePerMinute:
+    """Change per minute between the oldest sample still in the window and the newest."""
+
+    def __init__(self, window):
+        self.window = max(window, 60)
+        self.samples = deque()
+
+    def update(self, ts, value):
+        self.samples.append((ts, value))
+        # Keep one sample at or before the window start so the span covers the window
+        while len(self.samples) > 2 and self.samples[1][0] <= ts - self.window:
+            self.samples.popleft()
+        first_ts, first_value = self.samples[0]
+        if ts == first_ts:
+            return None
+        return (value - first_value) / (ts - first_ts) * 60
+
+
+SIGNALS = {
+    "threshold": SlidingMean,
+    "ewma": Ewma,
+    "rate": RatePerMinute,
+}
+
+
+def _signature(rule):
+    return (rule.kind, rule.window)
+
+
+class RuleState:
+    """In-memory evaluation state of one rule; rebuilt when its kind or window changes."""
+
+    def __init__(self, rule):
+        self.signature = _signature(rule)
+        self.signal = SIGNALS[rule.kind](rule.window or 0)
+        self.pending_since = None
+
+
+def resolve(rule, ts, value):
+    """Move a firing rule back to ok; returns the resolved AlertEvent."""
+    rule.state = "ok"
+    rule.state_since = int(ts)
+    return AlertEvent(rule_id=rule.id, rule_name=rule.name, state="resolved",
+                      value=value, threshold=rule.threshold, timestamp=int(ts))
+
+
+def evaluate(rule, state, ts, value):
+    """Feed one sample to a rule; returns an AlertEvent on a firing/resolved transition."""
+    signal = state.signal.update(ts, value)
+    if signal is None:
+        return None
+    rule.last_value = signal
+    rule.last_evaluated = int(ts)
+
+    if OPS[rule.op](signal, rule.threshold):
+        if state.pending_since is None:
+            state.pending_since = ts
+        if rule.state != "firing" and ts - state.pending_since >= (rule.for_seconds or 0):
+            rule.state = "firing"
+            rule.state_since = int(ts)
+            return AlertEvent(rule_id=rule.id, rule_name=rule.name, state="firing",
+                              value=signal, threshold=rule.threshold, timestamp=int(ts))
+        return None
+
+    state.pending_since = None
+    if rule.state == "firing":
+        return resolve(rule, ts, signal)
+    return None
+
+
+class AlertEngine:
+    """Evaluates alert rules incrementally on the samples the rollup collector writes.
+
+    Each rule keeps only its own window state, so evaluating a new sample costs
+    O(1) amortized per rule and never queries Prometheus. Firing state is stored
+    on the rule row and survives restarts; window state is rebuilt from new samples.
+    """
+
+    def __init__(self):
+        self._states = {}  # series -> {rule id: RuleState}
+
+    def observe(self, db, series, points):
+        """Evaluate the enabled rules on `series` against new (ts, value) points, oldest first."""
+        if not ALERTS_ENABLED:
+            return []
+        rules = db.query(AlertRule).filter(AlertRule.series == series, AlertRule.enabled == True).all()
+        previous = self._states.get(series, {})
+        states = {}
+        for rule in rules:
+            state = previous.get(rule.id)
+            if state is None or state.signature != _signature(rule):
+                state = RuleState(rule)
+            states[rule.id] = state
+        self._states[series] = states
+
+        events = []
+        for ts, value in points:
+            for rule in rules:
+                event = evaluate(rule, states[rule.id], ts, value)
+                if event is not None:
+                    events.append(event)
+        for event in events:
+            logger.info(f"Alert {event.rule_name} {event.state} at {event.value:.2f} (threshold {event.threshold})")
+        db.add_all(events)
+        return events
+
+    def prune(self, db, now):
+        db.query(AlertEvent).filter(AlertEvent.timestamp < now - ALERT_EVENT_RETENTION).delete(synchronize_session=False)
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,175 @@
+"""Anomaly scoring of many series at once.
+
+A matrix query_range response is loaded into one dense (time x series)
+array and every series is scored in the same vectorized pass, so thousands
+of pods cost a handful of numpy operations rather than a Python loop each.
+"""
+import os
+from operator import itemgetter
+import numpy as np
+
+# Trailing points judged against the rest of the window
+ANOMALY_RECENT_POINTS = int(os.getenv("ANOMALY_RECENT_POINTS", "5"))
+# Smoothing of the EWMA forecast; higher follows the series more closely
+ANOMALY_EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", "0.3"))
+# Series with fewer real samples than this are not scored
+MIN_POINTS = 10
+# A change point needs this many points on each side
+MIN_SEGMENT = 3
+# Scale of a flat series, relative to its level: a 1% move then counts as one sigma
+RELATIVE_FLOOR = 0.01
+# Flat series that move at all would otherwise score in the millions
+MAX_SCORE = 100.0
+MAD_TO_SIGMA = 1.4826
+
+_value = itemgetter(1)
+
+
+def dense_matrix(res, start, end, step, key_labels):
+    """Load a matrix response as (keys, timestamps, values).
+
+    values[t, s] is series s at timestamps[t], NaN where it has no sample.
+    keys are tuples of key_labels, one per column.
+    """
+    steps = int((end - start) // step) + 1
+    timestamps = start + np.arange(steps) * step
+    blanks = [""] * len(key_labels)
+    keys = []
+    full = []
+    full_samples = []
+    partial = []
+    partial_rows = []
+    partial_samples = []
+    for item in res.get("data", {}).get("result", []):
+        values = item.get("values")
+        if not values:
+            continue
+        metric = item.get("metric", {})
+        if len(values) == steps:
+            # Range results hold at most one point per step, so a full series needs no timestamps
+            full.append(len(keys))
+            full_samples.extend(map(_value, values))
+        else:
+            partial.extend([len(keys)] * len(values))
+            partial_rows.extend(ts for ts, _ in values)
+            partial_samples.extend(map(_value, values))
+        keys.append(tuple(map(metric.get, key_labels, blanks)))
+
+    # Filled one series per row, then handed out transposed
+    series = np.full((len(keys), steps), np.nan)
+    if full:
+        series[full] = np.array(full_samples, dtype=np.float64).reshape(len(full), steps)
+    if partial:
+        rows = np.rint((np.array(partial_rows, dtype=np.float64) - start) / step).astype(np.intp)
+        inside = (rows >= 0) & (rows < steps)
+        series[np.array(partial, dtype=np.intp)[inside], rows[inside]] = np.array(partial_samples, dtype=np.float64)[inside]
+    series[np.isinf(series)] = np.nan
+    matrix = series.T
+    return keys, timestamps, matrix
+
+
+def fill_gaps(matrix):
+    """Carry each series' last sample forward over gaps, and its first sample back over leading ones."""
+    missing = np.isnan(matrix)
+    if not missing.any():
+        return matrix
+    index = np.where(missing, 0, np.arange(matrix.shape[0])[:, None])
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = np.take_along_axis(matrix, index, axis=0)
+    first = matrix[np.argmax(~missing, axis=0), np.arange(matrix.shape[1])]
+    return np.where(np.isnan(filled), first, filled)
+
+
+def _scale(mad, history, median):
+    """Robust sigma per series, falling back to the std and then to RELATIVE_FLOOR of the level."""
+    scale = MAD_TO_SIGMA * mad
+    flat = scale == 0
+    if flat.any():
+        scale[flat] = history[flat].std(axis=1)
+    return np.maximum(scale, RELATIVE_FLOOR * np.abs(median) + 1e-12)
+
+
+def score_matrix(matrix, recent=ANOMALY_RECENT_POINTS, alpha=ANOMALY_EWMA_ALPHA):
+    """Score every column of a (time x series) matrix.
+
+    - robust_z: largest deviation of the last `recent` points from the
+      median of the earlier ones, in MAD-derived sigmas
+    - ewma: largest one-step EWMA forecast error over the last `recent`
+      points, in units of the exponentially weighted error std
+    - change: mean shift at the most significant change point, in sigmas
+      of the point-to-point noise, with change_at the row where the new level starts
+
+    score is the largest of the three, capped at MAX_SCORE, and 0 for
+    series with fewer than MIN_POINTS samples; latest is the last real
+    sample. All arrays have one entry per column.
+    """
+    steps, count = matrix.shape
+    recent = min(max(recent, 1), steps - MIN_SEGMENT)
+    present = np.count_nonzero(~np.isnan(matrix), axis=0)
+    if count == 0 or steps < 2 * MIN_SEGMENT or recent < 1:
+        empty = {name: np.zeros(count) for name in ("score", "robust_z", "ewma", "change")}
+        nan = np.full(count, np.nan)
+        return {**empty, "change_at": np.zeros(count, dtype=np.intp), "median": nan, "latest": nan, "points": present}
+    x = fill_gaps(matrix)
+
+    # Medians partition each series, which is much faster along contiguous rows
+    history = np.ascontiguousarray(x[:-recent].T)
+    median = np.median(history, axis=1)
+    mad = np.median(np.abs(history - median[:, None]), axis=1)
+    scale = _scale(mad, history, median)
+    robust_z = np.abs(x[-recent:] - median).max(axis=0) / scale
+
+    # One step per timestamp, each across all series at once
+    level = x[0].copy()
+    variance = np.zeros(count)
+    ewma = np.zeros(count)
+    for t in range(1, steps):
+        error = x[t] - level
+        if t >= steps - recent:
+            ewma = np.maximum(ewma, np.abs(error) / np.maximum(np.sqrt(variance), scale))
+        level += alpha * error
+        variance = (1 - alpha) * (variance + alpha * error * error)
+
+    # Split after row k-1: compare the means before and after for every k at once
+    totals = np.cumsum(x, axis=0)
+    k = np.arange(MIN_SEGMENT, steps - MIN_SEGMENT + 1)[:, None]
+    before = totals[k[:, 0] - 1] / k
+    after = (totals[-1] - totals[k[:, 0] - 1]) / (steps - k)
+    shift = np.abs(after - before)
+    # Significance grows with the points on both sides, so short blips don't win
+    best = np.argmax(shift * np.sqrt(k * (steps - k) / steps), axis=0)
+    # Judged against point-to-point noise, which the shift itself barely inflates
+    diffs = np.abs(np.diff(x, axis=0)).T
+    noise = np.median(diffs, axis=1)
+    gappy = (present < steps) & (present >= MIN_POINTS)
+    if gappy.any():
+        # Carried-forward points would read as no noise at all
+        sparse = diffs[gappy]
+        sparse[np.isnan(matrix[1:, gappy]).T] = np.nan
+        noise[gappy] = np.nanmedian(sparse, axis=1)
+    noise *= MAD_TO_SIGMA / np.sqrt(2)
+    noise = np.maximum(noise, RELATIVE_FLOOR * np.abs(median) + 1e-12)
+    change = shift[best, np.arange(count)] / noise
+
+    score = np.minimum(np.maximum(np.maximum(robust_z, ewma), change), MAX_SCORE)
+    score[present < MIN_POINTS] = 0.0
+    return {
+        "score": score,
+        "robust_z": np.minimum(robust_z, MAX_SCORE),
+        "ewma": np.minimum(ewma, MAX_SCORE),
+        "change": np.minimum(change, MAX_SCORE),
+        "change_at": k[best, 0],
+        "median": median,
+        "latest": x[-1],
+        "points": present,
+    }
+
+
+def top_anomalies(scores, limit):
+    """Column indices of the `limit` highest non-zero scores, highest first."""
+    score = scores["score"]
+    limit = min(limit, np.count_nonzero(score))
+    if limit <= 0:
+        return []
+    picked = np.argpartition(-score, limit - 1)[:limit]
+    return picked[np.argsort(-score[picked], kind="stable")].tolist()
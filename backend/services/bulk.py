@@ -0,0 +1,47 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all worker threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def run_bulk(items, fn, concurrency, rate):
+    """Run fn(item) for every item with bounded parallelism and rate limiting.
+
+    Yields (index, result) pairs in completion order. Closing the generator
+    (e.g. client disconnect) cancels operations that haven't started yet.
+    """
+    limiter = RateLimiter(rate)
+
+    def call(item):
+        limiter.acquire()
+        return fn(item)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="bulk")
+    try:
+        futures = {pool.submit(call, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": str(e)}
+            yield futures[future], result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
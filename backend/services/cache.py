@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# "" -> SQLite file shared by all workers in the pod, "redis://..." -> Redis
+# shared by all replicas, "disabled" -> no caching
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_PATH = os.getenv("CACHE_PATH", "data/cache.db")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+# How long a worker waits for another worker computing the same key
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "20"))
+CACHE_POLL_INTERVAL = 0.05
+# Size bounds are enforced every N writes rather than on every write
+EVICT_EVERY = 50
+
+
+class SQLiteBackend:
+    """Cache table in a local SQLite file (WAL mode) shared by the uvicorn workers."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL, size INTEGER)")
+        db.execute("CREATE INDEX IF NOT EXISTS ix_cache_expires ON cache (expires)")
+        db.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        row = self._db().execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key, raw, ttl):
+        self._db().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires, size) VALUES (?, ?, ?, ?)",
+            (key, raw, time.time() + ttl, len(raw)),
+        )
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self._evict()
+
+    def _evict(self):
+        db = self._db()
+        db.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if count <= CACHE_MAX_ENTRIES and total <= CACHE_MAX_BYTES:
+            return
+        # Drop the entries closest to expiry until both bounds hold again
+        excess = max(count - CACHE_MAX_ENTRIES, 0)
+        if total > CACHE_MAX_BYTES:
+            excess = max(excess, count // 4)
+        db.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires LIMIT ?)", (excess,))
+
+    def delete_prefix(self, prefix):
+        self._db().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def try_lock(self, key, owner, ttl):
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM locks WHERE key = ? AND expires < ?", (key, now))
+            cur = db.execute("INSERT OR IGNORE INTO locks (key, owner, expires) VALUES (?, ?, ?)", (key, owner, now + ttl))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return cur.rowcount == 1
+
+    def unlock(self, key, owner):
+        self._db().execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+
+class RedisBackend:
+    """Redis-compatible backend for multi-replica deployments; bounds come from maxmemory."""
+
+    def __init__(self, url):
+        import redis  # optional dependency, only needed when CACHE_URL is redis://
+        self.redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.redis.get(key)
+
+    def set(self, key, raw, ttl):
+        self.redis.set(key, raw, px=max(1, int(ttl * 1000)))
+
+    def delete_prefix(self, prefix):
+        keys = list(self.redis.scan_iter(match=f"{prefix}*", count=500))
+        if keys:
+            self.redis.delete(*keys)
+
+    def try_lock(self, key, owner, ttl):
+        return bool(self.redis.set(f"lock:{key}", owner, nx=True, px=max(1, int(ttl * 1000))))
+
+    def unlock(self, key, owner):
+        lock_key = f"lock:{key}"
+        if self.redis.get(lock_key) == owner.encode():
+            self.redis.delete(lock_key)
+
+
+class SharedCache:
+    """TTL cache shared across workers, with request coalescing.
+
+    Concurrent misses for the same key are collapsed: threads in this worker
+    wait on the one in-flight computation, and workers wait on a short-lived
+    lock held by whichever worker computes it first. Any backend failure
+    degrades to calling the loader directly.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._guard = threading.Lock()
+        self._inflight = {}
+        self._ainflight = {}
+
+    def get(self, key):
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        if self.backend is None or value is None:
+            return
+        try:
+            self.backend.set(key, orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    def invalidate(self, prefix):
+        if self.backend is None:
+            return
+        try:
+            self.backend.delete_prefix(prefix)
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed for {prefix}: {e}")
+
+    def get_or_set(self, key, ttl, loader):
+        """Return the cached value for key, computing it with loader() at most once across workers."""
+        value = self.get(key)
+        if value is not None or self.backend is None:
+            return value if value is not None else loader()
+
+        with self._guard:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+        if not leader:
+            event.wait(CACHE_LOCK_TIMEOUT)
+            value = self.get(key)
+            return value if value is not None else loader()
+
+        try:
+            return self._fill(key, ttl, loader)
+        finally:
+            with self._guard:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _fill(self, key, ttl, loader):
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+        while True:
+            try:
+                locked = self.backend.try_lock(key, owner, CACHE_LOCK_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Cache lock failed for {key}: {e}")
+                return loader()
+            if locked:
+                try:
+                    # Another worker may have filled the key while we waited
+                    value = self.get(key)
+                    if value is None:
+                        value = loader()
+                        self.set(key, value, ttl)
+                    return value
+                finally:
+                    try:
+                        self.backend.unlock(key, owner)
+                    except Exception as e:
+                        logger.warning(f"Cache unlock failed for {key}: {e}")
+            time.sleep(CACHE_POLL_INTERVAL)
+            value = self.get(key)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                return loader()
+
+
+    async def aget_or_set(self, key, ttl, loader):
+        """Async get_or_set for coroutine loaders; backend I/O runs off the event loop."""
+        value = await asyncio.to_thread(self.get, key)
+        if value is not None:
+            return value
+        if self.backend is None:
+            return await loader()
+        task = self._ainflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._afill(key, ttl, loader))
+            self._ainflight[key] = task
+            task.add_done_callback(lambda _: self._ainflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _afill(self, key, ttl, loader):
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+        while True:
+            try:
+                locked = await asyncio.to_thread(self.backend.try_lock, key, owner, CACHE_LOCK_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Cache lock failed for {key}: {e}")
+                return await loader()
+            if locked:
+                try:
+                    value = await asyncio.to_thread(self.get, key)
+                    if value is None:
+                        value = await loader()
+                        await asyncio.to_thread(self.set, key, value, ttl)
+                    return value
+                finally:
+                    try:
+                        await asyncio.to_thread(self.backend.unlock, key, owner)
+                    except Exception as e:
+                        logger.warning(f"Cache unlock failed for {key}: {e}")
+            await asyncio.sleep(CACHE_POLL_INTERVAL)
+            value = await asyncio.to_thread(self.get, key)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                return await loader()
+
+
+def create_cache():
+    if CACHE_URL == "disabled":
+        return SharedCache(None)
+    if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+        return SharedCache(RedisBackend(CACHE_URL))
+    return SharedCache(SQLiteBackend(CACHE_PATH))
@@ -0,0 +1,97 @@
+import logging
+import os
+import time
+from services.registry import get_cache, get_prom
+
+logger = logging.getLogger(__name__)
+
+# How long a discovery result is shared across workers before it is redone
+CAPABILITIES_TTL = float(os.getenv("CAPABILITIES_TTL", "300"))
+# Each worker re-reads the shared result at most this often
+CAPABILITIES_LOCAL_TTL = 30
+# After a failed discovery, panels behave as before until the next attempt
+CAPABILITIES_RETRY = 30
+
+# Metric names each panel's queries depend on
+PANEL_METRICS = {
+    "cpu": ["node_cpu_seconds_total"],
+    "memory": ["node_memory_MemAvailable_bytes", "node_memory_MemTotal_bytes"],
+    "disk": ["node_filesystem_free_bytes", "node_filesystem_size_bytes"],
+    "network_rx": ["node_network_receive_bytes_total"],
+    "network_tx": ["node_network_transmit_bytes_total"],
+    "load": ["node_load1"],
+    "pod_restarts": ["kube_pod_container_status_restarts_total"],
+    "uptime": ["node_time_seconds", "node_boot_time_seconds"],
+    "processes": ["node_procs_running", "node_procs_blocked"],
+    "temperature": ["node_hwmon_temp_celsius"],
+    "tsdb_churn": [
+        "prometheus_tsdb_head_series",
+        "prometheus_tsdb_head_series_created_total",
+        "prometheus_tsdb_head_series_removed_total",
+    ],
+    "optimization": [
+        "kube_pod_container_resource_requests",
+        "container_memory_working_set_bytes",
+        "container_cpu_usage_seconds_total",
+    ],
+    # Restarts come from kube-state-metrics but are optional: without them only CPU and memory are scored
+    "anomalies": ["container_cpu_usage_seconds_total", "container_memory_working_set_bytes"],
+}
+
+# Most specific sensor first; the average over all sensors is the last resort
+TEMPERATURE_QUERIES = [
+    ("label", "Package id 0", 'node_hwmon_temp_celsius{label="Package id 0"}'),
+    ("label", "core_0", 'node_hwmon_temp_celsius{label="core_0"}'),
+    ("sensor", "temp1", 'node_hwmon_temp_celsius{sensor="temp1"}'),
+    (None, None, 'avg(node_hwmon_temp_celsius)'),
+]
+
+_local = {"caps": None, "expires": 0.0}
+
+
+def discover():
+    """Ask Prometheus which metric names (and hwmon label values) it has."""
+    prom = get_prom()
+    metrics = prom.label_values("__name__")
+    hwmon = {}
+    if "node_hwmon_temp_celsius" in metrics:
+        for label in ("label", "sensor"):
+            hwmon[label] = prom.label_values(label, match="node_hwmon_temp_celsius")
+    return {"metrics": metrics, "hwmon": hwmon}
+
+
+class Capabilities:
+    def __init__(self, data):
+        self.metrics = set(data.get("metrics") or ())
+        self.hwmon = {label: set(values) for label, values in (data.get("hwmon") or {}).items()}
+
+    def panel(self, name):
+        return all(metric in self.metrics for metric in PANEL_METRICS[name])
+
+    def temperature_query(self):
+        """The one temperature query that will return data, or None without hwmon sensors."""
+        if not self.panel("temperature"):
+            return None
+        for label, value, query in TEMPERATURE_QUERIES:
+            if label is None or value in self.hwmon.get(label, ()):
+                return query
+
+
+def get_capabilities():
+    """Capabilities of the Prometheus behind get_prom(), or None while they are unknown."""
+    now = time.monotonic()
+    if now < _local["expires"]:
+        return _local["caps"]
+    try:
+        data = get_cache().get_or_set(f"prom:{get_prom().base}:capabilities", CAPABILITIES_TTL, discover)
+        _local.update(caps=Capabilities(data), expires=now + CAPABILITIES_LOCAL_TTL)
+    except Exception as e:
+        logger.warning(f"Metric discovery failed: {e}")
+        _local.update(caps=None, expires=now + CAPABILITIES_RETRY)
+    return _local["caps"]
+
+
+def panel_available(name):
+    """False only when discovery positively found the panel's metrics missing."""
+    caps = get_capabilities()
+    return caps is None or caps.panel(name)
@@ -0,0 +1,98 @@
+"""Versioned list responses, so pollers download only what changed.
+
+A list's version is a digest of its content, so every worker names the same
+list alike. It is computed once when a list is cached, see versioned_list(),
+not on every poll. Each version handed out has a per-object digest index stored in
+the shared cache for K8S_DELTA_TTL seconds; a poll that sends it back as
+`since` gets the objects added, modified and deleted since then, and a full
+snapshot once the version has expired.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import orjson
+from services.registry import get_cache
+
+# How long a handed-out version can still be diffed against
+K8S_DELTA_TTL = float(os.getenv("K8S_DELTA_TTL", "300"))
+# Indexes each worker keeps in memory, so unchanged lists aren't re-read from the cache
+LOCAL_INDEXES = 32
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def object_key(row):
+    """Identity of a list row: namespace/name, with an empty namespace for cluster-scoped objects."""
+    return f"{row.get('namespace') or ''}/{row.get('name')}"
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def list_version(rows):
+    return _digest(orjson.dumps(rows))
+
+
+def versioned_list(rows):
+    """Cache entry of a list: {"version", "rows"}."""
+    return {"version": list_version(rows), "rows": rows}
+
+
+def _remember(name, index):
+    with _lock:
+        _local[name] = index
+        _local.move_to_end(name)
+        while len(_local) > LOCAL_INDEXES:
+            _local.popitem(last=False)
+
+
+def _index(list_key, version, rows):
+    """{object key: row digest} of a version, stored for later diffs the first time it is seen."""
+    name = f"delta:{list_key}:{version}"
+    index = _local.get(name)
+    if index is None:
+        index = {object_key(row): _digest(orjson.dumps(row)) for row in rows}
+        get_cache().set(name, index, K8S_DELTA_TTL)
+        _remember(name, index)
+    return index
+
+
+def _previous(list_key, version):
+    name = f"delta:{list_key}:{version}"
+    index = _local.get(name)
+    if index is None:
+        index = get_cache().get(name)
+        if index is not None:
+            _remember(name, index)
+    return index
+
+
+def versioned(list_key, field, rows, version, since):
+    """Response body for a poll of `rows`, at `version`, that last saw version `since`.
+
+    {"version", "full": True, field: rows} when `since` is empty or expired,
+    else {"version", "full": False, "added", "modified", "deleted"} where
+    deleted holds the {"namespace", "name"} of objects that are gone.
+    """
+    if since == version:
+        return {"version": version, "full": False, "added": [], "modified": [], "deleted": []}
+    index = _index(list_key, version, rows)
+    previous = _previous(list_key, since) if since else None
+    if previous is None:
+        return {"version": version, "full": True, field: rows}
+
+    added = []
+    modified = []
+    # The index was built from these very rows, in order
+    for row, (key, digest) in zip(rows, index.items()):
+        old = previous.get(key)
+        if old != digest:
+            (added if old is None else modified).append(row)
+    deleted = []
+    for key in previous.keys() - index.keys():
+        namespace, name = key.split("/", 1)
+        deleted.append({"namespace": namespace or None, "name": name})
+    return {"version": version, "full": False, "added": added, "modified": modified, "deleted": deleted}
@@ -0,0 +1,217 @@
+import logging
+import os
+import ssl
+from urllib.parse import quote
+import httpx
+import orjson
+from services.k8s_client import (
+    CONNECT_TIMEOUT,
+    LIST_CHUNK_SIZE,
+    POOL_MAXSIZE,
+    REQUEST_TIMEOUT,
+    log_targets,
+    newest_pod_events,
+    project_deployment,
+    project_event,
+    project_namespace,
+    project_node,
+    project_pod,
+    project_pod_details,
+    project_service,
+    selector_string,
+)
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_EXPIRY = float(os.getenv("K8S_KEEPALIVE_EXPIRY", "60"))
+# Server-side lifetime of one watch request; callers resume from the last resourceVersion
+WATCH_TIMEOUT = int(os.getenv("K8S_WATCH_TIMEOUT", "300"))
+
+
+class AsyncApiError(Exception):
+    """Non-2xx response from the apiserver; str() mirrors ApiException's format."""
+
+    def __init__(self, status, reason, body=""):
+        super().__init__(f"({status})\nReason: {reason}\nHTTP response body: {body}")
+        self.status = status
+        self.reason = reason
+
+
+def _path(*segments):
+    return "/".join(quote(s, safe="") for s in segments)
+
+
+def _collection(group, resource, namespace):
+    """URL of a namespaced collection, or the all-namespaces one for namespace='all'."""
+    if namespace == "all":
+        return f"{group}/{resource}"
+    return f"{group}/namespaces/{_path(namespace)}/{resource}"
+
+
+class AsyncK8sClient:
+    """Async read path to the apiserver for the api/k8s.py routes.
+
+    Shares the sync client's Configuration (host, TLS material, bearer token
+    refresh) and its raw-JSON projections, but multiplexes requests over one
+    httpx connection pool on the event loop instead of pinning a thread each.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self.http = httpx.AsyncClient(
+            base_url=configuration.host,
+            verify=self._ssl_context(configuration),
+            limits=httpx.Limits(
+                max_connections=POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+
+    @staticmethod
+    def _ssl_context(configuration):
+        if not configuration.verify_ssl:
+            return False
+        ctx = ssl.create_default_context(cafile=configuration.ssl_ca_cert)
+        if configuration.cert_file:
+            ctx.load_cert_chain(configuration.cert_file, configuration.key_file)
+        return ctx
+
+    def _headers(self):
+        headers = {"Accept": "application/json"}
+        # auth_settings() runs the refresh hook, so rotated in-cluster tokens are picked up
+        for auth in self.configuration.auth_settings().values():
+            if auth.get("in") == "header" and auth.get("value"):
+                headers[auth["key"]] = auth["value"]
+        return headers
+
+    async def _get(self, path, params=None):
+        resp = await self.http.get(path, params=params, headers=self._headers())
+        if resp.status_code >= 300:
+            raise AsyncApiError(resp.status_code, resp.reason_phrase, resp.text)
+        return resp
+
+    async def _get_json(self, path, params=None):
+        return orjson.loads((await self._get(path, params)).content)
+
+    async def _iter_raw(self, path, params=None):
+        """Async counterpart of K8sClient._iter_raw: raw items in limit/continue pages."""
+        params = dict(params or {}, limit=LIST_CHUNK_SIZE)
+        while True:
+            page = await self._get_json(path, params)
+            for item in page.get("items") or ():
+                yield item
+            token = (page.get("metadata") or {}).get("continue")
+            if not token:
+                return
+            params["continue"] = token
+
+    async def _list(self, path, project):
+        try:
+            return [project(item)._asdict() async for item in self._iter_raw(path)]
+        except (AsyncApiError, httpx.HTTPError) as e:
+            return {"error": str(e)}
+
+    async def iter_pods(self, namespace="default"):
+        """Yield PodRecords page by page; raises AsyncApiError."""
+        async for item in self._iter_raw(_collection("/api/v1", "pods", namespace)):
+            yield project_pod(item)
+
+    async def get_nodes(self):
+        return await self._list("/api/v1/nodes", project_node)
+
+    async def get_namespaces(self):
+        try:
+            return [project_namespace(item) async for item in self._iter_raw("/api/v1/namespaces")]
+        except (AsyncApiError, httpx.HTTPError) as e:
+            return {"error": str(e)}
+
+    async def get_pods(self, namespace="default"):
+        return await self._list(_collection("/api/v1", "pods", namespace), project_pod)
+
+    async def get_deployments(self, namespace="default"):
+        return await self._list(_collection("/apis/apps/v1", "deployments", namespace), project_deployment)
+
+    async def get_services(self, namespace="default"):
+        return await self._list(_collection("/api/v1", "services", namespace), project_service)
+
+    async def get_events(self, namespace="default"):
+        try:
+            records = [project_event(item) async for item in self._iter_raw(_collection("/api/v1", "events", namespace))]
+            return [r._asdict() for r in newest_pod_events(records)]
+        except (AsyncApiError, httpx.HTTPError) as e:
+            return {"error": str(e)}
+
+    async def get_pod_details(self, name, namespace="default"):
+        try:
+            return project_pod_details(await self._get_json(f"/api/v1/namespaces/{_path(namespace)}/pods/{_path(name)}"))
+        except (AsyncApiError, httpx.HTTPError) as e:
+            return {"error": str(e)}
+
+    async def get_pod_logs(self, name, namespace="default", tail_lines=200):
+        try:
+            resp = await self._get(
+                f"/api/v1/namespaces/{_path(namespace)}/pods/{_path(name)}/log",
+                {"tailLines": tail_lines},
+            )
+            return resp.text
+        except (AsyncApiError, httpx.HTTPError) as e:
+            return f"Error fetching logs: {str(e)}"
+
+    async def get_log_targets(self, namespace, label_selector=None, deployment=None):
+        """Async counterpart of K8sClient.get_log_targets; raises AsyncApiError."""
+        if deployment:
+            item = await self._get_json(f"/apis/apps/v1/namespaces/{_path(namespace)}/deployments/{_path(deployment)}")
+            label_selector = selector_string((item.get("spec") or {}).get("selector") or {})
+        params = {"labelSelector": label_selector} if label_selector else None
+        return [
+            target
+            async for item in self._iter_raw(_collection("/api/v1", "pods", namespace), params)
+            for target in log_targets(item)
+        ]
+
+    async def stream_pod_log(self, name, namespace, container=None, tail_lines=None, since_seconds=None):
+        """Yield log lines as they arrive; raises AsyncApiError."""
+        params = {"container": container, "tailLines": tail_lines, "sinceSeconds": since_seconds}
+        params = {k: v for k, v in params.items() if v is not None}
+        path = f"/api/v1/namespaces/{_path(namespace)}/pods/{_path(name)}/log"
+        async with self.http.stream("GET", path, params=params, headers=self._headers()) as resp:
+            if resp.status_code >= 300:
+                await resp.aread()
+                raise AsyncApiError(resp.status_code, resp.reason_phrase, resp.text)
+            async for line in resp.aiter_lines():
+                yield line
+
+    async def get_deployment(self, name, namespace):
+        """Raw Deployment object; raises AsyncApiError."""
+        return await self._get_json(f"/apis/apps/v1/namespaces/{_path(namespace)}/deployments/{_path(name)}")
+
+    async def watch(self, path, params=None, timeout_seconds=WATCH_TIMEOUT):
+        """Yield (type, object) watch events of a collection until the server ends the watch.
+
+        Bookmarks are requested so the last resourceVersion stays fresh; an
+        ERROR event (e.g. 410 Gone) is yielded like any other. Raises AsyncApiError.
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        params.update(watch="true", allowWatchBookmarks="true", timeoutSeconds=timeout_seconds)
+        timeout = httpx.Timeout(timeout_seconds + REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+        async with self.http.stream("GET", path, params=params, headers=self._headers(), timeout=timeout) as resp:
+            if resp.status_code >= 300:
+                await resp.aread()
+                raise AsyncApiError(resp.status_code, resp.reason_phrase, resp.text)
+            async for line in resp.aiter_lines():
+                if line:
+                    event = orjson.loads(line)
+                    yield event.get("type"), event.get("object") or {}
+
+    def watch_deployment(self, name, namespace, resource_version=None):
+        path = _collection("/apis/apps/v1", "deployments", namespace)
+        return self.watch(path, {"fieldSelector": f"metadata.name={name}", "resourceVersion": resource_version})
+
+    def watch_pods(self, namespace, label_selector, resource_version=None):
+        path = _collection("/api/v1", "pods", namespace)
+        return self.watch(path, {"labelSelector": label_selector, "resourceVersion": resource_version})
+
+    async def aclose(self):
+        await self.http.aclose()
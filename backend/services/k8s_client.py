@@ -1,16 +1,225 @@
+import heapq
 import logging
 import os
+import socket
+from collections import namedtuple
+import orjson
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 
 logger = logging.getLogger(__name__)
 
+# Page size for list calls; large clusters are consumed in limit/continue chunks
+# so only one page of raw JSON is alive at a time.
+LIST_CHUNK_SIZE = int(os.getenv("K8S_LIST_CHUNK_SIZE", "500"))
+# Read size when streaming pod logs line by line
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Connection handling for the apiserver. The pool should be at least as large as
+# the number of threads that call the API concurrently (FastAPI's threadpool
+# defaults to 40) or urllib3 discards connections with "connection pool is full".
+POOL_MAXSIZE = int(os.getenv("K8S_POOL_MAXSIZE", "40"))
+KEEPALIVE_IDLE = int(os.getenv("K8S_KEEPALIVE_IDLE", "30"))
+# Default (connect, read) timeout for calls that don't pass _request_timeout
+CONNECT_TIMEOUT = float(os.getenv("K8S_CONNECT_TIMEOUT", "3"))
+REQUEST_TIMEOUT = float(os.getenv("K8S_REQUEST_TIMEOUT", "15"))
+
+# Compact records holding only the fields the API actually returns
+PodRecord = namedtuple("PodRecord", ["name", "namespace", "status", "restarts", "age", "node", "ip"])
+DeploymentRecord = namedtuple("DeploymentRecord", ["name", "namespace", "ready", "age"])
+ServiceRecord = namedtuple("ServiceRecord", ["name", "namespace", "type", "cluster_ip", "ports"])
+EventRecord = namedtuple("EventRecord", ["type", "reason", "message", "pod", "time"])
+NodeRecord = namedtuple("NodeRecord", ["name", "status", "roles", "ip", "os", "kubelet_version", "age"])
+
+
+def _keepalive_socket_options():
+    options = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1), (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options += [
+            (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3),
+        ]
+    return options
+
+
+def tune_configuration(configuration):
+    """Apply pool size and TCP keep-alive settings before an ApiClient is built from it."""
+    configuration.connection_pool_maxsize = POOL_MAXSIZE
+    configuration.socket_options = _keepalive_socket_options()
+    return configuration
+
+
+class TimeoutApiClient(client.ApiClient):
+    """ApiClient that applies a default timeout to every call without an explicit one."""
+
+    def call_api(self, *args, **kwargs):
+        if kwargs.get("_request_timeout") is None:
+            kwargs["_request_timeout"] = (CONNECT_TIMEOUT, REQUEST_TIMEOUT)
+        return super().call_api(*args, **kwargs)
+
+
+def _iso(ts):
+    """Match datetime.isoformat() output for the RFC3339 'Z' timestamps the API server sends."""
+    if not ts:
+        return None
+    return ts[:-1] + "+00:00" if ts.endswith("Z") else ts
+
+
+def _dry_run(enabled):
+    """Value for the API server's dryRun parameter; None sends the real request."""
+    return "All" if enabled else None
+
+
+def project_pod(item):
+    meta = item.get("metadata") or {}
+    spec = item.get("spec") or {}
+    status = item.get("status") or {}
+    restarts = sum(c.get("restartCount", 0) for c in status.get("containerStatuses") or ())
+    return PodRecord(
+        meta.get("name"),
+        meta.get("namespace"),
+        status.get("phase"),
+        restarts,
+        _iso(meta.get("creationTimestamp")),
+        spec.get("nodeName"),
+        status.get("podIP"),
+    )
+
+
+def project_deployment(item):
+    meta = item.get("metadata") or {}
+    ready = (item.get("status") or {}).get("readyReplicas") or 0
+    total = (item.get("spec") or {}).get("replicas") or 0
+    return DeploymentRecord(meta.get("name"), meta.get("namespace"), f"{ready}/{total}", _iso(meta.get("creationTimestamp")))
+
+
+def project_service(item):
+    meta = item.get("metadata") or {}
+    spec = item.get("spec") or {}
+    ports = [f"{p.get('port')}:{p.get('targetPort')}/{p.get('protocol')}" for p in spec.get("ports") or ()]
+    return ServiceRecord(meta.get("name"), meta.get("namespace"), spec.get("type"), spec.get("clusterIP"), ", ".join(ports))
+
+
+def project_event(item):
+    """Project a Pod event; returns None for events about other kinds."""
+    involved = item.get("involvedObject") or {}
+    if involved.get("kind") != "Pod":
+        return None
+    return EventRecord(item.get("type"), item.get("reason"), item.get("message"), involved.get("name"), _iso(item.get("lastTimestamp")))
+
+
+def project_namespace(item):
+    return {"name": (item.get("metadata") or {}).get("name"), "status": (item.get("status") or {}).get("phase")}
+
+
+def project_pod_details(pod):
+    meta = pod.get("metadata") or {}
+    spec = pod.get("spec") or {}
+    status = pod.get("status") or {}
+    statuses = {cs.get("name"): cs for cs in status.get("containerStatuses") or ()}
+
+    containers = []
+    for c in spec.get("containers") or ():
+        # Find corresponding status
+        cs = statuses.get(c.get("name"))
+
+        state = "Unknown"
+        cs_state = (cs or {}).get("state") or {}
+        if "running" in cs_state: state = "Running"
+        elif "waiting" in cs_state: state = f"Waiting ({cs_state['waiting'].get('reason')})"
+        elif "terminated" in cs_state: state = f"Terminated ({cs_state['terminated'].get('reason')})"
+
+        resources = c.get("resources") or {}
+        requests = resources.get("requests") or {}
+        limits = resources.get("limits") or {}
+
+        containers.append({
+            "name": c.get("name"),
+            "image": c.get("image"),
+            "state": state,
+            "restarts": cs.get("restartCount", 0) if cs else 0,
+            "ready": cs.get("ready", False) if cs else False,
+            "requests": {"cpu": requests.get("cpu", ""), "memory": requests.get("memory", "")},
+            "limits": {"cpu": limits.get("cpu", ""), "memory": limits.get("memory", "")}
+        })
+
+    return {
+        "name": meta.get("name"),
+        "namespace": meta.get("namespace"),
+        "status": status.get("phase"),
+        "node": spec.get("nodeName"),
+        "ip": status.get("podIP"),
+        "host_ip": status.get("hostIP"),
+        "start_time": _iso(status.get("startTime")),
+        "labels": meta.get("labels") or {},
+        "annotations": meta.get("annotations") or {},
+        "containers": containers
+    }
+
+
+def newest_pod_events(records, limit=100):
+    """Keep only the newest Pod events without sorting the whole list."""
+    return heapq.nlargest(limit, (r for r in records if r), key=lambda r: r.time or "")
+
+
+def log_targets(pod):
+    """(namespace, pod, container) triples that have logs to read; pending pods have none yet."""
+    if (pod.get("status") or {}).get("phase") == "Pending":
+        return []
+    metadata = pod.get("metadata") or {}
+    namespace, name = metadata.get("namespace"), metadata.get("name")
+    return [(namespace, name, c.get("name")) for c in (pod.get("spec") or {}).get("containers") or ()]
+
+
+def selector_string(selector):
+    """Render a raw LabelSelector in the labelSelector query syntax."""
+    parts = [f"{k}={v}" for k, v in (selector.get("matchLabels") or {}).items()]
+    for expr in selector.get("matchExpressions") or ():
+        key, op, values = expr.get("key"), expr.get("operator"), ",".join(expr.get("values") or ())
+        if op == "In": parts.append(f"{key} in ({values})")
+        elif op == "NotIn": parts.append(f"{key} notin ({values})")
+        elif op == "Exists": parts.append(key)
+        elif op == "DoesNotExist": parts.append(f"!{key}")
+    return ",".join(parts)
+
+
+def project_node(item):
+    meta = item.get("metadata") or {}
+    status = item.get("status") or {}
+    node_status = "Unknown"
+    for condition in status.get("conditions") or ():
+        if condition.get("type") == "Ready":
+            node_status = "Ready" if condition.get("status") == "True" else "NotReady"
+            break
+
+    roles = [k.replace('node-role.kubernetes.io/', '') for k in (meta.get("labels") or {}) if k.startswith('node-role.kubernetes.io/')]
+    if not roles: roles = ["worker"]
+
+    ip_address = ""
+    for addr in status.get("addresses") or ():
+        if addr.get("type") == "InternalIP":
+            ip_address = addr.get("address")
+            break
+
+    node_info = status.get("nodeInfo") or {}
+    return NodeRecord(
+        meta.get("name"),
+        node_status,
+        roles,
+        ip_address,
+        node_info.get("osImage"),
+        node_info.get("kubeletVersion"),
+        _iso(meta.get("creationTimestamp")),
+    )
+
 class K8sClient:
     def __init__(self):
         self.api_client = None
         self.core_api = None
         self.apps_api = None
         self.current_context = None
+        self.in_cluster = False
         self._initialize_client()
 
     def _initialize_client(self, context=None):
@@ -22,13 +231,13 @@ class K8sClient:
             new_config = client.Configuration()
             
             try:
-                config.load_incluster_config()
+                config.load_incluster_config(client_configuration=new_config)
+                self.in_cluster = True
                 # If we are in-cluster, we usually don't need host rewriting
-                self.api_client = client.ApiClient()
                 logger.info("Loaded Kubernetes in-cluster config.")
             except config.ConfigException:
                 self._load_local_config(new_config, context=context)
-                self.api_client = client.ApiClient(configuration=new_config)
+            self.api_client = TimeoutApiClient(configuration=tune_configuration(new_config))
             
             self.core_api = client.CoreV1Api(self.api_client)
             self.apps_api = client.AppsV1Api(self.api_client)
@@ -47,6 +256,8 @@ class K8sClient:
             # so we load it, then copy it.
             config.load_kube_config(context=context)
             temp_config = client.Configuration.get_default_copy()
+            # The context actually in use, so callers can tell which cluster they act on
+            self.current_context = context or config.list_kube_config_contexts()[1]["name"]
             
             # Copy values to our target configuration
             configuration.host = temp_config.host
@@ -81,6 +292,24 @@ class K8sClient:
     def is_connected(self):
         return self.core_api is not None
 
+    def _iter_raw(self, list_fn, *args, **kwargs):
+        """Yield raw item dicts from a list call without building V1 model objects.
+
+        Responses are requested with _preload_content=False, parsed with orjson and
+        paged with limit/continue so peak memory is bounded by LIST_CHUNK_SIZE.
+        """
+        token = None
+        while True:
+            resp = list_fn(*args, limit=LIST_CHUNK_SIZE, _continue=token, _preload_content=False, **kwargs)
+            try:
+                page = orjson.loads(resp.data)
+            finally:
+                resp.release_conn()
+            yield from page.get("items") or ()
+            token = (page.get("metadata") or {}).get("continue")
+            if not token:
+                return
+
     def get_clusters(self):
         try:
             import subprocess
@@ -177,42 +406,14 @@ class K8sClient:
     def get_nodes(self):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
-            nodes = self.core_api.list_node()
-            result = []
-            for node in nodes.items:
-                status = "Unknown"
-                for condition in node.status.conditions:
-                    if condition.type == "Ready":
-                        status = "Ready" if condition.status == "True" else "NotReady"
-                        break
-                
-                roles = [k.replace('node-role.kubernetes.io/', '') for k in node.metadata.labels.keys() if k.startswith('node-role.kubernetes.io/')]
-                if not roles: roles = ["worker"]
-
-                ip_address = ""
-                for addr in node.status.addresses:
-                    if addr.type == "InternalIP":
-                        ip_address = addr.address
-                        break
-
-                result.append({
-                    "name": node.metadata.name,
-                    "status": status,
-                    "roles": roles,
-                    "ip": ip_address,
-                    "os": node.status.node_info.os_image,
-                    "kubelet_version": node.status.node_info.kubelet_version,
-                    "age": node.metadata.creation_timestamp.isoformat() if node.metadata.creation_timestamp else None
-                })
-            return result
+            return [project_node(item)._asdict() for item in self._iter_raw(self.core_api.list_node)]
         except ApiException as e:
             return {"error": str(e)}
 
     def get_namespaces(self):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
-            ns_list = self.core_api.list_namespace(_request_timeout=5)
-            return [{"name": ns.metadata.name, "status": ns.status.phase} for ns in ns_list.items]
+            return [project_namespace(item) for item in self._iter_raw(self.core_api.list_namespace, _request_timeout=5)]
         except ApiException as e:
             return {"error": str(e)}
 
@@ -233,27 +434,19 @@ class K8sClient:
         except ApiException as e:
             return {"error": str(e.reason)}
 
+    def iter_pods(self, namespace="default"):
+        """Yield PodRecords page by page; raises ApiException."""
+        if namespace == "all":
+            items = self._iter_raw(self.core_api.list_pod_for_all_namespaces)
+        else:
+            items = self._iter_raw(self.core_api.list_namespaced_pod, namespace)
+        for item in items:
+            yield project_pod(item)
+
     def get_pods(self, namespace="default"):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
-            if namespace == "all":
-                pods = self.core_api.list_pod_for_all_namespaces()
-            else:
-                pods = self.core_api.list_namespaced_pod(namespace)
-                
-            result = []
-            for pod in pods.items:
-                restarts = sum([c.restart_count for c in pod.status.container_statuses]) if pod.status.container_statuses else 0
-                result.append({
-                    "name": pod.metadata.name,
-                    "namespace": pod.metadata.namespace,
-                    "status": pod.status.phase,
-                    "restarts": restarts,
-                    "age": pod.metadata.creation_timestamp.isoformat() if pod.metadata.creation_timestamp else None,
-                    "node": pod.spec.node_name,
-                    "ip": pod.status.pod_ip
-                })
-            return result
+            return [p._asdict() for p in self.iter_pods(namespace)]
         except ApiException as e:
             return {"error": str(e)}
 
@@ -261,21 +454,10 @@ class K8sClient:
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
             if namespace == "all":
-                deps = self.apps_api.list_deployment_for_all_namespaces()
+                items = self._iter_raw(self.apps_api.list_deployment_for_all_namespaces)
             else:
-                deps = self.apps_api.list_namespaced_deployment(namespace)
-                
-            result = []
-            for d in deps.items:
-                ready = d.status.ready_replicas or 0
-                total = d.spec.replicas or 0
-                result.append({
-                    "name": d.metadata.name,
-                    "namespace": d.metadata.namespace,
-                    "ready": f"{ready}/{total}",
-                    "age": d.metadata.creation_timestamp.isoformat() if d.metadata.creation_timestamp else None
-                })
-            return result
+                items = self._iter_raw(self.apps_api.list_namespaced_deployment, namespace)
+            return [project_deployment(item)._asdict() for item in items]
         except ApiException as e:
             return {"error": str(e)}
 
@@ -283,21 +465,10 @@ class K8sClient:
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
             if namespace == "all":
-                svcs = self.core_api.list_service_for_all_namespaces()
+                items = self._iter_raw(self.core_api.list_service_for_all_namespaces)
             else:
-                svcs = self.core_api.list_namespaced_service(namespace)
-                
-            result = []
-            for s in svcs.items:
-                ports = [f"{p.port}:{p.target_port}/{p.protocol}" for p in s.spec.ports] if s.spec.ports else []
-                result.append({
-                    "name": s.metadata.name,
-                    "namespace": s.metadata.namespace,
-                    "type": s.spec.type,
-                    "cluster_ip": s.spec.cluster_ip,
-                    "ports": ", ".join(ports)
-                })
-            return result
+                items = self._iter_raw(self.core_api.list_namespaced_service, namespace)
+            return [project_service(item)._asdict() for item in items]
         except ApiException as e:
             return {"error": str(e)}
 
@@ -311,39 +482,62 @@ class K8sClient:
         except ApiException as e:
             return f"Error fetching logs: {str(e)}"
 
+    def get_log_targets(self, namespace, label_selector=None, deployment=None):
+        """(namespace, pod, container) triples selected by a label selector or by a
+        deployment's selector, in every namespace for namespace='all'.
+
+        Raises ApiException.
+        """
+        if deployment:
+            resp = self.apps_api.read_namespaced_deployment(name=deployment, namespace=namespace, _preload_content=False)
+            try:
+                label_selector = selector_string((orjson.loads(resp.data).get("spec") or {}).get("selector") or {})
+            finally:
+                resp.release_conn()
+        if namespace == "all":
+            items = self._iter_raw(self.core_api.list_pod_for_all_namespaces, label_selector=label_selector or None)
+        else:
+            items = self._iter_raw(self.core_api.list_namespaced_pod, namespace, label_selector=label_selector or None)
+        return [target for item in items for target in log_targets(item)]
+
+    def stream_pod_log(self, name, namespace, container=None, tail_lines=None, since_seconds=None):
+        """Yield log lines as they are read off the socket; raises ApiException."""
+        resp = self.core_api.read_namespaced_pod_log(
+            name=name, namespace=namespace, container=container,
+            tail_lines=tail_lines, since_seconds=since_seconds, _preload_content=False
+        )
+        try:
+            pending = b""
+            for chunk in resp.stream(LOG_CHUNK_SIZE):
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8", "replace")
+            if pending:
+                yield pending.decode("utf-8", "replace")
+        finally:
+            resp.release_conn()
+
     def get_events(self, namespace="default"):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
-            from datetime import datetime
             if namespace == "all":
-                events = self.core_api.list_event_for_all_namespaces()
+                items = self._iter_raw(self.core_api.list_event_for_all_namespaces)
             else:
-                events = self.core_api.list_namespaced_event(namespace)
-                
-            result = []
-            for e in events.items:
-                if e.involved_object.kind == "Pod":
-                    result.append({
-                        "type": e.type,
-                        "reason": e.reason,
-                        "message": e.message,
-                        "pod": e.involved_object.name,
-                        "time": e.last_timestamp.isoformat() if e.last_timestamp else None
-                    })
-            result.sort(key=lambda x: x["time"] or "", reverse=True)
-            return result[:100]
+                items = self._iter_raw(self.core_api.list_namespaced_event, namespace)
+
+            return [r._asdict() for r in newest_pod_events(project_event(item) for item in items)]
         except ApiException as e:
             return {"error": str(e)}
 
-    def delete_pod(self, name, namespace="default"):
+    def delete_pod(self, name, namespace="default", dry_run=False):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
-            self.core_api.delete_namespaced_pod(name=name, namespace=namespace)
+            self.core_api.delete_namespaced_pod(name=name, namespace=namespace, dry_run=_dry_run(dry_run))
             return {"success": True, "message": f"Pod {name} deleted"}
         except ApiException as e:
             return {"error": str(e)}
 
-    def restart_deployment(self, name, namespace="default"):
+    def restart_deployment(self, name, namespace="default", dry_run=False):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
             from datetime import datetime, timezone
@@ -359,16 +553,16 @@ class K8sClient:
                     }
                 }
             }
-            self.apps_api.patch_namespaced_deployment(name=name, namespace=namespace, body=body)
+            self.apps_api.patch_namespaced_deployment(name=name, namespace=namespace, body=body, dry_run=_dry_run(dry_run))
             return {"success": True, "message": f"Deployment {name} restarted"}
         except ApiException as e:
             return {"error": str(e)}
 
-    def scale_deployment(self, name, replicas, namespace="default"):
+    def scale_deployment(self, name, replicas, namespace="default", dry_run=False):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
             body = {"spec": {"replicas": replicas}}
-            self.apps_api.patch_namespaced_deployment_scale(name=name, namespace=namespace, body=body)
+            self.apps_api.patch_namespaced_deployment_scale(name=name, namespace=namespace, body=body, dry_run=_dry_run(dry_run))
             return {"success": True, "message": f"Deployment {name} scaled to {replicas}"}
         except ApiException as e:
             return {"error": str(e)}
@@ -376,59 +570,15 @@ class K8sClient:
     def get_pod_details(self, name, namespace="default"):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
-            pod = self.core_api.read_namespaced_pod(name=name, namespace=namespace)
-            
-            containers = []
-            for c in pod.spec.containers:
-                # Find corresponding status
-                status = None
-                if pod.status.container_statuses:
-                    for cs in pod.status.container_statuses:
-                        if cs.name == c.name:
-                            status = cs
-                            break
-
-                state = "Unknown"
-                if status and status.state:
-                    if status.state.running: state = "Running"
-                    elif status.state.waiting: state = f"Waiting ({status.state.waiting.reason})"
-                    elif status.state.terminated: state = f"Terminated ({status.state.terminated.reason})"
-                
-                req_cpu, req_mem, lim_cpu, lim_mem = "", "", "", ""
-                if c.resources:
-                    if c.resources.requests:
-                        req_cpu = c.resources.requests.get('cpu', '')
-                        req_mem = c.resources.requests.get('memory', '')
-                    if c.resources.limits:
-                        lim_cpu = c.resources.limits.get('cpu', '')
-                        lim_mem = c.resources.limits.get('memory', '')
-
-                containers.append({
-                    "name": c.name,
-                    "image": c.image,
-                    "state": state,
-                    "restarts": status.restart_count if status else 0,
-                    "ready": status.ready if status else False,
-                    "requests": {"cpu": req_cpu, "memory": req_mem},
-                    "limits": {"cpu": lim_cpu, "memory": lim_mem}
-                })
-                
-            return {
-                "name": pod.metadata.name,
-                "namespace": pod.metadata.namespace,
-                "status": pod.status.phase,
-                "node": pod.spec.node_name,
-                "ip": pod.status.pod_ip,
-                "host_ip": pod.status.host_ip,
-                "start_time": pod.status.start_time.isoformat() if pod.status.start_time else None,
-                "labels": pod.metadata.labels or {},
-                "annotations": pod.metadata.annotations or {},
-                "containers": containers
-            }
+            resp = self.core_api.read_namespaced_pod(name=name, namespace=namespace, _preload_content=False)
+            try:
+                return project_pod_details(orjson.loads(resp.data))
+            finally:
+                resp.release_conn()
         except ApiException as e:
             return {"error": str(e)}
 
-    def patch_deployment_resources(self, name, namespace="default", cpu_limit=None, memory_limit=None):
+    def patch_deployment_resources(self, name, namespace="default", cpu_limit=None, memory_limit=None, dry_run=False):
         if not self.is_connected(): return {"error": "Native K8s client not configured."}
         try:
             resources = {"requests": {}, "limits": {}}
@@ -463,7 +613,7 @@ class K8sClient:
                     }
                 }
             }
-            self.apps_api.patch_namespaced_deployment(name=name, namespace=namespace, body=body)
+            self.apps_api.patch_namespaced_deployment(name=name, namespace=namespace, body=body, dry_run=_dry_run(dry_run))
             return {"success": True, "message": f"Deployment {name} resources updated"}
         except ApiException as e:
             return {"error": str(e)}
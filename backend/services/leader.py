@@ -0,0 +1,39 @@
+import fcntl
+import os
+
+LOCK_DIR = os.getenv("LOCK_DIR", "data")
+
+
+class Leadership:
+    """Non-blocking file lock used to elect one uvicorn worker for background jobs.
+
+    The lock is released by the OS when the holding process exits, so another
+    worker takes over on its next acquire() attempt.
+    """
+
+    def __init__(self, name):
+        self.path = os.path.join(LOCK_DIR, f"{name}.lock")
+        self._fh = None
+
+    @property
+    def held(self):
+        return self._fh is not None
+
+    def acquire(self):
+        if self._fh is not None:
+            return True
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        fh = open(self.path, "w")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        self._fh = fh
+        return True
+
+    def release(self):
+        if self._fh is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
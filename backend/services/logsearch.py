@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+from collections import deque
+from contextlib import aclosing
+
+logger = logging.getLogger(__name__)
+
+# Containers whose logs are read at the same time
+LOG_SEARCH_CONCURRENCY = int(os.getenv("LOG_SEARCH_CONCURRENCY", "20"))
+LOG_SEARCH_MAX_TARGETS = int(os.getenv("LOG_SEARCH_MAX_TARGETS", "200"))
+LOG_SEARCH_TAIL = int(os.getenv("LOG_SEARCH_TAIL", "10000"))
+MAX_CONTEXT = 20
+
+
+def compile_pattern(pattern, regex=False, ignore_case=False):
+    """Raises re.error for an invalid regex."""
+    return re.compile(pattern if regex else re.escape(pattern), re.IGNORECASE if ignore_case else 0)
+
+
+class LineScanner:
+    """grep -B/-A over a stream of lines, holding only the context window in memory."""
+
+    def __init__(self, matcher, before=0, after=0):
+        self.matcher = matcher
+        self.after = after
+        self.recent = deque(maxlen=before)
+        self.pending = deque()
+        self.line_number = 0
+
+    def feed(self, line):
+        """Consume one line; returns the matches whose context is now complete."""
+        self.line_number += 1
+        done = []
+        for match in self.pending:
+            match["after"].append(line)
+        while self.pending and len(self.pending[0]["after"]) >= self.after:
+            done.append(self.pending.popleft())
+        if self.matcher.search(line):
+            match = {"line_number": self.line_number, "line": line, "before": list(self.recent), "after": []}
+            if self.after:
+                self.pending.append(match)
+            else:
+                done.append(match)
+        self.recent.append(line)
+        return done
+
+    def flush(self):
+        """Matches still waiting for trailing context when the log ends."""
+        done = list(self.pending)
+        self.pending.clear()
+        return done
+
+
+async def search_logs(targets, stream, matcher, context=0, limit=1000):
+    """Scan the logs of (namespace, pod, container) targets concurrently.
+
+    stream(namespace, pod, container) returns the log lines as an async iterator (async
+    client) or a regular one, which is then consumed in a worker thread. Yields
+    match and per-target error records as they are found, then a summary.
+    Scanning stops once `limit` matches were produced.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(LOG_SEARCH_CONCURRENCY)
+    stopped = threading.Event()
+    counts = {"matches": 0, "errors": 0}
+    done = object()
+
+    def emit(record):
+        if "error" in record:
+            counts["errors"] += 1
+        elif counts["matches"] >= limit:
+            return
+        else:
+            counts["matches"] += 1
+            if counts["matches"] >= limit:
+                stopped.set()
+        queue.put_nowait(record)
+
+    def scan_sync(target, lines):
+        scanner = LineScanner(matcher, context, context)
+        try:
+            for line in lines:
+                if stopped.is_set():
+                    return
+                for match in scanner.feed(line):
+                    loop.call_soon_threadsafe(emit, dict(match, **target))
+        finally:
+            lines.close()
+        for match in scanner.flush():
+            loop.call_soon_threadsafe(emit, dict(match, **target))
+
+    async def scan(namespace, pod, container):
+        target = {"namespace": namespace, "pod": pod, "container": container}
+        async with semaphore:
+            if stopped.is_set():
+                return
+            try:
+                lines = stream(namespace, pod, container)
+                if not hasattr(lines, "__aiter__"):
+                    await asyncio.to_thread(scan_sync, target, lines)
+                    return
+                scanner = LineScanner(matcher, context, context)
+                async with aclosing(lines):
+                    async for line in lines:
+                        if stopped.is_set():
+                            return
+                        for match in scanner.feed(line):
+                            emit(dict(match, **target))
+                for match in scanner.flush():
+                    emit(dict(match, **target))
+            except Exception as e:
+                logger.warning(f"Log search of {namespace}/{pod}/{container} failed: {e}")
+                emit(dict(target, error=str(e)))
+
+    async def scan_all():
+        await asyncio.gather(*(scan(*target) for target in targets))
+        queue.put_nowait(done)
+
+    runner = asyncio.create_task(scan_all())
+    try:
+        while True:
+            record = await queue.get()
+            if record is done:
+                break
+            yield record
+    finally:
+        # Also reached when the client disconnects: stop readers and threads
+        stopped.set()
+        runner.cancel()
+    yield {
+        "done": True,
+        "targets": len(targets),
+        "matches": counts["matches"],
+        "errors": counts["errors"],
+        "truncated": counts["matches"] >= limit,
+    }
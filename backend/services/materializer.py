@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.leader import Leadership
+from services.registry import get_cache
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZER_ENABLED = os.getenv("MATERIALIZER_ENABLED", "true").lower() == "true"
+# A view is kept materialized while someone requested it within this many seconds
+MATERIALIZE_IDLE = int(os.getenv("MATERIALIZE_IDLE", "300"))
+MATERIALIZE_CONCURRENCY = int(os.getenv("MATERIALIZE_CONCURRENCY", "4"))
+TICK_SECONDS = 1
+# Workers record "viewed" at most this often per view
+TOUCH_INTERVAL = 5
+
+
+class View:
+    def __init__(self, name, key, interval, loader):
+        self.name = name
+        self.key = key
+        self.interval = interval
+        self.loader = loader
+
+
+_views = {}
+_touched = {}
+
+
+def register(name, interval, loader, key=None):
+    """Declare a default view refreshed every `interval` seconds by loader(), which raises on failure.
+
+    `key` places the snapshot in the shared cache, e.g. under a prefix that
+    mutations already invalidate.
+    """
+    _views[name] = View(name, key or f"view:{name}", interval, loader)
+
+
+def _touch(view):
+    now = time.monotonic()
+    if now - _touched.get(view.name, 0.0) >= TOUCH_INTERVAL:
+        _touched[view.name] = now
+        get_cache().set(f"viewed:{view.name}", 1, MATERIALIZE_IDLE)
+
+
+def snapshot(name):
+    """(data, age in seconds) of the view's latest snapshot, or None.
+
+    Also marks the view as in use, so the scheduler keeps (or starts) refreshing it.
+    """
+    if not MATERIALIZER_ENABLED:
+        return None
+    view = _views[name]
+    _touch(view)
+    snap = get_cache().get(view.key)
+    if snap is None:
+        return None
+    return snap["data"], max(0.0, time.time() - snap["at"])
+
+
+def refresh(view):
+    data = view.loader()
+    # Snapshots outlive one missed refresh, then requests fall back to live data
+    get_cache().set(view.key, {"data": data, "at": time.time()}, view.interval * 2)
+
+
+def prewarm(prefix):
+    """Refresh the views whose names start with `prefix` and that have no snapshot yet,
+    so a starting worker's first page loads are served from them. Failures are only logged."""
+    if not MATERIALIZER_ENABLED:
+        return
+    for view in list(_views.values()):
+        if not view.name.startswith(prefix) or get_cache().get(view.key) is not None:
+            continue
+        try:
+            refresh(view)
+        except Exception as e:
+            logger.warning(f"Pre-warming {view.name} failed: {e}")
+
+
+class Materializer:
+    """Background thread in the elected worker that refreshes recently viewed views on their cadence."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader = Leadership("materializer")
+        self._pool = None
+        self._last_run = {}
+        self._running = set()
+
+    def start(self):
+        if not MATERIALIZER_ENABLED or self._thread:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=MATERIALIZE_CONCURRENCY, thread_name_prefix="materializer")
+        self._thread = threading.Thread(target=self._loop, name="materializer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._leader.release()
+
+    def run_due(self):
+        now = time.monotonic()
+        for view in list(_views.values()):
+            if view.name in self._running or now - self._last_run.get(view.name, float("-inf")) < view.interval:
+                continue
+            if get_cache().get(f"viewed:{view.name}") is None:
+                continue
+            self._last_run[view.name] = now
+            self._running.add(view.name)
+            self._pool.submit(self._refresh, view)
+
+    def _refresh(self, view):
+        try:
+            refresh(view)
+        except Exception as e:
+            logger.warning(f"Materializing {view.name} failed: {e}")
+        finally:
+            self._running.discard(view.name)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self._leader.acquire():
+                try:
+                    self.run_due()
+                except Exception as e:
+                    logger.error(f"Materializer run failed: {e}")
+            self._stop.wait(TICK_SECONDS)
+
+
+materializer_job = Materializer()
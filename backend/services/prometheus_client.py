@@ -1,29 +1,215 @@
 # app/services/prometheus_client.py (extend)
-import os, requests, time
+import os, re, requests, threading, time, math
+import orjson
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
 PROM_URL = os.getenv("PROMETHEUS_URL", "http://localhost:9090")
 
+# Prometheus refuses range queries returning more than 11,000 points per series
+MAX_POINTS_PER_SERIES = int(os.getenv("PROM_MAX_POINTS_PER_SERIES", "11000"))
+# Windows at least this long (seconds) are split so several query workers evaluate them
+SPLIT_MIN_WINDOW = int(os.getenv("PROM_SPLIT_MIN_WINDOW", str(6 * 3600)))
+SPLIT_CONCURRENCY = int(os.getenv("PROM_SPLIT_CONCURRENCY", "4"))
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+
+
+def parse_duration(value):
+    """Convert a Prometheus duration ('15s', '1h30m') or plain number of seconds to float seconds."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    parts = _DURATION_RE.findall(str(value))
+    if not parts or "".join(n + u for n, u in parts) != str(value):
+        raise ValueError(f"Invalid duration: {value}")
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def check_range(start, end, step_seconds):
+    """Raise ValueError unless step_seconds is positive and start <= end.
+
+    start or end may be None, i.e. left to the query's defaults.
+    """
+    if not step_seconds > 0:
+        raise ValueError(f"step must be positive, got {step_seconds:g}s")
+    if start is not None and end is not None and start > end:
+        raise ValueError(f"start ({start:g}) is after end ({end:g})")
+
+
+def split_range(start, end, step_seconds, max_points=MAX_POINTS_PER_SERIES):
+    """Split [start, end] into step-aligned, non-overlapping sub-ranges.
+
+    Sub-ranges start at start + k*step, so Prometheus evaluates exactly the same
+    timestamps as it would for the whole window and no seam sample repeats.
+    Raises ValueError for an empty step or a reversed window, see check_range.
+    """
+    check_range(start, end, step_seconds)
+    points = int(math.floor((end - start) / step_seconds)) + 1
+    chunks = math.ceil(points / max_points)
+    if end - start >= SPLIT_MIN_WINDOW:
+        chunks = max(chunks, SPLIT_CONCURRENCY)
+    chunks = max(1, min(chunks, points))
+    per_chunk = math.ceil(points / chunks)
+
+    ranges = []
+    for first in range(0, points, per_chunk):
+        last = min(first + per_chunk, points) - 1
+        ranges.append((start + first * step_seconds, start + last * step_seconds))
+    return ranges
+
+
+def merge_matrices(responses):
+    """Stitch query_range responses for consecutive sub-ranges back together by series labels."""
+    series = {}
+    warnings = []
+    for res in responses:
+        warnings.extend(res.get("warnings") or [])
+        for item in res.get("data", {}).get("result", []):
+            key = tuple(sorted(item.get("metric", {}).items()))
+            merged = series.get(key)
+            if merged is None:
+                series[key] = {"metric": item.get("metric", {}), "values": list(item.get("values", []))}
+                continue
+            values = merged["values"]
+            last_ts = values[-1][0] if values else None
+            for point in item.get("values", []):
+                if last_ts is None or point[0] > last_ts:
+                    values.append(point)
+    merged = {"status": "success", "data": {"resultType": "matrix", "result": list(series.values())}}
+    if warnings:
+        merged["warnings"] = warnings
+    return merged
+
+
+def parse_endpoints(spec):
+    """'prod=http://prom-prod:9090,staging=http://prom-stg:9090' -> {name: value}, in order."""
+    endpoints = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        if not name.strip() or not value.strip():
+            raise ValueError(f"Invalid endpoint, expected name=value: {part}")
+        endpoints[name.strip()] = value.strip()
+    return endpoints
+
+# Named Prometheus servers, one per cluster. The first is the primary, which
+# single-cluster features (rollups, alerts, TSDB stats) read from.
+PROM_ENDPOINTS = parse_endpoints(os.getenv("PROMETHEUS_ENDPOINTS", "")) or {"default": PROM_URL}
+# Optional kubeconfig context of each endpoint, e.g. "prod=prod-admin,staging=kind-staging"
+PROM_CONTEXTS = parse_endpoints(os.getenv("PROMETHEUS_CONTEXTS", ""))
+# Per-endpoint budget of an instant query, and of each HTTP request to an
+# endpoint; slower servers are left out of merged results
+FEDERATION_TIMEOUT = float(os.getenv("PROM_FEDERATION_TIMEOUT", "15"))
+# Per-endpoint budget of a whole range query, which may be split into many requests
+FEDERATION_RANGE_TIMEOUT = float(os.getenv("PROM_FEDERATION_RANGE_TIMEOUT", "120"))
+FEDERATION_CONCURRENCY = int(os.getenv("PROM_FEDERATION_CONCURRENCY", "16"))
+# Timed-out calls an endpoint may still have running before it is skipped
+# outright, so one hung server can't occupy every federation worker
+FEDERATION_MAX_ABANDONED = int(os.getenv("PROM_FEDERATION_MAX_ABANDONED", "2"))
+# Label identifying the endpoint on federated series
+CLUSTER_LABEL = "cluster"
+
+_abandoned_lock = threading.Lock()
+
+def chart_points(res):
+    """First series of a query_range response as [{time: "HH:MM", value: float}]."""
+    try:
+        values = res["data"]["result"][0]["values"]
+        return [
+            {
+                "time": datetime.fromtimestamp(ts).strftime("%H:%M"),
+                "value": float(val)
+            }
+            for ts, val in values
+        ]
+    except Exception:
+        return []
+
+# Keep-alive connections per Prometheus host, shared by all request threads
+POOL_SIZE = int(os.getenv("PROM_POOL_SIZE", "16"))
+# Instant query results are shared across workers for this many seconds
+QUERY_CACHE_TTL = float(os.getenv("PROM_QUERY_CACHE_TTL", "10"))
+
 class PromClient:
-    def __init__(self, base=PROM_URL):
+    def __init__(self, base=PROM_URL, cache=None, timeout=FEDERATION_TIMEOUT):
         self.base = base.rstrip("/")
+        self.cache = cache
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def _req(self, path, params):
-        r = requests.get(f"{self.base}{path}", params=params, timeout=15)
+        r = self.session.get(f"{self.base}{path}", params=params, timeout=self.timeout)
         r.raise_for_status()
-        return r.json()
+        return orjson.loads(r.content)
+
+    def ready(self, timeout=2):
+        r = self.session.get(f"{self.base}/-/ready", timeout=timeout)
+        return r.status_code == 200
+
+    def query(self, query, ttl=QUERY_CACHE_TTL):
+        if not self.cache or not ttl:
+            return self._req("/api/v1/query", {"query": query})
+        return self.cache.get_or_set(
+            f"prom:{self.base}:query:{query}", ttl, lambda: self._req("/api/v1/query", {"query": query})
+        )
 
-    def query(self, query):
-        return self._req("/api/v1/query", {"query": query})
+    def label_values(self, label, match=None):
+        params = {"match[]": match} if match else {}
+        return self._req(f"/api/v1/label/{label}/values", params).get("data") or []
+
+    def tsdb_status(self, limit=10):
+        return self._req("/api/v1/status/tsdb", {"limit": limit}).get("data") or {}
 
     def query_range(self, query, start=None, end=None, step='15s'):
         if not end:
             end = int(time.time())
         if not start:
             start = end - 3600
-        params = {"query": query, "start": start, "end": end, "step": step}
+        ranges = split_range(start, end, parse_duration(step))
+        if len(ranges) == 1:
+            params = {"query": query, "start": start, "end": end, "step": step}
+            return self._req("/api/v1/query_range", params)
+
+        with ThreadPoolExecutor(max_workers=min(SPLIT_CONCURRENCY, len(ranges))) as pool:
+            return merge_matrices(list(pool.map(lambda r: self._fetch_range(query, r, step), ranges)))
+
+    def _fetch_range(self, query, sub_range, step):
+        params = {"query": query, "start": sub_range[0], "end": sub_range[1], "step": step}
         return self._req("/api/v1/query_range", params)
 
+    def iter_query_range(self, query, start=None, end=None, step='15s', max_points=MAX_POINTS_PER_SERIES):
+        """Yield the query_range response of each sub-range in time order.
+
+        Up to SPLIT_CONCURRENCY sub-ranges are fetched ahead of the consumer, so
+        memory is bounded by a few sub-ranges however long the window is.
+        """
+        if not end:
+            end = int(time.time())
+        if not start:
+            start = end - 3600
+        ranges = split_range(start, end, parse_duration(step), max_points)
+        pool = ThreadPoolExecutor(max_workers=min(SPLIT_CONCURRENCY, len(ranges)))
+        pending = deque()
+        try:
+            for sub_range in ranges:
+                pending.append(pool.submit(self._fetch_range, query, sub_range, step))
+                if len(pending) >= SPLIT_CONCURRENCY:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
     def query_range_values(self, query, start=None, end=None, step='15s'):
         res = self.query_range(query, start, end, step)
         # returns values array if single result else aggregated empty
@@ -34,18 +220,7 @@ class PromClient:
 
     def query_range_for_chart(self, query, start=None, end=None, step='15s'):
         """Transform Prometheus data to chart-friendly format: [{time: str, value: float}]"""
-        res = self.query_range(query, start, end, step)
-        try:
-            values = res["data"]["result"][0]["values"]
-            return [
-                {
-                    "time": datetime.fromtimestamp(ts).strftime("%H:%M"),
-                    "value": float(val)
-                }
-                for ts, val in values
-            ]
-        except Exception:
-            return []
+        return chart_points(self.query_range(query, start, end, step))
 
     def query_range_result_like_prom(self, resp_query, start=None, end=None, step='15s', default_to_empty=False):
         # Return JSON formatted like Prometheus query_range result -> frontend expects data.result[].values
@@ -53,3 +228,156 @@ class PromClient:
         if default_to_empty and (not res.get("data", {}).get("result")):
             return {"data": {"result": []}}
         return res
+
+
+def _tag(item, cluster):
+    metric = dict(item.get("metric") or {})
+    if CLUSTER_LABEL in metric:
+        # Keep a scraped label of the same name, as Prometheus federation does
+        metric[f"exported_{CLUSTER_LABEL}"] = metric[CLUSTER_LABEL]
+    metric[CLUSTER_LABEL] = cluster
+    return dict(item, metric=metric)
+
+
+class PromFleet:
+    """Several named Prometheus servers queried concurrently as one.
+
+    Each endpoint's series come back tagged with a `cluster` label. Endpoints
+    that fail or exceed their budget are left out: the merged response
+    then names them under "unavailable" and in "warnings", and only fails
+    when no endpoint answered.
+
+    A timed-out call can't be interrupted; it keeps its worker until its
+    current HTTP request times out. Such calls are tracked per endpoint, and
+    an endpoint with FEDERATION_MAX_ABANDONED of them is skipped until they end.
+    """
+
+    def __init__(self, clients, contexts=None, pool=None, abandoned=None):
+        self.clients = clients
+        self.contexts = contexts or {}
+        self.pool = pool or ThreadPoolExecutor(max_workers=FEDERATION_CONCURRENCY, thread_name_prefix="prom-fleet")
+        # {name: timed-out futures still running}, shared with select()ed fleets
+        self.abandoned = abandoned if abandoned is not None else {}
+        self.base = "fleet:" + ",".join(clients)
+
+    @classmethod
+    def from_endpoints(cls, endpoints, cache=None, contexts=None):
+        return cls({name: PromClient(url, cache) for name, url in endpoints.items()}, contexts)
+
+    @property
+    def primary(self):
+        return next(iter(self.clients.values()))
+
+    def endpoints(self):
+        return [
+            {"name": name, "context": self.contexts.get(name), "primary": i == 0}
+            for i, name in enumerate(self.clients)
+        ]
+
+    def client(self, name):
+        """PromClient of one endpoint; raises ValueError for unknown names."""
+        if name not in self.clients:
+            raise ValueError(f"Unknown cluster: {name}")
+        return self.clients[name]
+
+    def select(self, clusters=None):
+        """What to query for a comma-separated cluster selection (None or "all" for every endpoint).
+
+        With a single configured endpoint that is its plain PromClient, so
+        results look exactly as they did before federation.
+        """
+        if len(self.clients) == 1:
+            return self.primary
+        if not clusters or clusters == "all":
+            return self
+        names = [n.strip() for n in clusters.split(",") if n.strip()]
+        return PromFleet({name: self.client(name) for name in names}, self.contexts, self.pool, self.abandoned)
+
+    def _abandon(self, name, future):
+        """Track a timed-out call of endpoint `name` until it finishes."""
+        def release(f):
+            with _abandoned_lock:
+                self.abandoned[name].discard(f)
+        with _abandoned_lock:
+            self.abandoned.setdefault(name, set()).add(future)
+        future.add_done_callback(release)
+
+    def _fan_out(self, call, timeout=FEDERATION_TIMEOUT):
+        """call(client) on every endpoint at once -> ({name: result}, {name: error})."""
+        futures, errors = {}, {}
+        for name, client in self.clients.items():
+            with _abandoned_lock:
+                busy = len(self.abandoned.get(name, ()))
+            if busy >= FEDERATION_MAX_ABANDONED:
+                errors[name] = f"still running {busy} timed-out queries"
+                continue
+            futures[name] = self.pool.submit(call, client)
+        done, _ = wait(futures.values(), timeout=timeout)
+        results = {}
+        for name, future in futures.items():
+            if future not in done:
+                if not future.cancel():
+                    self._abandon(name, future)
+                errors[name] = f"timed out after {timeout:g}s"
+            elif future.exception() is not None:
+                errors[name] = str(future.exception())
+            else:
+                results[name] = future.result()
+        if not results:
+            raise RuntimeError("; ".join(f"{name}: {error}" for name, error in errors.items()))
+        return results, errors
+
+    def _merge(self, results, errors, result_type):
+        series = []
+        warnings = []
+        for name, res in results.items():
+            warnings.extend(res.get("warnings") or [])
+            data = res.get("data") or {}
+            if data.get("resultType") == "scalar":
+                # One unlabelled sample per endpoint becomes a one-element vector
+                series.append({"metric": {CLUSTER_LABEL: name}, "value": data.get("result")})
+                continue
+            series.extend(_tag(item, name) for item in data.get("result") or [])
+        merged = {"status": "success", "data": {"resultType": result_type, "result": series}}
+        warnings.extend(f"{CLUSTER_LABEL} {name} unavailable: {error}" for name, error in errors.items())
+        if warnings:
+            merged["warnings"] = warnings
+        if errors:
+            merged["unavailable"] = errors
+        return merged
+
+    def query(self, query, ttl=QUERY_CACHE_TTL):
+        return self._merge(*self._fan_out(lambda client: client.query(query, ttl)), "vector")
+
+    def query_range(self, query, start=None, end=None, step='15s'):
+        # Resolve the window once so every endpoint evaluates the same timestamps
+        if not end:
+            end = int(time.time())
+        if not start:
+            start = end - 3600
+        # Checked here, as failures inside the fan-out only mark endpoints unavailable
+        check_range(start, end, parse_duration(step))
+        return self._merge(
+            *self._fan_out(lambda client: client.query_range(query, start, end, step), FEDERATION_RANGE_TIMEOUT), "matrix"
+        )
+
+    def iter_query_range(self, query, start=None, end=None, step='15s', max_points=MAX_POINTS_PER_SERIES):
+        """PromClient.iter_query_range of each endpoint in turn, series tagged with their cluster.
+
+        Endpoints are read one after the other so memory stays bounded; unlike
+        query_range, a failing endpoint fails the iteration.
+        """
+        if not end:
+            end = int(time.time())
+        if not start:
+            start = end - 3600
+        for name, client in self.clients.items():
+            for res in client.iter_query_range(query, start, end, step, max_points):
+                data = res.get("data") or {}
+                yield dict(res, data=dict(data, result=[_tag(item, name) for item in data.get("result") or []]))
+
+    def query_range_result_like_prom(self, resp_query, start=None, end=None, step='15s', default_to_empty=False):
+        res = self.query_range(resp_query, start, end, step)
+        if default_to_empty and (not res.get("data", {}).get("result")):
+            return {"data": {"result": []}}
+        return res
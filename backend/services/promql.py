@@ -0,0 +1,92 @@
+import math
+import os
+import re
+from services.registry import get_cache
+
+# Series counts move slowly; repeated estimates of the same selector share one count()
+SERIES_COUNT_TTL = float(os.getenv("SERIES_COUNT_TTL", "60"))
+
+# Tokens that matter for finding vector selectors; everything else is one character
+_TOKEN_RE = re.compile(r'''
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`[^`]*`)
+  | (?P<matchers>\{(?:[^{}"']|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')*\})
+  | (?P<range>\[[^\]]*\])
+  | (?P<number>\d[\w.]*)
+  | (?P<ident>[a-zA-Z_:][a-zA-Z0-9_:]*)
+  | (?P<space>\s+)
+  | (?P<other>.)
+''', re.VERBOSE)
+
+# Followed by a parenthesized list of label names, not expressions
+_LABEL_LIST_KEYWORDS = {"by", "without", "on", "ignoring", "group_left", "group_right"}
+_KEYWORDS = _LABEL_LIST_KEYWORDS | {
+    "and", "or", "unless", "bool", "offset", "atan2", "inf", "nan",
+    "sum", "min", "max", "avg", "group", "stddev", "stdvar", "count", "count_values",
+    "bottomk", "topk", "quantile", "limitk", "limit_ratio",
+}
+
+
+def grouped_query(parts, by):
+    """Combine several aggregations into one query, tagging each with a `resource` label."""
+    return " or ".join(
+        f'label_replace(sum by ({by}) ({expr}), "resource", "{name}", "", "")'
+        for name, expr in parts
+    )
+
+
+def _tokens(query):
+    return [(m.lastgroup, m.group()) for m in _TOKEN_RE.finditer(query) if m.lastgroup != "space"]
+
+
+def extract_selectors(query):
+    """Instant-vector selectors referenced by a PromQL expression, e.g. 'up{job="node"}'.
+
+    A lightweight scan rather than a full parser: identifiers that are
+    functions, aggregations, keywords or grouping labels are skipped, and what
+    remains is a metric name with its optional {matchers}. Duplicates are dropped.
+    """
+    tokens = _tokens(query)
+    selectors = []
+    i = 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+        following = tokens[i + 1] if i + 1 < len(tokens) else (None, "")
+        if kind == "ident":
+            if text in _LABEL_LIST_KEYWORDS and following[1] == "(":
+                # Skip the label list, e.g. by (namespace, pod)
+                while i < len(tokens) and tokens[i][1] != ")":
+                    i += 1
+            elif text in _KEYWORDS or following[1] == "(":
+                pass
+            elif following[0] == "matchers":
+                selectors.append(text + following[1])
+                i += 1
+            else:
+                selectors.append(text)
+        elif kind == "matchers":
+            selectors.append(text)
+        elif kind == "other" and text == "@":
+            i += 1  # @ start() / @ <timestamp> modifier
+        i += 1
+    return list(dict.fromkeys(selectors))
+
+
+def series_count(prom, selector):
+    """Number of series a selector currently matches (one cheap count() query)."""
+    def load():
+        result = prom.query(f"count({selector})").get("data", {}).get("result") or []
+        # One row per endpoint when prom is a PromFleet
+        return sum(int(float(row["value"][1])) for row in result)
+    return get_cache().get_or_set(f"prom:{prom.base}:series:{selector}", SERIES_COUNT_TTL, load)
+
+
+def estimate_cost(prom, query, start=None, end=None, step_seconds=None):
+    """Series touched by each selector of a query, and for range queries the
+    samples that evaluating it at every step would produce (series x steps)."""
+    selectors = [{"selector": s, "series": series_count(prom, s)} for s in extract_selectors(query)]
+    series = sum(s["series"] for s in selectors)
+    cost = {"selectors": selectors, "series": series}
+    if start is not None and end is not None and step_seconds:
+        steps = int(math.floor((end - start) / step_seconds)) + 1
+        cost.update(steps=steps, samples=series * steps)
+    return cost
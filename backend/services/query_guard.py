@@ -0,0 +1,77 @@
+import logging
+import math
+import os
+from services.promql import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+# Samples (series x steps) a query may produce before its step is raised
+QUERY_SAMPLE_BUDGET = int(os.getenv("QUERY_SAMPLE_BUDGET", "2000000"))
+# Still above the budget after raising the step: the caller has to confirm
+QUERY_CONFIRM_SAMPLES = int(os.getenv("QUERY_CONFIRM_SAMPLES", str(QUERY_SAMPLE_BUDGET)))
+# Refused even when confirmed
+QUERY_REJECT_SAMPLES = int(os.getenv("QUERY_REJECT_SAMPLES", "50000000"))
+# A raised step never leaves fewer points per series than this
+QUERY_MIN_STEPS = int(os.getenv("QUERY_MIN_STEPS", "120"))
+
+# Steps the guard rounds up to, so adjusted queries stay cache- and eye-friendly
+_STEP_LADDER = [15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400]
+
+
+def _steps(start, end, step_seconds):
+    return int(math.floor((end - start) / step_seconds)) + 1
+
+
+def raised_step(start, end, step_seconds, series):
+    """Smallest ladder step keeping series x steps within the budget, bounded by QUERY_MIN_STEPS."""
+    window = end - start
+    needed = window * max(series, 1) / QUERY_SAMPLE_BUDGET
+    coarsest = window / QUERY_MIN_STEPS
+    best = step_seconds
+    for candidate in _STEP_LADDER:
+        if candidate > coarsest:
+            break
+        if candidate > step_seconds:
+            best = candidate
+            if candidate >= needed:
+                break
+    return best
+
+
+def plan_query(prom, query, start, end, step, step_seconds, auto_step=True, confirm=False):
+    """Decide how (and whether) to run a range query given its estimated cost.
+
+    Returns {"action", "step", "requested_step", "estimated"} where action is
+    "run", "adjusted" (step raised to fit the budget), "confirm" (too costly
+    without confirm=True) or "reject". A failed estimate never blocks the query.
+    """
+    plan = {"action": "run", "step": step, "requested_step": step, "estimated": None}
+    try:
+        cost = estimate_cost(prom, query, start, end, step_seconds)
+    except Exception as e:
+        logger.warning(f"Query cost estimate failed: {e}")
+        return plan
+    plan["estimated"] = cost
+    if cost["samples"] <= QUERY_SAMPLE_BUDGET:
+        return plan
+
+    if auto_step:
+        new_step = raised_step(start, end, step_seconds, cost["series"])
+        if new_step > step_seconds:
+            steps = _steps(start, end, new_step)
+            cost = dict(cost, steps=steps, samples=cost["series"] * steps)
+            plan.update(action="adjusted", step=f"{new_step}s", estimated=cost)
+            if cost["samples"] <= QUERY_SAMPLE_BUDGET:
+                return plan
+
+    if cost["samples"] > QUERY_REJECT_SAMPLES:
+        plan["action"] = "reject"
+    elif cost["samples"] > QUERY_CONFIRM_SAMPLES and not confirm:
+        plan["action"] = "confirm"
+    return plan
+
+
+def actual_cost(res):
+    """Series and samples a query_range response actually returned."""
+    result = (res.get("data") or {}).get("result") or []
+    return {"series": len(result), "samples": sum(len(series.get("values") or ()) for series in result)}
@@ -0,0 +1,212 @@
+import logging
+import os
+import threading
+import time
+from kubernetes import client as k8s_api
+
+logger = logging.getLogger(__name__)
+
+# Dependencies that must be reachable before /readyz reports ready. Prometheus and
+# Kubernetes are always probed and reported, but by default don't gate readiness:
+# an upstream outage would otherwise take login and every other page down with it.
+READY_REQUIRES = [d.strip() for d in os.getenv("READY_REQUIRES", "database").split(",") if d.strip()]
+# Upstreams are probed in the background this often; /readyz only reads the last results,
+# so a hung upstream can't make the probe itself time out
+READY_PROBE_INTERVAL = float(os.getenv("READY_PROBE_INTERVAL", "10"))
+PROBE_TIMEOUT = float(os.getenv("READY_PROBE_TIMEOUT", "2"))
+
+_lock = threading.Lock()
+_k8s = None
+_k8s_async = None
+_prom_fleet = None
+_cache = None
+
+K8S_ASYNC = os.getenv("K8S_ASYNC", "true").lower() == "true"
+
+_state = {"database": False, "warmed": False}
+_probes = {"checks": {}}
+
+
+def get_k8s():
+    """Process-wide K8sClient, created on first use."""
+    global _k8s
+    if _k8s is None:
+        with _lock:
+            if _k8s is None:
+                from services.k8s_client import K8sClient
+                _k8s = K8sClient()
+    return _k8s
+
+
+def get_k8s_async():
+    """Process-wide AsyncK8sClient sharing the sync client's configuration.
+
+    Returns None when the async path is disabled or Kubernetes isn't configured;
+    callers then use the sync client.
+    """
+    global _k8s_async
+    if _k8s_async is None and K8S_ASYNC:
+        k8s = get_k8s()
+        if not k8s.is_connected():
+            return None
+        with _lock:
+            if _k8s_async is None:
+                from services.k8s_async import AsyncK8sClient
+                _k8s_async = AsyncK8sClient(k8s.api_client.configuration)
+    return _k8s_async
+
+
+async def close_async():
+    global _k8s_async
+    if _k8s_async is not None:
+        await _k8s_async.aclose()
+        _k8s_async = None
+
+
+def get_prom_fleet():
+    """Process-wide PromFleet of every configured Prometheus, created on first use."""
+    global _prom_fleet
+    if _prom_fleet is None:
+        cache = get_cache()  # resolved outside _lock, which isn't re-entrant
+        with _lock:
+            if _prom_fleet is None:
+                from services.prometheus_client import PROM_CONTEXTS, PROM_ENDPOINTS, PromFleet
+                _prom_fleet = PromFleet.from_endpoints(PROM_ENDPOINTS, cache, PROM_CONTEXTS)
+    return _prom_fleet
+
+
+def get_prom():
+    """PromClient of the primary Prometheus."""
+    return get_prom_fleet().primary
+
+
+def active_cluster():
+    """Name of the Prometheus cluster the Kubernetes client acts on, or None if unknown.
+
+    That is the cluster mapped to the active kubeconfig context. In-cluster, or
+    when the context is mapped to no cluster, it is the primary, unless the
+    primary is mapped to a different context.
+    """
+    fleet = get_prom_fleet()
+    primary = fleet.endpoints()[0]["name"]
+    k8s = get_k8s()
+    if k8s.in_cluster:
+        return primary
+    for name, context in fleet.contexts.items():
+        if name in fleet.clients and context == k8s.current_context:
+            return name
+    return None if primary in fleet.contexts else primary
+
+
+def get_cache():
+    """Process-wide handle on the cross-worker SharedCache."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                from services.cache import create_cache
+                _cache = create_cache()
+    return _cache
+
+
+def mark_database_ready():
+    _state["database"] = True
+
+
+def _probe_kubernetes():
+    k8s = get_k8s()
+    if not k8s.is_connected():
+        return False
+    try:
+        k8s_api.VersionApi(k8s.api_client).get_code(_request_timeout=PROBE_TIMEOUT)
+        return True
+    except Exception as e:
+        logger.warning(f"Kubernetes readiness probe failed: {e}")
+        return False
+
+
+def _probe_prometheus():
+    try:
+        return get_prom().ready(timeout=PROBE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Prometheus readiness probe failed: {e}")
+        return False
+
+
+def probe():
+    """Check upstream connectivity now and store the results readiness() reports."""
+    _probes["checks"] = {"kubernetes": _probe_kubernetes(), "prometheus": _probe_prometheus()}
+    return _probes["checks"]
+
+
+class ProbeJob:
+    """Background thread re-running probe() every READY_PROBE_INTERVAL."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, name="readiness-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(READY_PROBE_INTERVAL):
+            try:
+                probe()
+            except Exception as e:
+                logger.error(f"Readiness probe run failed: {e}")
+
+
+probe_job = ProbeJob()
+
+
+def warm_up():
+    """Create the shared clients, open their connection pools and fill the default
+    views' snapshots before traffic arrives.
+
+    Failures are logged and never keep the worker unready.
+    """
+    started = time.monotonic()
+    checks = {}
+    try:
+        checks = probe()
+        k8s = get_k8s()
+        if checks.get("kubernetes"):
+            # Prime the apiserver connection pool and TLS session with a cheap list
+            try:
+                k8s.core_api.list_namespace(limit=1, _request_timeout=PROBE_TIMEOUT)
+                get_k8s_async()
+            except Exception as e:
+                logger.warning(f"Kubernetes warm-up failed: {e}")
+        if checks.get("prometheus"):
+            from services.capabilities import get_capabilities
+            get_capabilities()
+
+        from services import materializer
+        if checks.get("kubernetes"):
+            materializer.prewarm("k8s:")
+        if checks.get("prometheus"):
+            materializer.prewarm("overview:")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+    finally:
+        _state["warmed"] = True
+    logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s: {checks}")
+
+
+def readiness():
+    """Return (ready, checks) for the readiness probe, from the last background probe."""
+    checks = {"database": _state["database"], "warmed_up": _state["warmed"]}
+    if _state["warmed"]:
+        checks.update(_probes["checks"])
+    ready = checks["warmed_up"] and all(checks.get(dep, False) for dep in READY_REQUIRES)
+    return ready, checks
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import httpx
+from services.k8s_async import AsyncApiError
+from services.k8s_client import selector_string
+
+logger = logging.getLogger(__name__)
+
+# A rollout watch gives up (event "timeout") after this many seconds
+ROLLOUT_WATCH_TIMEOUT = int(os.getenv("ROLLOUT_WATCH_TIMEOUT", "600"))
+# Idle streams get a keepalive this often so proxies don't cut them
+HEARTBEAT_SECONDS = 15
+
+# Waiting reasons that mean a pod will not become ready on its own
+POD_FAILURE_REASONS = {
+    "CrashLoopBackOff",
+    "ImagePullBackOff",
+    "ErrImagePull",
+    "InvalidImageName",
+    "CreateContainerConfigError",
+    "CreateContainerError",
+    "RunContainerError",
+}
+
+
+def rollout_status(dep):
+    """Progress of a raw Deployment, judged the way `kubectl rollout status` does.
+
+    state is "pending" (spec change not yet observed), "progressing",
+    "complete", "stalled" (progress deadline exceeded) or "paused".
+    """
+    meta = dep.get("metadata") or {}
+    spec = dep.get("spec") or {}
+    status = dep.get("status") or {}
+    desired = spec.get("replicas", 1)
+    total = status.get("replicas", 0)
+    updated = status.get("updatedReplicas", 0)
+    available = status.get("availableReplicas", 0)
+    conditions = [
+        {k: c.get(k) for k in ("type", "status", "reason", "message")}
+        for c in status.get("conditions") or ()
+    ]
+    by_type = {c["type"]: c for c in conditions}
+    progressing = by_type.get("Progressing") or {}
+    replica_failure = by_type.get("ReplicaFailure") or {}
+
+    if meta.get("generation", 0) > status.get("observedGeneration", 0):
+        state, message = "pending", "Waiting for the deployment spec update to be observed"
+    elif progressing.get("reason") == "ProgressDeadlineExceeded":
+        state, message = "stalled", progressing.get("message") or "Progress deadline exceeded"
+    elif spec.get("paused"):
+        state, message = "paused", "Rollout is paused"
+    elif updated < desired:
+        state, message = "progressing", f"{updated} of {desired} new replicas have been updated"
+    elif total > updated:
+        state, message = "progressing", f"{total - updated} old replicas are pending termination"
+    elif available < updated:
+        state, message = "progressing", f"{available} of {updated} updated replicas are available"
+    else:
+        state, message = "complete", "Rollout complete"
+    if replica_failure.get("status") == "True" and state != "stalled":
+        message = f"{message}; {replica_failure.get('message') or replica_failure.get('reason')}"
+
+    return {
+        "state": state,
+        "message": message,
+        "replicas": desired,
+        "current": total,
+        "updated": updated,
+        "ready": status.get("readyReplicas", 0),
+        "available": available,
+        "unavailable": status.get("unavailableReplicas", 0),
+        "conditions": conditions,
+    }
+
+
+def pod_problems(pod):
+    """Reasons a pod is failing to come up, e.g. CrashLoopBackOff or Unschedulable."""
+    name = (pod.get("metadata") or {}).get("name")
+    status = pod.get("status") or {}
+    problems = []
+    for c in status.get("conditions") or ():
+        if c.get("type") == "PodScheduled" and c.get("status") == "False":
+            problems.append({"pod": name, "container": None, "reason": c.get("reason") or "Unschedulable", "message": c.get("message")})
+    for cs in (status.get("initContainerStatuses") or []) + (status.get("containerStatuses") or []):
+        waiting = (cs.get("state") or {}).get("waiting") or {}
+        if waiting.get("reason") in POD_FAILURE_REASONS:
+            problems.append({"pod": name, "container": cs.get("name"), "reason": waiting["reason"], "message": waiting.get("message")})
+    return problems
+
+
+async def watch_rollout(k8s, namespace, name, timeout=ROLLOUT_WATCH_TIMEOUT):
+    """Yield the rollout progress of one Deployment from two watches: the
+    Deployment itself and the pods its selector matches.
+
+    Events are dicts with an "event" of "progress", "pods", then one final
+    "complete", "stalled", "deleted", "timeout" or "error". None is yielded
+    when nothing happened for HEARTBEAT_SECONDS.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    async def pump(kind, open_watch):
+        # Resume from the last seen resourceVersion whenever the server ends a watch
+        version = None
+        while True:
+            try:
+                async for event_type, obj in open_watch(version):
+                    if event_type == "ERROR":
+                        if obj.get("code") == 410:
+                            version = None  # too old: start over from the current state
+                            break
+                        raise AsyncApiError(obj.get("code"), obj.get("reason"), obj.get("message"))
+                    version = (obj.get("metadata") or {}).get("resourceVersion") or version
+                    if event_type != "BOOKMARK":
+                        queue.put_nowait((kind, event_type, obj))
+            except (AsyncApiError, httpx.HTTPError) as e:
+                logger.warning(f"Rollout watch of {kind} for {namespace}/{name} failed: {e}")
+                queue.put_nowait(("error", None, str(e)))
+                return
+
+    deadline = loop.time() + timeout
+    tasks = [asyncio.create_task(pump("deployment", lambda version: k8s.watch_deployment(name, namespace, version)))]
+    last = {}
+    pods = {}
+    problems = []
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield {"event": "timeout", **last}
+                return
+            try:
+                kind, event_type, obj = await asyncio.wait_for(queue.get(), min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield None
+                continue
+
+            if kind == "error":
+                yield {"event": "error", "error": obj}
+                return
+            if kind == "deployment":
+                if event_type == "DELETED":
+                    yield {"event": "deleted"}
+                    return
+                if len(tasks) == 1:
+                    selector = selector_string((obj.get("spec") or {}).get("selector") or {})
+                    tasks.append(asyncio.create_task(pump("pods", lambda version: k8s.watch_pods(namespace, selector, version))))
+                status = rollout_status(obj)
+                if status != last:
+                    last = status
+                    yield {"event": "progress", **status}
+                if status["state"] in ("complete", "stalled"):
+                    yield {"event": status["state"], **status, "problems": problems}
+                    return
+            else:
+                pod = (obj.get("metadata") or {}).get("name")
+                if event_type == "DELETED":
+                    pods.pop(pod, None)
+                else:
+                    pods[pod] = pod_problems(obj)
+                current = [p for found in pods.values() for p in found]
+                if current != problems:
+                    problems = current
+                    yield {"event": "pods", "problems": problems}
+    finally:
+        for task in tasks:
+            task.cancel()
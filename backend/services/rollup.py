@@ -0,0 +1,235 @@
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func
+from db.database import SessionLocal
+from db.models import MetricRollup
+from services.alerts import alert_engine
+from services.capabilities import panel_available
+from services.leader import Leadership
+from services.prometheus_client import parse_duration
+from services.registry import get_prom
+
+logger = logging.getLogger(__name__)
+
+# Built-in dashboard series; the overview chart endpoints use the same queries
+DASHBOARD_QUERIES = {
+    "cpu": '100 - (avg by(instance)(irate(node_cpu_seconds_total{mode="idle"}[1m])) * 100)',
+    "memory": '(1 - (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes)) * 100',
+    "disk": """
+        100 - (
+            node_filesystem_free_bytes{fstype!~"tmpfs|fuse.lxcfs|overlay"} /
+            node_filesystem_size_bytes{fstype!~"tmpfs|fuse.lxcfs|overlay"} * 100
+        )
+        """,
+    "network_rx": 'irate(node_network_receive_bytes_total{device!="lo"}[1m])',
+    "network_tx": 'irate(node_network_transmit_bytes_total{device!="lo"}[1m])',
+    "load": 'node_load1',
+    "pod_restarts": 'sum(increase(kube_pod_container_status_restarts_total[5m]))',
+}
+
+# (bucket width, retention) in seconds, finest first. Coarser levels are built
+# from the level before them, so only the 1m level reads from Prometheus.
+RESOLUTIONS = [
+    (60, int(os.getenv("ROLLUP_RETENTION_1M", str(2 * 86400)))),
+    (300, int(os.getenv("ROLLUP_RETENTION_5M", str(14 * 86400)))),
+    (3600, int(os.getenv("ROLLUP_RETENTION_1H", str(400 * 86400)))),
+]
+
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "true").lower() == "true"
+ROLLUP_INTERVAL = int(os.getenv("ROLLUP_INTERVAL", "60"))
+# How far back the first run pulls raw samples for the 1m level
+ROLLUP_BACKFILL = int(os.getenv("ROLLUP_BACKFILL", str(6 * 3600)))
+RAW_STEP = os.getenv("ROLLUP_RAW_STEP", "15s")
+# Chart windows shorter than this always go to Prometheus
+ROLLUP_MIN_WINDOW = int(os.getenv("ROLLUP_MIN_WINDOW", str(6 * 3600)))
+ROLLUP_MAX_POINTS = int(os.getenv("ROLLUP_MAX_POINTS", "1500"))
+
+
+def _aggregate(points):
+    """points: iterable of (ts, min, max, avg, last, count) ordered by ts."""
+    lo = hi = last = None
+    total = 0.0
+    count = 0
+    for _, p_min, p_max, p_avg, p_last, p_count in points:
+        lo = p_min if lo is None else min(lo, p_min)
+        hi = p_max if hi is None else max(hi, p_max)
+        total += p_avg * p_count
+        count += p_count
+        last = p_last
+    return lo, hi, (total / count if count else None), last, count
+
+
+def _bucketize(points, resolution, upto):
+    """Group (ts, min, max, avg, last, count) points into complete buckets before `upto`."""
+    buckets = {}
+    for point in points:
+        bucket = int(point[0] // resolution * resolution)
+        if bucket + resolution <= upto:
+            buckets.setdefault(bucket, []).append(point)
+    return {b: _aggregate(pts) for b, pts in sorted(buckets.items())}
+
+
+def _latest_bucket(db, series, resolution):
+    return db.query(func.max(MetricRollup.bucket)).filter(
+        MetricRollup.series == series, MetricRollup.resolution == resolution
+    ).scalar()
+
+
+def _store(db, series, resolution, buckets):
+    db.add_all([
+        MetricRollup(series=series, resolution=resolution, bucket=b, min=lo, max=hi, avg=avg, last=last, count=count)
+        for b, (lo, hi, avg, last, count) in buckets.items()
+        if count
+    ])
+
+
+def _collect_raw(db, series, query, now):
+    """Write new 1m buckets for a series and return them as {bucket: aggregate}."""
+    resolution = RESOLUTIONS[0][0]
+    latest = _latest_bucket(db, series, resolution)
+    start = latest + resolution if latest is not None else now - ROLLUP_BACKFILL
+    start = int(max(start, now - RESOLUTIONS[0][1]) // resolution * resolution)
+    upto = int(now // resolution * resolution)
+    if upto <= start:
+        return {}
+    values = get_prom().query_range_values(query, start=start, end=upto - 1, step=RAW_STEP)
+    raw = []
+    for ts, v in values:
+        v = float(v)
+        if math.isfinite(v):
+            raw.append((float(ts), v, v, v, v, 1))
+    buckets = _bucketize(raw, resolution, upto)
+    _store(db, series, resolution, buckets)
+    return buckets
+
+
+def _cascade(db, series, now):
+    """Build each coarser level from completed buckets of the level below it."""
+    for (fine, _), (coarse, _) in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+        latest = _latest_bucket(db, series, coarse)
+        start = latest + coarse if latest is not None else 0
+        upto = int(now // coarse * coarse)
+        if upto <= start:
+            continue
+        rows = db.query(MetricRollup).filter(
+            MetricRollup.series == series,
+            MetricRollup.resolution == fine,
+            MetricRollup.bucket >= start,
+            MetricRollup.bucket < upto,
+        ).order_by(MetricRollup.bucket).all()
+        points = [(r.bucket, r.min, r.max, r.avg, r.last, r.count) for r in rows]
+        _store(db, series, coarse, _bucketize(points, coarse, upto))
+
+
+def _prune(db, now):
+    for resolution, retention in RESOLUTIONS:
+        db.query(MetricRollup).filter(
+            MetricRollup.resolution == resolution, MetricRollup.bucket < now - retention
+        ).delete(synchronize_session=False)
+
+
+def run_once(now=None):
+    now = now or time.time()
+    db = SessionLocal()
+    try:
+        for series, query in DASHBOARD_QUERIES.items():
+            if not panel_available(series):
+                continue
+            try:
+                buckets = _collect_raw(db, series, query, now)
+                _cascade(db, series, now)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Rollup of {series} failed: {e}")
+                continue
+            # Alert rules are evaluated on the fresh 1m averages, not on extra queries
+            try:
+                alert_engine.observe(db, series, [(b, agg[2]) for b, agg in buckets.items() if agg[4]])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Alert evaluation of {series} failed: {e}")
+        _prune(db, now)
+        alert_engine.prune(db, now)
+        db.commit()
+    finally:
+        db.close()
+
+
+def read_chart(series, start, end, step):
+    """Serve a chart window from rollups, or return None when Prometheus should answer.
+
+    Uses the coarsest level that still gives roughly ROLLUP_MAX_POINTS points and
+    falls back to coarser levels when the finer ones don't cover the window.
+    """
+    if not ROLLUP_ENABLED or series not in DASHBOARD_QUERIES or not start or not end:
+        return None
+    window = end - start
+    if window < ROLLUP_MIN_WINDOW:
+        return None
+    desired = max(parse_duration(step), window / ROLLUP_MAX_POINTS)
+    candidates = [r for r, _ in RESOLUTIONS if r >= desired] or [RESOLUTIONS[-1][0]]
+    finer = [r for r, _ in RESOLUTIONS if r < desired]
+    if finer:
+        candidates.insert(0, finer[-1])
+
+    db = SessionLocal()
+    try:
+        for resolution in candidates:
+            bounds = db.query(func.min(MetricRollup.bucket), func.max(MetricRollup.bucket)).filter(
+                MetricRollup.series == series, MetricRollup.resolution == resolution
+            ).one()
+            if bounds[0] is None or bounds[0] > start + resolution or bounds[1] < end - 2 * resolution:
+                continue
+            rows = db.query(MetricRollup.bucket, MetricRollup.avg).filter(
+                MetricRollup.series == series,
+                MetricRollup.resolution == resolution,
+                MetricRollup.bucket >= start,
+                MetricRollup.bucket <= end,
+            ).order_by(MetricRollup.bucket).all()
+            return [
+                {"time": datetime.fromtimestamp(bucket).strftime("%H:%M"), "value": avg}
+                for bucket, avg in rows
+            ]
+        return None
+    finally:
+        db.close()
+
+
+class RollupJob:
+    """Background thread running run_once() every ROLLUP_INTERVAL in the elected worker."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader = Leadership("rollup")
+
+    def start(self):
+        if not ROLLUP_ENABLED or self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, name="rollup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._leader.release()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self._leader.acquire():
+                try:
+                    run_once()
+                except Exception as e:
+                    logger.error(f"Rollup run failed: {e}")
+            self._stop.wait(ROLLUP_INTERVAL)
+
+
+rollup_job = RollupJob()
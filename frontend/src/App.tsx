@@ -9,6 +9,8 @@ import Explore from './pages/Explorer';
 import Kubernetes from './pages/kubernetes';
 import PodDetail from './pages/kubernetes/PodDetail';
 import Optimization from './pages/Optimization';
+import Cardinality from './pages/Cardinality';
+import Anomalies from './pages/Anomalies';
 import Settings from './pages/Settings';
 import { getTheme } from './theme';
 import axios from 'axios';
@@ -56,6 +58,8 @@ const App: React.FC = () => {
               <Route path="kubernetes" element={<Kubernetes />} />
               <Route path="kubernetes/:namespace/:name" element={<PodDetail />} />
               <Route path="optimization" element={<Optimization />} />
+              <Route path="cardinality" element={<Cardinality />} />
+              <Route path="anomalies" element={<Anomalies />} />
               <Route path="settings" element={<Settings />} />
             </Route>
 
@@ -0,0 +1,51 @@
+import React, { useEffect, useState } from 'react';
+import { TextField, MenuItem } from '@mui/material';
+import axios from 'axios';
+import API_URL from '../config';
+
+interface PrometheusEndpoint {
+    name: string;
+    context: string | null;
+    primary: boolean;
+}
+
+interface ClusterSelectProps {
+    value: string;
+    onChange: (cluster: string) => void;
+    // Offer "All clusters" (fan-out) rather than defaulting to the primary one
+    allowAll?: boolean;
+}
+
+// Picks one of the configured Prometheus endpoints; renders nothing with a single one
+const ClusterSelect: React.FC<ClusterSelectProps> = ({ value, onChange, allowAll = false }) => {
+    const [endpoints, setEndpoints] = useState<PrometheusEndpoint[]>([]);
+
+    useEffect(() => {
+        const token = localStorage.getItem('token');
+        axios.get(`${API_URL}/api/metrics/prometheus/endpoints`, { headers: { Authorization: `Bearer ${token}` } })
+            .then(res => setEndpoints(res.data.endpoints || []))
+            .catch(() => setEndpoints([]));
+    }, []);
+
+    if (endpoints.length < 2) return null;
+
+    return (
+        <TextField
+            select
+            size="small"
+            label="Cluster"
+            value={value}
+            onChange={(e) => onChange(e.target.value)}
+            sx={{ minWidth: 160 }}
+        >
+            {allowAll ? <MenuItem value="">All clusters</MenuItem> : null}
+            {endpoints.map(ep => (
+                <MenuItem key={ep.name} value={allowAll || !ep.primary ? ep.name : ''}>
+                    {ep.name}{ep.primary ? ' (primary)' : ''}
+                </MenuItem>
+            ))}
+        </TextField>
+    );
+};
+
+export default ClusterSelect;
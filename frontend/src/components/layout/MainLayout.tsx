@@ -9,6 +9,8 @@ import DashboardIcon from '@mui/icons-material/Dashboard';
 import ExploreIcon from '@mui/icons-material/Explore';
 import SavingsIcon from '@mui/icons-material/Savings';
 import SettingsIcon from '@mui/icons-material/Settings';
+import StorageIcon from '@mui/icons-material/Storage';
+import TroubleshootIcon from '@mui/icons-material/Troubleshoot';
 import LogoutIcon from '@mui/icons-material/Logout';
 import CloudIcon from '@mui/icons-material/Cloud';
 import HelpOutlineIcon from '@mui/icons-material/HelpOutline';
@@ -32,6 +34,8 @@ const MainLayout: React.FC<MainLayoutProps> = ({ onLogout }) => {
         { text: 'Explore', icon: <ExploreIcon />, path: '/dashboard/explore' },
         { text: 'Kubernetes', icon: <CloudIcon />, path: '/dashboard/kubernetes' },
         { text: 'Optimization', icon: <SavingsIcon />, path: '/dashboard/optimization' },
+        { text: 'Cardinality', icon: <StorageIcon />, path: '/dashboard/cardinality' },
+        { text: 'Anomalies', icon: <TroubleshootIcon />, path: '/dashboard/anomalies' },
     ];
 
     const handleNavigation = (path: string) => {
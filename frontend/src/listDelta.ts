@@ -0,0 +1,47 @@
+import axios from 'axios';
+import API_URL from './config';
+
+interface ObjectRef {
+    name: string;
+    namespace?: string | null;
+}
+
+// A polled list as last received: the rows plus the version they correspond to
+export type HeldLists = Record<string, { version: string; rows: any[] }>;
+
+const objectKey = (o: ObjectRef) => `${o.namespace || ''}/${o.name}`;
+
+// Apply a versioned list response to the rows held so far. Returns the same
+// array when nothing changed, so React skips the re-render. Added rows that are
+// already held replace them rather than appear twice.
+export const applyDelta = <T extends ObjectRef>(rows: T[], body: any, field: string): T[] => {
+    if (body.full) return body[field] || [];
+    const { added, modified, deleted } = body as { added: T[]; modified: T[]; deleted: ObjectRef[] };
+    if (added.length === 0 && modified.length === 0 && deleted.length === 0) return rows;
+    const gone = new Set(deleted.map(objectKey));
+    const changed = new Map(modified.concat(added).map(row => [objectKey(row), row] as [string, T]));
+    const held = new Set(rows.map(objectKey));
+    const fresh = new Map(added.filter(row => !held.has(objectKey(row))).map(row => [objectKey(row), row] as [string, T]));
+    return rows
+        .filter(row => !gone.has(objectKey(row)))
+        .map(row => changed.get(objectKey(row)) || row)
+        .concat(Array.from(fresh.values()));
+};
+
+// Poll a list endpoint (e.g. '/api/metrics/pods?namespace=all') for what changed since the
+// version held for it; the backend falls back to a full list when that version is too old.
+export const pollList = async <T extends ObjectRef>(held: HeldLists, path: string, field: string): Promise<T[]> => {
+    const token = localStorage.getItem('token');
+    const fetchSince = (since: string) => axios.get(`${API_URL}${path}${path.includes('?') ? '&' : '?'}since=${encodeURIComponent(since)}`, {
+        headers: { Authorization: `Bearer ${token}` },
+    });
+    const since = held[path]?.version || '';
+    let res = await fetchSince(since);
+    if (!res.data.full && (held[path]?.version || '') !== since) {
+        // An overlapping poll moved the held rows on meanwhile, so this delta no longer applies
+        res = await fetchSince('');
+    }
+    const rows = applyDelta<T>(held[path]?.rows || [], res.data, field);
+    held[path] = { version: res.data.version, rows };
+    return rows;
+};
@@ -0,0 +1,162 @@
+import React, { useState, useEffect, useCallback } from 'react';
+import { Box, Typography, Paper, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Alert, CircularProgress, TextField, MenuItem, Tooltip } from '@mui/material';
+import { LineChart, Line, YAxis, ResponsiveContainer } from 'recharts';
+import axios from 'axios';
+import API_URL from '../config';
+import { tokens } from '../theme';
+import ClusterSelect from '../components/ClusterSelect';
+
+interface Anomaly {
+    cluster: string | null;
+    namespace?: string;
+    pod?: string;
+    node?: string;
+    metric: 'cpu' | 'memory' | 'restarts';
+    score: number;
+    robust_z: number;
+    ewma: number;
+    change: number;
+    change_time: number;
+    median: number | null;
+    latest: number | null;
+    values: (number | null)[];
+}
+
+interface AnomalyReport {
+    available: boolean;
+    anomalies: Anomaly[];
+    series: number;
+    timestamps: number[];
+    unavailable_clusters?: Record<string, string>;
+}
+
+const REFRESH_MS = 30000;
+
+const formatValue = (metric: Anomaly['metric'], value: number | null) => {
+    if (value === null) return '—';
+    if (metric === 'memory') return `${(value / (1024 * 1024)).toFixed(1)} MB`;
+    if (metric === 'cpu') return `${value.toFixed(3)} cores`;
+    return value.toFixed(1);
+};
+
+const scoreColor = (score: number) => {
+    if (score >= 10) return tokens.accent.red;
+    if (score >= 5) return tokens.accent.yellow;
+    return tokens.text.muted;
+};
+
+// Which detector flagged the series, by its largest component score
+const reason = (a: Anomaly) => {
+    if (a.change >= a.robust_z && a.change >= a.ewma) {
+        return `Level shift at ${new Date(a.change_time * 1000).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}`;
+    }
+    return a.robust_z >= a.ewma ? 'Outlier vs. window median' : 'Breaks recent trend';
+};
+
+const Sparkline: React.FC<{ values: (number | null)[]; color: string }> = ({ values, color }) => (
+    <ResponsiveContainer width={140} height={32}>
+        <LineChart data={values.map((value, i) => ({ i, value }))}>
+            <YAxis hide domain={['auto', 'auto']} />
+            <Line type="monotone" dataKey="value" stroke={color} dot={false} isAnimationActive={false} connectNulls />
+        </LineChart>
+    </ResponsiveContainer>
+);
+
+const Anomalies: React.FC = () => {
+    const [target, setTarget] = useState<'pods' | 'nodes'>('pods');
+    const [cluster, setCluster] = useState<string>('');
+    const [report, setReport] = useState<AnomalyReport | null>(null);
+    const [loading, setLoading] = useState<boolean>(true);
+    const [error, setError] = useState<string | null>(null);
+
+    const fetchAnomalies = useCallback(async () => {
+        const token = localStorage.getItem('token');
+        const params = new URLSearchParams({ target });
+        if (cluster) params.set('cluster', cluster);
+        try {
+            const res = await axios.get(`${API_URL}/api/metrics/anomalies?${params}`, { headers: { Authorization: `Bearer ${token}` } });
+            setReport(res.data);
+            setError(null);
+        } catch (err: any) {
+            setError(err.response?.data?.detail || err.message || 'Failed to fetch anomalies');
+        } finally {
+            setLoading(false);
+        }
+    }, [target, cluster]);
+
+    useEffect(() => { fetchAnomalies(); const i = setInterval(fetchAnomalies, REFRESH_MS); return () => clearInterval(i); }, [fetchAnomalies]);
+
+    if (loading && !report) {
+        return <Box sx={{ p: 4, display: 'flex', justifyContent: 'center' }}><CircularProgress /></Box>;
+    }
+
+    const rows = report?.anomalies || [];
+    const unavailable = Object.keys(report?.unavailable_clusters || {});
+
+    return (
+        <Box>
+            <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 3, gap: 2 }}>
+                <Typography variant="h5">Anomalies</Typography>
+                <Box sx={{ display: 'flex', gap: 2 }}>
+                    <TextField select size="small" label="Target" value={target} onChange={(e) => setTarget(e.target.value as 'pods' | 'nodes')} sx={{ minWidth: 120 }}>
+                        <MenuItem value="pods">Pods</MenuItem>
+                        <MenuItem value="nodes">Nodes</MenuItem>
+                    </TextField>
+                    <ClusterSelect value={cluster} onChange={setCluster} allowAll />
+                </Box>
+            </Box>
+
+            {error && <Alert severity="error" sx={{ mb: 3 }}>{error}</Alert>}
+            {unavailable.length > 0 && (
+                <Alert severity="warning" sx={{ mb: 3 }}>Unavailable clusters: {unavailable.join(', ')}</Alert>
+            )}
+            {report && !report.available ? (
+                <Alert severity="info">cAdvisor container metrics are not being scraped, so anomalies cannot be detected.</Alert>
+            ) : (
+                <TableContainer component={Paper} sx={{ borderRadius: 2 }}>
+                    <Typography variant="subtitle2" sx={{ p: 2, pb: 1, color: tokens.text.muted }}>
+                        Most unusual CPU, memory and restart series of the last hour, out of {(report?.series || 0).toLocaleString()}
+                    </Typography>
+                    <Table size="small">
+                        <TableHead>
+                            <TableRow>
+                                <TableCell>{target === 'pods' ? 'Pod' : 'Node'}</TableCell>
+                                <TableCell>Metric</TableCell>
+                                <TableCell align="right">Score</TableCell>
+                                <TableCell>Why</TableCell>
+                                <TableCell align="right">Latest</TableCell>
+                                <TableCell align="right">Median</TableCell>
+                                <TableCell>Last hour</TableCell>
+                            </TableRow>
+                        </TableHead>
+                        <TableBody>
+                            {rows.length === 0 ? (
+                                <TableRow>
+                                    <TableCell colSpan={7} align="center" sx={{ color: tokens.text.muted }}>Nothing unusual</TableCell>
+                                </TableRow>
+                            ) : rows.map((a) => (
+                                <TableRow key={`${a.cluster}/${a.namespace}/${a.pod || a.node}/${a.metric}`} hover>
+                                    <TableCell sx={{ fontFamily: 'monospace', fontSize: '0.8rem', wordBreak: 'break-all' }}>
+                                        {a.cluster ? `${a.cluster} · ` : ''}{a.namespace ? `${a.namespace}/` : ''}{a.pod || a.node}
+                                    </TableCell>
+                                    <TableCell>{a.metric}</TableCell>
+                                    <TableCell align="right" sx={{ fontWeight: 700, color: scoreColor(a.score) }}>
+                                        <Tooltip title={`robust z ${a.robust_z} · EWMA ${a.ewma} · change ${a.change}`}>
+                                            <span>{a.score.toFixed(1)}</span>
+                                        </Tooltip>
+                                    </TableCell>
+                                    <TableCell sx={{ color: tokens.text.muted }}>{reason(a)}</TableCell>
+                                    <TableCell align="right" sx={{ fontFamily: 'monospace' }}>{formatValue(a.metric, a.latest)}</TableCell>
+                                    <TableCell align="right" sx={{ fontFamily: 'monospace', color: tokens.text.muted }}>{formatValue(a.metric, a.median)}</TableCell>
+                                    <TableCell><Sparkline values={a.values} color={scoreColor(a.score)} /></TableCell>
+                                </TableRow>
+                            ))}
+                        </TableBody>
+                    </Table>
+                </TableContainer>
+            )}
+        </Box>
+    );
+};
+
+export default Anomalies;
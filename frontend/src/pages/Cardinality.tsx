@@ -0,0 +1,159 @@
+import React, { useState, useEffect } from 'react';
+import { Box, Typography, Paper, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Alert, CircularProgress } from '@mui/material';
+import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
+import axios from 'axios';
+import API_URL from '../config';
+import { tokens } from '../theme';
+
+interface NameValue {
+    name: string;
+    value: number;
+}
+
+interface TsdbStatus {
+    headStats?: { numSeries?: number; numLabelPairs?: number; chunkCount?: number };
+    seriesCountByMetricName?: NameValue[];
+    seriesCountByLabelValuePair?: NameValue[];
+    labelValueCountByLabelName?: NameValue[];
+}
+
+interface ChartPoint {
+    time: string;
+    value: number;
+}
+
+interface Churn {
+    available: boolean;
+    created: ChartPoint[];
+    removed: ChartPoint[];
+    head_series: ChartPoint[];
+}
+
+const TOP_LIMIT = 20;
+
+const TopTable: React.FC<{ title: string; nameLabel: string; valueLabel: string; rows: NameValue[]; total?: number }> = ({ title, nameLabel, valueLabel, rows, total }) => (
+    <TableContainer component={Paper} sx={{ borderRadius: 2 }}>
+        <Typography variant="subtitle2" sx={{ p: 2, pb: 1 }}>{title}</Typography>
+        <Table size="small">
+            <TableHead>
+                <TableRow>
+                    <TableCell>{nameLabel}</TableCell>
+                    <TableCell align="right">{valueLabel}</TableCell>
+                    {total ? <TableCell align="right">Share</TableCell> : null}
+                </TableRow>
+            </TableHead>
+            <TableBody>
+                {rows.length === 0 ? (
+                    <TableRow>
+                        <TableCell colSpan={3} align="center" sx={{ color: tokens.text.muted }}>No data</TableCell>
+                    </TableRow>
+                ) : rows.map((row) => (
+                    <TableRow key={row.name} hover>
+                        <TableCell sx={{ fontFamily: 'monospace', fontSize: '0.8rem', wordBreak: 'break-all' }}>{row.name}</TableCell>
+                        <TableCell align="right" sx={{ fontFamily: 'monospace' }}>{row.value.toLocaleString()}</TableCell>
+                        {total ? (
+                            <TableCell align="right" sx={{ color: tokens.text.muted }}>{((row.value / total) * 100).toFixed(1)}%</TableCell>
+                        ) : null}
+                    </TableRow>
+                ))}
+            </TableBody>
+        </Table>
+    </TableContainer>
+);
+
+const Cardinality: React.FC = () => {
+    const [status, setStatus] = useState<TsdbStatus | null>(null);
+    const [churn, setChurn] = useState<Churn | null>(null);
+    const [loading, setLoading] = useState<boolean>(true);
+    const [error, setError] = useState<string | null>(null);
+
+    useEffect(() => {
+        const fetchData = async () => {
+            const token = localStorage.getItem('token');
+            const headers = { Authorization: `Bearer ${token}` };
+            try {
+                const [statusRes, churnRes] = await Promise.all([
+                    axios.get(`${API_URL}/api/metrics/tsdb/status?limit=${TOP_LIMIT}`, { headers }),
+                    axios.get(`${API_URL}/api/metrics/tsdb/churn`, { headers }),
+                ]);
+                setStatus(statusRes.data);
+                setChurn(churnRes.data);
+            } catch (err: any) {
+                setError(err.response?.data?.detail || err.message || 'Failed to fetch TSDB status');
+            } finally {
+                setLoading(false);
+            }
+        };
+        fetchData();
+    }, []);
+
+    if (loading) {
+        return <Box sx={{ p: 4, display: 'flex', justifyContent: 'center' }}><CircularProgress /></Box>;
+    }
+
+    const numSeries = status?.headStats?.numSeries || 0;
+    const churnData = (churn?.head_series || []).map((point, i) => ({
+        time: point.time,
+        head: point.value,
+        created: churn?.created[i]?.value ?? 0,
+        removed: churn?.removed[i]?.value ?? 0,
+    }));
+
+    return (
+        <Box>
+            <Typography variant="h5" sx={{ mb: 3 }}>Series Cardinality</Typography>
+
+            {error && <Alert severity="error" sx={{ mb: 3 }}>{error}</Alert>}
+
+            <Box sx={{ display: 'grid', gridTemplateColumns: { xs: '1fr', md: '1fr 1fr 1fr' }, gap: 2, mb: 4 }}>
+                <Paper sx={{ p: 2.5, display: 'flex', flexDirection: 'column', gap: 1 }}>
+                    <Typography variant="subtitle2" color="text.secondary">Head Series</Typography>
+                    <Typography variant="h4" sx={{ color: tokens.accent.cyan, fontWeight: 700 }}>
+                        {numSeries.toLocaleString()}
+                    </Typography>
+                </Paper>
+                <Paper sx={{ p: 2.5, display: 'flex', flexDirection: 'column', gap: 1 }}>
+                    <Typography variant="subtitle2" color="text.secondary">Label Pairs</Typography>
+                    <Typography variant="h4" sx={{ color: tokens.accent.purple, fontWeight: 700 }}>
+                        {(status?.headStats?.numLabelPairs || 0).toLocaleString()}
+                    </Typography>
+                </Paper>
+                <Paper sx={{ p: 2.5, display: 'flex', flexDirection: 'column', gap: 1 }}>
+                    <Typography variant="subtitle2" color="text.secondary">Chunks</Typography>
+                    <Typography variant="h4" sx={{ color: tokens.accent.green, fontWeight: 700 }}>
+                        {(status?.headStats?.chunkCount || 0).toLocaleString()}
+                    </Typography>
+                </Paper>
+            </Box>
+
+            <Paper sx={{ p: 2, mb: 4 }}>
+                <Typography variant="subtitle2" sx={{ mb: 2 }}>Series Churn (24h)</Typography>
+                {churn && !churn.available ? (
+                    <Alert severity="info">Prometheus does not scrape its own metrics, so series churn is unavailable.</Alert>
+                ) : (
+                    <ResponsiveContainer width="100%" height={260}>
+                        <LineChart data={churnData} margin={{ top: 5, right: 5, left: 0, bottom: 0 }}>
+                            <CartesianGrid strokeDasharray="3 3" stroke={tokens.border.subtle} vertical={false} />
+                            <XAxis dataKey="time" stroke="transparent" tick={{ fill: tokens.text.faint, fontSize: 11 }} tickLine={false} minTickGap={40} />
+                            <YAxis yAxisId="rate" stroke="transparent" tick={{ fill: tokens.text.faint, fontSize: 11 }} tickLine={false} />
+                            <YAxis yAxisId="head" orientation="right" stroke="transparent" tick={{ fill: tokens.text.faint, fontSize: 11 }} tickLine={false} />
+                            <Tooltip contentStyle={{ backgroundColor: tokens.bg.base, border: `1px solid ${tokens.border.default}` }} />
+                            <Legend />
+                            <Line yAxisId="rate" type="monotone" dataKey="created" name="Created/s" stroke={tokens.chart.memory} dot={false} isAnimationActive={false} />
+                            <Line yAxisId="rate" type="monotone" dataKey="removed" name="Removed/s" stroke={tokens.chart.danger} dot={false} isAnimationActive={false} />
+                            <Line yAxisId="head" type="monotone" dataKey="head" name="Head series" stroke={tokens.chart.cpu} dot={false} isAnimationActive={false} />
+                        </LineChart>
+                    </ResponsiveContainer>
+                )}
+            </Paper>
+
+            <Box sx={{ display: 'grid', gridTemplateColumns: { xs: '1fr', lg: '1fr 1fr' }, gap: 2 }}>
+                <TopTable title="Top Metrics" nameLabel="Metric" valueLabel="Series" rows={status?.seriesCountByMetricName || []} total={numSeries} />
+                <TopTable title="Top Label/Value Pairs" nameLabel="Pair" valueLabel="Series" rows={status?.seriesCountByLabelValuePair || []} total={numSeries} />
+                <TopTable title="Labels With Most Values" nameLabel="Label" valueLabel="Values" rows={status?.labelValueCountByLabelName || []} />
+            </Box>
+        </Box>
+    );
+};
+
+export default Cardinality;
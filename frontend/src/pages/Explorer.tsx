@@ -4,6 +4,7 @@ import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContai
 import axios from 'axios';
 import API_URL from '../config';
 import { tokens } from '../theme';
+import ClusterSelect from '../components/ClusterSelect';
 
 interface MetricResult {
     metric: Record<string, string>;
@@ -24,6 +25,18 @@ interface SeriesStat {
     avg: number;
 }
 
+interface QueryCost {
+    requested_step: string;
+    step: string;
+    adjusted?: boolean;
+    estimated: {
+        series: number;
+        samples: number;
+        selectors: { selector: string; series: number }[];
+    } | null;
+    actual?: { series: number; samples: number };
+}
+
 const Explorer: React.FC = () => {
     const [query, setQuery] = useState('');
     const [loading, setLoading] = useState(false);
@@ -32,6 +45,9 @@ const Explorer: React.FC = () => {
     const [lines, setLines] = useState<string[]>([]);
     const [seriesStats, setSeriesStats] = useState<SeriesStat[]>([]);
     const [viewMode, setViewMode] = useState<'graph' | 'table'>('graph');
+    const [cost, setCost] = useState<QueryCost | null>(null);
+    const [cluster, setCluster] = useState('');
+    const [warnings, setWarnings] = useState<string[]>([]);
 
     const colors = [
         tokens.chart.cpu, tokens.chart.memory, tokens.chart.disk, tokens.chart.danger, tokens.accent.purple,
@@ -47,13 +63,15 @@ const Explorer: React.FC = () => {
         return val.toFixed(2);
     };
 
-    const handleRunQuery = async () => {
+    const handleRunQuery = async (confirm = false) => {
         if (!query.trim()) return;
         setLoading(true);
         setError('');
         setChartData([]);
         setLines([]);
         setSeriesStats([]);
+        setCost(null);
+        setWarnings([]);
 
         const token = localStorage.getItem('token');
         const headers = { Authorization: `Bearer ${token}` };
@@ -64,9 +82,12 @@ const Explorer: React.FC = () => {
         try {
             const encodedQuery = encodeURIComponent(query);
             const res = await axios.get(
-                `${API_URL}/api/metrics/query_range_raw?query=${encodedQuery}&start=${start}&end=${end}&step=${step}`,
+                `${API_URL}/api/metrics/query_range_raw?query=${encodedQuery}&start=${start}&end=${end}&step=${step}${cluster ? `&cluster=${encodeURIComponent(cluster)}` : ''}${confirm ? '&confirm=true' : ''}`,
                 { headers }
             );
+            setCost(res.data.cost || null);
+            // Clusters whose Prometheus failed or timed out are missing from a partial result
+            setWarnings(res.data.warnings || []);
 
             const resultData: MetricResult[] = res.data.data?.result || [];
 
@@ -119,7 +140,16 @@ const Explorer: React.FC = () => {
             setChartData(finalChartData);
             setSeriesStats(stats);
         } catch (err: any) {
-            setError(err.response?.data?.detail || err.message || 'Failed to execute query.');
+            const detail = err.response?.data?.detail;
+            if (detail?.cost) setCost(detail.cost);
+            if (err.response?.status === 428 && !confirm) {
+                const samples = detail.cost.estimated?.samples || 0;
+                if (window.confirm(`This query is estimated to return ~${formatValue(samples)} samples. Run it anyway?`)) {
+                    await handleRunQuery(true);
+                    return;
+                }
+            }
+            setError(detail?.message || detail || err.message || 'Failed to execute query.');
         } finally {
             setLoading(false);
         }
@@ -176,6 +206,7 @@ const Explorer: React.FC = () => {
                             style: { fontFamily: '"SF Mono", "Fira Code", monospace', fontSize: '0.875rem' }
                         }}
                     />
+                    <ClusterSelect value={cluster} onChange={setCluster} allowAll />
                     <Button
                         variant="contained"
                         sx={{
@@ -186,15 +217,30 @@ const Explorer: React.FC = () => {
                             whiteSpace: 'nowrap',
                             boxShadow: 'none',
                         }}
-                        onClick={handleRunQuery}
+                        onClick={() => handleRunQuery()}
                         disabled={loading || !query.trim()}
                     >
                         {loading ? <CircularProgress size={20} color="inherit" /> : 'Execute'}
                     </Button>
                 </Box>
+                {cost?.estimated && (
+                    <Typography
+                        variant="caption"
+                        title={cost.estimated.selectors.map(s => `${s.selector}: ${s.series}`).join('\n')}
+                        sx={{ display: 'block', mt: 1, px: 1, color: tokens.text.muted, fontFamily: 'monospace' }}
+                    >
+                        Touches {cost.estimated.series.toLocaleString()} series across {cost.estimated.selectors.length} selector{cost.estimated.selectors.length === 1 ? '' : 's'}
+                        {` · ~${formatValue(cost.estimated.samples)} samples`}
+                        {cost.actual && ` · returned ${formatValue(cost.actual.samples)}`}
+                        {cost.adjusted && (
+                            <Box component="span" sx={{ color: tokens.accent.yellow }}>{` · step raised from ${cost.requested_step} to ${cost.step}`}</Box>
+                        )}
+                    </Typography>
+                )}
             </Paper>
 
             {error && <Alert severity="error" sx={{ mb: 3 }}>{error}</Alert>}
+            {warnings.map((w, i) => <Alert key={i} severity="warning" sx={{ mb: 2 }}>{w}</Alert>)}
 
             {/* Content Area */}
             {chartData.length > 0 && (
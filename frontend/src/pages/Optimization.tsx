@@ -9,8 +9,10 @@ import DeveloperBoardIcon from '@mui/icons-material/DeveloperBoard';
 import axios from 'axios';
 import API_URL from '../config';
 import { tokens } from '../theme';
+import { watchRollout, FINAL_EVENTS } from '../rollout';
 
 interface OptimizationData {
+    cluster: string | null;
     namespace: string;
     pod: string;
     deployment: string;
@@ -27,6 +29,7 @@ interface OptResponse {
     total_waste_mb: number;
     total_waste_cpu: number;
     estimated_monthly_waste_usd: number;
+    unavailable_clusters?: Record<string, string>;
     error?: string;
 }
 
@@ -58,7 +61,10 @@ const Optimization: React.FC = () => {
     const [error, setError] = useState<string | null>(null);
     const [viewMode, setViewMode] = useState<'memory' | 'cpu'>('memory');
     const [applying, setApplying] = useState<string | null>(null);
+    const [rolloutMessage, setRolloutMessage] = useState<string | null>(null);
     const [applyDialog, setApplyDialog] = useState<{ open: boolean, opt: OptimizationData | null }>({ open: false, opt: null });
+    // Cluster the backend's Kubernetes client acts on; undefined until known, null if none
+    const [activeCluster, setActiveCluster] = useState<string | null | undefined>(undefined);
 
     const fetchOptimization = async () => {
         try {
@@ -78,10 +84,27 @@ const Optimization: React.FC = () => {
         }
     };
 
+    const fetchActiveCluster = async () => {
+        try {
+            const token = localStorage.getItem('token');
+            const res = await axios.get(`${API_URL}/api/metrics/prometheus/endpoints`, {
+                headers: { Authorization: `Bearer ${token}` }
+            });
+            const active = res.data.endpoints.find((e: { active: boolean }) => e.active);
+            setActiveCluster(active ? active.name : null);
+        } catch {
+            // The apply endpoint still refuses other clusters
+        }
+    };
+
     useEffect(() => {
         fetchOptimization();
+        fetchActiveCluster();
     }, []);
 
+    // Single-cluster rows carry no cluster and are always applicable
+    const canApply = (opt: OptimizationData) => !opt.cluster || activeCluster === undefined || opt.cluster === activeCluster;
+
     const handleApply = async (opt: OptimizationData) => {
         if (!opt.deployment) {
             alert("Could not identify deployment name for this pod.");
@@ -104,6 +127,7 @@ const Optimization: React.FC = () => {
             const payload = {
                 deployment: opt.deployment,
                 namespace: opt.namespace,
+                cluster: opt.cluster || undefined,
                 cpu_limit: viewMode === 'cpu' ? `${newCpu}` : undefined,
                 memory_limit: viewMode === 'memory' ? `${newMem}Mi` : undefined
             };
@@ -111,8 +135,16 @@ const Optimization: React.FC = () => {
                 headers: { Authorization: `Bearer ${token}` }
             });
             
-            // Refresh after short delay
-            setTimeout(fetchOptimization, 1000);
+            // Follow the rollout the patch started and refresh once it settles
+            watchRollout(opt.namespace, opt.deployment, (e) => {
+                if (e.event === 'progress') {
+                    setRolloutMessage(`${opt.deployment}: ${e.message}`);
+                } else if (FINAL_EVENTS.includes(e.event)) {
+                    setRolloutMessage(null);
+                    if (e.event !== 'complete' && e.event !== 'unsupported') setError(`${opt.deployment}: ${e.message || e.error || `rollout ${e.event}`}`);
+                    fetchOptimization();
+                }
+            });
         } catch (err: any) {
             setError(err.response?.data?.detail || 'Failed to apply optimization.');
         } finally {
@@ -165,6 +197,12 @@ const Optimization: React.FC = () => {
             </Box>
 
             {error && <Alert severity="error" sx={{ mb: 3 }}>{error}</Alert>}
+            {data?.unavailable_clusters && (
+                <Alert severity="warning" sx={{ mb: 3 }}>
+                    Partial report, no data from: {Object.keys(data.unavailable_clusters).join(', ')}
+                </Alert>
+            )}
+            {rolloutMessage && <Alert severity="info" icon={<CircularProgress size={18} />} sx={{ mb: 3 }}>{rolloutMessage}</Alert>}
 
             <Box sx={{ display: 'grid', gridTemplateColumns: { xs: '1fr', md: '1fr 1fr 1fr' }, gap: 2, mb: 4 }}>
                 <Paper sx={{ p: 2.5, display: 'flex', flexDirection: 'column', gap: 1 }}>
@@ -212,7 +250,7 @@ const Optimization: React.FC = () => {
                                         <Typography sx={{ fontWeight: 600, color: tokens.accent.blue }}>
                                             {opt.deployment || opt.pod}
                                         </Typography>
-                                        <Typography variant="caption" color="text.secondary">{opt.namespace}</Typography>
+                                        <Typography variant="caption" color="text.secondary">{opt.cluster ? `${opt.cluster} / ${opt.namespace}` : opt.namespace}</Typography>
                                     </TableCell>
                                     <TableCell sx={{ minWidth: 250 }}>
                                         <UsageBar 
@@ -233,7 +271,7 @@ const Optimization: React.FC = () => {
                                             size="small" 
                                             color="primary"
                                             startIcon={applying === opt.pod ? <CircularProgress size={14} /> : <AutoFixHighIcon />}
-                                            disabled={applying !== null || !opt.deployment}
+                                            disabled={applying !== null || !opt.deployment || !canApply(opt)}
                                             onClick={() => handleApply(opt)}
                                             sx={{ borderRadius: 4, textTransform: 'none' }}
                                         >
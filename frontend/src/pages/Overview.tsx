@@ -9,6 +9,7 @@ import NetworkCheckIcon from '@mui/icons-material/NetworkCheck';
 import axios from 'axios';
 import API_URL from '../config';
 import { tokens } from '../theme';
+import ClusterSelect from '../components/ClusterSelect';
 import {
     AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, Legend,
     ResponsiveContainer, ReferenceLine, ReferenceDot
@@ -157,6 +158,8 @@ const Overview: React.FC = () => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [lastUpdated, setLastUpdated] = useState<Date>(new Date());
+    // '' is the primary Prometheus; others are viewed one cluster at a time
+    const [cluster, setCluster] = useState('');
 
     const fetchMetrics = useCallback(async () => {
         setLoading(true); setError('');
@@ -165,18 +168,19 @@ const Overview: React.FC = () => {
         const end = Math.floor(Date.now() / 1000);
         const start = end - 3600;
         const step = '15s';
+        const sel = cluster ? `cluster=${encodeURIComponent(cluster)}` : '';
 
         try {
             const [cpuRes, memRes, diskRes, rxRes, txRes, uptimeRes, loadRes, procRes, tempRes, eventsRes] = await Promise.all([
-                axios.get(`${API_URL}/api/metrics/cpu?start=${start}&end=${end}&step=${step}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/memory?start=${start}&end=${end}&step=${step}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/disk?start=${start}&end=${end}&step=${step}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/network_rx?start=${start}&end=${end}&step=${step}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/network_tx?start=${start}&end=${end}&step=${step}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/uptime`, { headers }),
-                axios.get(`${API_URL}/api/metrics/load`, { headers }),
-                axios.get(`${API_URL}/api/metrics/processes`, { headers }),
-                axios.get(`${API_URL}/api/metrics/temperature`, { headers }),
+                axios.get(`${API_URL}/api/metrics/cpu?start=${start}&end=${end}&step=${step}${sel && `&${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/memory?start=${start}&end=${end}&step=${step}${sel && `&${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/disk?start=${start}&end=${end}&step=${step}${sel && `&${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/network_rx?start=${start}&end=${end}&step=${step}${sel && `&${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/network_tx?start=${start}&end=${end}&step=${step}${sel && `&${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/uptime${sel && `?${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/load${sel && `?${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/processes${sel && `?${sel}`}`, { headers }),
+                axios.get(`${API_URL}/api/metrics/temperature${sel && `?${sel}`}`, { headers }),
                 axios.get(`${API_URL}/api/metrics/events`, { headers }),
             ]);
             setCpuData(cpuRes.data); setMemData(memRes.data); setDiskData(diskRes.data);
@@ -193,7 +197,7 @@ const Overview: React.FC = () => {
             setLastUpdated(new Date());
         } catch { setError('Failed to fetch metrics.'); }
         finally { setLoading(false); }
-    }, []);
+    }, [cluster]);
 
     useEffect(() => { fetchMetrics(); const i = setInterval(fetchMetrics, 15000); return () => clearInterval(i); }, [fetchMetrics]);
 
@@ -228,7 +232,10 @@ const Overview: React.FC = () => {
             {error && <Alert severity="error" sx={{ mb: 3 }}>{error}</Alert>}
 
             {/* ── Page Header ── */}
-            <Typography variant="h5" sx={{ mb: 3 }}>Overview</Typography>
+            <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 3 }}>
+                <Typography variant="h5">Overview</Typography>
+                <ClusterSelect value={cluster} onChange={setCluster} />
+            </Box>
 
             {/* ── Top Row: 4 Resource Gauge Cards ── */}
             <Box sx={{ display: 'flex', gap: 2, mb: 3, flexWrap: 'wrap' }}>
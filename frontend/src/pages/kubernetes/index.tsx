@@ -1,6 +1,8 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import API_URL from '../../config';
+import { watchRollout, FINAL_EVENTS } from '../../rollout';
+import { pollList, HeldLists } from '../../listDelta';
 import { useSearchParams, useNavigate } from 'react-router-dom';
 import { Cluster, NodeInfo, Namespace, Pod, Deployment, Service } from './types';
 import ClusterList from './ClusterList';
@@ -41,6 +43,11 @@ const Kubernetes: React.FC = () => {
     const [pathInput, setPathInput] = useState('');
     const [isEditingPath, setIsEditingPath] = useState(false);
 
+    const rolloutWatches = useRef<(() => void)[]>([]);
+    // Lists held between polls, so each poll only downloads what changed
+    const heldLists = useRef<HeldLists>({});
+    useEffect(() => () => rolloutWatches.current.forEach(cancel => cancel()), []);
+
     const openSnackbar = (message: string, severity: 'success' | 'error' | 'info' | 'warning' = 'success') => {
         setSnackbar({ open: true, message, severity });
     };
@@ -114,18 +121,19 @@ const Kubernetes: React.FC = () => {
 
         setError('');
         try {
-            const [podRes, depRes, svcRes, nodeRes, nsRes] = await Promise.all([
-                axios.get(`${API_URL}/api/metrics/pods?namespace=${selectedNs}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/deployments?namespace=${selectedNs}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/services?namespace=${selectedNs}`, { headers }),
-                axios.get(`${API_URL}/api/metrics/nodes`, { headers }),
-                axios.get(`${API_URL}/api/metrics/namespaces`, { headers }),
+            const held = heldLists.current;
+            const [podRows, depRows, svcRows, nodeRows, nsRows] = await Promise.all([
+                pollList<Pod>(held, `/api/metrics/pods?namespace=${selectedNs}`, 'pods'),
+                pollList<Deployment>(held, `/api/metrics/deployments?namespace=${selectedNs}`, 'deployments'),
+                pollList<Service>(held, `/api/metrics/services?namespace=${selectedNs}`, 'services'),
+                pollList<NodeInfo>(held, '/api/metrics/nodes', 'nodes'),
+                pollList<Namespace>(held, '/api/metrics/namespaces', 'namespaces'),
             ]);
-            setPods(podRes.data.pods || []);
-            setDeployments(depRes.data.deployments || []);
-            setServices(svcRes.data.services || []);
-            setNodes(nodeRes.data.nodes || []);
-            setNamespaces(nsRes.data.namespaces || []);
+            setPods(podRows);
+            setDeployments(depRows);
+            setServices(svcRows);
+            setNodes(nodeRows);
+            setNamespaces(nsRows);
         } catch (err) {
             setError('Failed to fetch Kubernetes resources.');
         } finally {
@@ -180,11 +188,35 @@ const Kubernetes: React.FC = () => {
         }
     };
 
+    // Report rollout progress from one watch, refreshing the lists once it settles
+    const followRollout = (dep: Deployment) => {
+        const cancel = watchRollout(dep.namespace, dep.name, (e) => {
+            if (e.event === 'progress' && e.state !== 'complete') {
+                openSnackbar(`${dep.name}: ${e.message} (${e.ready}/${e.replicas} ready)`, 'info');
+            } else if (e.event === 'pods' && e.problems?.length) {
+                const p = e.problems[0];
+                openSnackbar(`${dep.name}: pod ${p.pod} is in ${p.reason}`, 'warning');
+            } else if (e.event === 'complete') {
+                openSnackbar(`${dep.name} rolled out successfully`);
+            } else if (e.event === 'unsupported') {
+                // No rollout watch on this server: the refresh below is all there is
+            } else if (FINAL_EVENTS.includes(e.event)) {
+                openSnackbar(`${dep.name}: ${e.message || e.error || `rollout ${e.event}`}`, 'error');
+            }
+            if (FINAL_EVENTS.includes(e.event)) {
+                rolloutWatches.current = rolloutWatches.current.filter(c => c !== cancel);
+                fetchData();
+            }
+        });
+        rolloutWatches.current.push(cancel);
+    };
+
     const handleRestartDeployment = async (dep: Deployment) => {
         setLoading(true);
         try {
             await axios.post(`${API_URL}/api/metrics/deployments/${dep.namespace}/${dep.name}/restart`, {}, { headers });
-            await fetchData();
+            setLoading(false);
+            followRollout(dep);
         } catch (err: any) {
             setError(err.response?.data?.detail || 'Failed to restart deployment.');
             setLoading(false);
@@ -195,7 +227,8 @@ const Kubernetes: React.FC = () => {
         setLoading(true);
         try {
             await axios.post(`${API_URL}/api/metrics/deployments/${dep.namespace}/${dep.name}/scale`, { replicas }, { headers });
-            await fetchData();
+            setLoading(false);
+            followRollout(dep);
         } catch (err: any) {
             setError(err.response?.data?.detail || 'Failed to scale deployment.');
             setLoading(false);
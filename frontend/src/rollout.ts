@@ -0,0 +1,67 @@
+import API_URL from './config';
+
+export interface RolloutProblem {
+    pod: string;
+    container: string | null;
+    reason: string;
+    message: string | null;
+}
+
+export interface RolloutEvent {
+    event: 'progress' | 'pods' | 'complete' | 'stalled' | 'deleted' | 'timeout' | 'error' | 'unsupported';
+    state?: string;
+    message?: string;
+    replicas?: number;
+    updated?: number;
+    ready?: number;
+    available?: number;
+    problems?: RolloutProblem[];
+    error?: string;
+}
+
+// Events after which the backend closes the stream. 'unsupported' is reported instead of a
+// stream when the server can't watch rollouts (K8S_ASYNC=false); callers just refresh.
+export const FINAL_EVENTS = ['complete', 'stalled', 'deleted', 'timeout', 'error', 'unsupported'];
+
+// Follow a Deployment's rollout over server-sent events. fetch is used rather than
+// EventSource so the token can travel in the Authorization header. Returns a cancel function.
+export const watchRollout = (namespace: string, name: string, onEvent: (event: RolloutEvent) => void): (() => void) => {
+    const controller = new AbortController();
+
+    const run = async () => {
+        const token = localStorage.getItem('token');
+        const res = await fetch(`${API_URL}/api/metrics/deployments/${namespace}/${name}/rollout`, {
+            headers: { Authorization: `Bearer ${token}` },
+            signal: controller.signal,
+        });
+        if (res.status === 503) {
+            onEvent({ event: 'unsupported' });
+            return;
+        }
+        if (!res.ok || !res.body) {
+            onEvent({ event: 'error', error: `Rollout watch failed (${res.status})` });
+            return;
+        }
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let end;
+            while ((end = buffer.indexOf('\n\n')) >= 0) {
+                const frame = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                // Keepalive comments carry no data line
+                const data = frame.split('\n').filter(line => line.startsWith('data: ')).map(line => line.slice(6)).join('\n');
+                if (data) onEvent(JSON.parse(data));
+            }
+        }
+    };
+
+    run().catch((err) => {
+        if (err.name !== 'AbortError') onEvent({ event: 'error', error: err.message });
+    });
+    return () => controller.abort();
+};